@@ -1,10 +1,20 @@
-import logging
-import socket
-
-from app import create_app, socketio
 from config import Config
 
-from app.logging_config import setup_logging
+if Config.ASYNC_MODE in (None, 'eventlet'):
+    # eventlet must patch sockets, threads and locks before anything imports them
+    try:
+        import eventlet
+    except ImportError:
+        pass  # Flask-SocketIO falls back to threading
+    else:
+        eventlet.monkey_patch()
+
+import logging  # noqa: E402
+import socket  # noqa: E402
+
+from app import create_app, install_signal_handlers, shutdown, socketio  # noqa: E402
+
+from app.logging_config import setup_logging  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +42,15 @@ if __name__ == '__main__':
     logger.info(f"🌐 Host Interface: {Config.HOST}")
     logger.info(f"🔌 Port: {Config.PORT}")
     logger.info(f"📱 Trebek URL: http://{local_ip}:{Config.PORT}/")
-    logger.info(f"📱 Players Join: http://{local_ip}:{Config.PORT}/join")
-    logger.info(f"📺 Display: http://{local_ip}:{Config.PORT}/display")
+    logger.info(f"📱 Players Join: http://{local_ip}:{Config.PORT}/join?game=<code>")
+    logger.info(f"📺 Display: http://{local_ip}:{Config.PORT}/display?game=<code>")
     logger.info(f"{'=' * 60}\n")
 
-    socketio.run(app, host=Config.HOST, port=Config.PORT, debug=Config.DEBUG, allow_unsafe_werkzeug=True)
+    install_signal_handlers()
+    logger.info(f"Serving with {socketio.async_mode} ({Config.APP_ENV}, debug={Config.DEBUG})")
+    # The Werkzeug dev server (async mode 'threading') is refused in production
+    try:
+        socketio.run(app, host=Config.HOST, port=Config.PORT, debug=Config.DEBUG,
+                     allow_unsafe_werkzeug=not Config.PRODUCTION)
+    finally:
+        shutdown()
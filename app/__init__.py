@@ -1,11 +1,52 @@
+import atexit
 import logging
+import signal
+import sys
 from flask import Flask
 from flask_socketio import SocketIO
 
-from config import Config
+from app import assets, compression, serialization
+from config import DEFAULT_SECRET_KEY, Config
 
 logger = logging.getLogger(__name__)
-socketio = SocketIO(cors_allowed_origins="*")
+
+# Async modes Flask-SocketIO can serve with (None picks eventlet when it is installed).
+# asyncio needs an ASGI server, which Flask-SocketIO does not run on.
+ASYNC_MODES = (None, 'eventlet', 'gevent', 'gevent_uwsgi', 'threading')
+
+socketio = SocketIO(cors_allowed_origins="*", json=serialization, serializer=serialization.MeasuredPacket)
+
+
+_shut_down = False
+
+
+def shutdown():
+    """Save every game and hand its ownership back, so another worker can restore it (runs once)."""
+    global _shut_down
+    if _shut_down:
+        return
+    _shut_down = True
+    from app import events
+    events.games.close()
+    if events.cluster is not None:
+        for game in events.games:
+            events.cluster.release(game.code)
+
+
+def handle_stop_signal(signum, frame):
+    """Unwind the server loop; the caller of `socketio.run` then runs `shutdown`.
+
+    Saving games here would run inside whatever was interrupted, which
+    under eventlet is usually the hub, where offloaded writes can't wait.
+    """
+    logger.info(f"Received {signal.Signals(signum).name}; saving games and exiting")
+    sys.exit(0)
+
+
+def install_signal_handlers():
+    """Stop cleanly on SIGTERM (docker stop, systemd) and SIGINT; without a handler SIGTERM skips atexit."""
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, handle_stop_signal)
 
 
 def create_app():
@@ -16,17 +57,90 @@ def create_app():
     logger.debug(f"Loading config: HOST={Config.HOST}, PORT={Config.PORT}, DEBUG={Config.DEBUG}")
     app.config.from_object(Config)
 
+    if Config.ASYNC_MODE not in ASYNC_MODES:
+        raise ValueError(f"ASYNC_MODE={Config.ASYNC_MODE!r} is not supported; use eventlet or threading")
+    if Config.PRODUCTION and Config.SECRET_KEY == DEFAULT_SECRET_KEY:
+        logger.warning("APP_ENV=production with the default SECRET_KEY; set SECRET_KEY")
+    if Config.SOCKETIO_CODEC == 'msgpack' and not serialization.msgpack_enabled():
+        logger.warning("SOCKETIO_CODEC=msgpack but the msgpack package is not installed; sending JSON")
+
     # Initialize SocketIO with the app and proper async mode
     logger.info("Initializing SocketIO with CORS allowed for all origins")
-    socketio.init_app(app)
+    bus = None
+    options = {'async_mode': Config.ASYNC_MODE, 'transports': Config.SOCKETIO_TRANSPORTS,
+               'ping_interval': Config.PING_INTERVAL, 'ping_timeout': Config.PING_TIMEOUT,
+               'http_compression': Config.WS_COMPRESSION, 'compression_threshold': Config.COMPRESSION_THRESHOLD}
+    if Config.MESSAGE_QUEUE:
+        from app.cluster import BusManager, RedisBus, make_bus, require_patched_sockets
+        logger.info(f"Worker {Config.WORKER_ID} using message queue {Config.MESSAGE_QUEUE}")
+        bus = make_bus(Config.MESSAGE_QUEUE, lambda target: socketio.start_background_task(target))
+        socketio.init_app(app, client_manager=BusManager(bus), **options)
+        if isinstance(bus, RedisBus):
+            # Checked before anything subscribes, which starts the listener task
+            require_patched_sockets(socketio.async_mode)
+    else:
+        socketio.init_app(app, **options)
+    logger.info(f"Socket.IO async mode {socketio.async_mode}, transports {','.join(Config.SOCKETIO_TRANSPORTS)}, "
+                f"ping {Config.PING_INTERVAL}s/{Config.PING_TIMEOUT}s, "
+                f"max connections {Config.MAX_CONNECTIONS or 'unlimited'}")
+    compression.install(socketio.server, Config.WS_COMPRESSION, Config.COMPRESSION_THRESHOLD)
+
+    offload = None
+    if socketio.async_mode == 'eventlet':
+        from eventlet import patcher, tpool
+        # Without patching, locks don't separate green threads and sockets block the hub
+        if not (patcher.is_monkey_patched('socket') and patcher.is_monkey_patched('thread')):
+            if Config.PRODUCTION:
+                raise RuntimeError("eventlet is not monkey-patched; start the server with app.py, "
+                                   "or call eventlet.monkey_patch() before importing the app")
+            logger.warning("Serving on eventlet without eventlet.monkey_patch(); use app.py to start the server")
+        # Disk writes, QR generation and address detection run on native threads, not the hub
+        offload = tpool.execute
 
     try:
         from app import routes, events
         app.register_blueprint(routes.bp)
+        assets.bundles()
         logger.info("Blueprint and event handlers registered successfully")
     except Exception as e:
         logger.error(f"Failed to register blueprint or import events: {e}", exc_info=True)
         raise
 
+    from app.registry import GameRegistry
+    events.games = GameRegistry(journal_dir=Config.JOURNAL_DIR or None,
+                                commit_interval=Config.JOURNAL_COMMIT_INTERVAL,
+                                start_background_task=socketio.start_background_task,
+                                sleep=socketio.sleep,
+                                snapshot_dir=Config.SNAPSHOT_DIR or None,
+                                offload=offload)
+
+    if bus is not None:
+        from functools import partial
+        from app.cluster import Cluster
+        events.cluster = Cluster(bus, Config.WORKER_ID, Config.OWNER_LEASE_SECONDS)
+        events.cluster.listen(partial(events.run_forwarded, app))
+        socketio.start_background_task(events.cluster.run_heartbeat, lambda: [game.code for game in events.games],
+                                       events.lose_game, socketio.sleep)
+        # Games on disk are only rebuilt (on startup, or left behind by a stopped worker) if this worker wins them
+        events.games.claim = lambda code: events.cluster.claim(code) == events.cluster.worker_id
+
+    recovered = events.games.recover()
+    if recovered:
+        logger.info(f"Recovered {recovered} game(s) from disk")
+
+    from app.qr import QRCodes
+    events.qr_codes = QRCodes(str(Config.PORT), offload=offload,
+                              start_background_task=socketio.start_background_task,
+                              public_url=Config.PUBLIC_URL)
+    for code in [None] + [game.code for game in events.games]:
+        events.qr_codes.prepare(code)
+    if Config.QR_ADDRESS_CHECK_INTERVAL > 0:
+        socketio.start_background_task(events.qr_codes.run_address_watch, Config.QR_ADDRESS_CHECK_INTERVAL,
+                                       socketio.sleep)
+
+    if Config.SNAPSHOT_DIR and Config.SNAPSHOT_INTERVAL > 0:
+        socketio.start_background_task(events.games.run_snapshots, Config.SNAPSHOT_INTERVAL)
+    atexit.register(shutdown)
+
     logger.info("Flask application created successfully")
     return app
@@ -0,0 +1,149 @@
+"""
+Static JS/CSS bundles and cached pages, precompressed and served with validators.
+
+Each page loads one script bundle (``js/common.js`` followed by the page's
+own script) and one stylesheet from ``app/static``. Bundles are built once
+per process: concatenated, fingerprinted with a hash of their content
+(``trebek.3f9a0c1d2e4b.js``), and compressed ahead of time with gzip and,
+if the brotli package is installed, brotli. They are served from
+``/assets/`` with a one-year immutable ``Cache-Control``; a changed file
+gets a new name, so browsers never need to revalidate one.
+
+Pages are rendered once per payload codec and served with an ETag, so a
+returning phone gets ``304 Not Modified`` instead of the page.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Bundle name -> source files (relative to STATIC_DIR), concatenated in order
+BUNDLES: Dict[str, List[str]] = {
+    'trebek.js': ['js/common.js', 'js/trebek.js'],
+    'display.js': ['js/common.js', 'js/display.js'],
+    'jennings.js': ['js/common.js', 'js/jennings.js'],
+    'trebek.css': ['css/trebek.css'],
+    'display.css': ['css/display.css'],
+    'jennings.css': ['css/jennings.css'],
+}
+
+CONTENT_TYPES = {
+    '.js': 'text/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+    '.json': 'application/json',
+    '.png': 'image/png',
+    '.svg': 'image/svg+xml',
+}
+
+# Preferred content codings, best first
+CODINGS = ('br', 'gzip')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+_bundles: Dict[str, 'Asset'] = {}
+_by_filename: Dict[str, 'Asset'] = {}
+_lock = threading.Lock()
+
+
+class Asset:
+    """A response body with its content hash and precompressed variants."""
+    __slots__ = ('name', 'content_type', 'digest', 'variants')
+
+    def __init__(self, name: str, body: bytes, content_type: str):
+        self.name = name
+        self.content_type = content_type
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.variants = precompress(body)
+
+    @property
+    def filename(self) -> str:
+        """Fingerprinted file name: ``trebek.js`` -> ``trebek.<digest>.js``."""
+        stem, ext = os.path.splitext(self.name)
+        return f"{stem}.{self.digest}{ext}"
+
+
+def precompress(body: bytes) -> Dict[str, bytes]:
+    """`body` keyed by content coding; compressed variants that save nothing are left out."""
+    variants = {'identity': body}
+    compressed = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(body, quality=11)
+    for coding, data in compressed.items():
+        if len(data) < len(body):
+            variants[coding] = data
+    return variants
+
+
+def build_bundles(static_dir: str = STATIC_DIR) -> Dict[str, Asset]:
+    """Read, concatenate and precompress every bundle in BUNDLES."""
+    built = {}
+    for name, sources in BUNDLES.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_dir, source), 'rb') as f:
+                parts.append(f.read())
+        built[name] = Asset(name, b'\n'.join(parts), CONTENT_TYPES[os.path.splitext(name)[1]])
+    return built
+
+
+def bundles() -> Dict[str, Asset]:
+    """The bundles of this process, built on first use."""
+    if not _bundles:
+        with _lock:
+            if not _bundles:
+                built = build_bundles()
+                _by_filename.update((b.filename, b) for b in built.values())
+                _bundles.update(built)
+                total = sum(len(b.variants['identity']) for b in built.values())
+                gzipped = sum(len(b.variants.get('gzip', b.variants['identity'])) for b in built.values())
+                logger.info(f"Built {len(built)} static bundles: {total} bytes, {gzipped} gzipped"
+                            f"{'' if brotli is not None else ' (install brotli for br variants)'}")
+    return _bundles
+
+
+def bundle_filename(name: str) -> str:
+    return bundles()[name].filename
+
+
+def find(filename: str) -> Optional[Asset]:
+    """The bundle served under a fingerprinted file name, or None (unknown or outdated)."""
+    bundles()
+    return _by_filename.get(filename)
+
+
+def choose_coding(asset: Asset) -> str:
+    """The smallest variant of `asset` that the request's Accept-Encoding allows."""
+    for coding in CODINGS:
+        if coding in asset.variants and request.accept_encodings[coding] > 0:
+            return coding
+    return 'identity'
+
+
+def send(asset: Asset, cache_control: str) -> Response:
+    """Respond with `asset` in the best accepted coding, or 304 if the client's copy is current."""
+    coding = choose_coding(asset)
+    etag = asset.digest if coding == 'identity' else f"{asset.digest}-{coding}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(asset.variants[coding], content_type=asset.content_type)
+        if coding != 'identity':
+            response.headers['Content-Encoding'] = coding
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
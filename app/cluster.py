@@ -0,0 +1,298 @@
+"""
+Running several worker processes behind a load balancer.
+
+Workers share a message bus (``MESSAGE_QUEUE``). Two things travel over it:
+
+- Socket.IO emits and room changes, through `BusManager`, so a broadcast
+  from any worker reaches the sockets connected to every worker.
+- Game commands. Each game is owned by exactly one worker, the one holding
+  its GameManager (see `Cluster`). A worker that receives an event for a
+  game owned elsewhere forwards it to the owner, which runs the handler as
+  if the client were connected locally (see `app.events.owned`).
+
+`LocalBus` is an in-process stand-in for the broker, used by tests and
+benchmarks; `RedisBus` connects to Redis (``MESSAGE_QUEUE=redis://...``).
+"""
+import logging
+import pickle
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import socketio
+
+try:
+    import redis
+except ImportError:  # only needed for MESSAGE_QUEUE=redis://...
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[Any], None]
+
+
+class LocalBus:
+    """In-process bus: synchronous publish/subscribe and an atomic key/value store.
+
+    Messages are pickled on the way through, as with a real broker, so
+    subscribers never share objects with the publisher. Keys set with a
+    `ttl` expire `ttl` seconds (by `clock`) after they were last set or renewed.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._subscribers: Dict[str, List[Callback]] = {}
+        self._values: Dict[str, str] = {}
+        self._expiry: Dict[str, float] = {}
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: Any):
+        payload = pickle.dumps(message)
+        for callback in list(self._subscribers.get(channel, ())):
+            callback(pickle.loads(payload))
+
+    def subscribe(self, channel: str, callback: Callback):
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+    def set_default(self, key: str, value: str, ttl: Optional[float] = None) -> str:
+        """Store `value` under `key` unless a value is already set; returns the stored value."""
+        with self._lock:
+            self._expire_locked(key)
+            if key not in self._values:
+                self._values[key] = value
+                if ttl is not None:
+                    self._expiry[key] = self._clock() + ttl
+            return self._values[key]
+
+    def renew(self, key: str, value: str, ttl: float) -> bool:
+        """Reset `key`'s time to live if it still holds `value`; returns whether it did."""
+        with self._lock:
+            self._expire_locked(key)
+            if self._values.get(key) != value:
+                return False
+            self._expiry[key] = self._clock() + ttl
+            return True
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            self._expire_locked(key)
+            return self._values.get(key)
+
+    def delete_if(self, key: str, value: str) -> bool:
+        """Delete `key` if it holds `value`; returns whether it did."""
+        with self._lock:
+            self._expire_locked(key)
+            if self._values.get(key) != value:
+                return False
+            del self._values[key]
+            self._expiry.pop(key, None)
+            return True
+
+    def _expire_locked(self, key: str):
+        deadline = self._expiry.get(key)
+        if deadline is not None and deadline <= self._clock():
+            del self._values[key]
+            del self._expiry[key]
+
+
+# Compare-and-set scripts, so a worker never renews or deletes a key another worker now holds
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+DELETE_IF_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBus:
+    """Bus backed by Redis pub/sub and keys, shared by workers on different hosts."""
+
+    def __init__(self, url: str, start_background_task: Callable):
+        if redis is None:
+            raise RuntimeError("MESSAGE_QUEUE=redis://... requires the 'redis' package")
+        self._redis = redis.Redis.from_url(url)
+        self._renew = self._redis.register_script(RENEW_SCRIPT)
+        self._delete_if = self._redis.register_script(DELETE_IF_SCRIPT)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._subscribers: Dict[str, List[Callback]] = {}
+        self._start_background_task = start_background_task
+        self._listening = False
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: Any):
+        self._redis.publish(channel, pickle.dumps(message))
+
+    def subscribe(self, channel: str, callback: Callback):
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+            self._pubsub.subscribe(channel)
+            start = not self._listening
+            self._listening = True
+        if start:
+            self._start_background_task(self._listen)
+
+    def set_default(self, key: str, value: str, ttl: Optional[float] = None) -> str:
+        self._redis.set(key, value, nx=True, px=int(ttl * 1000) if ttl is not None else None)
+        return self.get(key)
+
+    def renew(self, key: str, value: str, ttl: float) -> bool:
+        return bool(self._renew(keys=[key], args=[value, int(ttl * 1000)]))
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._redis.get(key)
+        return value.decode() if value is not None else None
+
+    def delete_if(self, key: str, value: str) -> bool:
+        return bool(self._delete_if(keys=[key], args=[value]))
+
+    def _listen(self):
+        for item in self._pubsub.listen():
+            channel = item['channel'].decode()
+            message = pickle.loads(item['data'])
+            for callback in list(self._subscribers.get(channel, ())):
+                try:
+                    callback(message)
+                except Exception as e:
+                    logger.error(f"Bus subscriber for {channel} failed: {e}", exc_info=True)
+
+
+def require_patched_sockets(async_mode: Optional[str]):
+    """Raise unless sockets are monkey-patched for a green `async_mode`.
+
+    `RedisBus` reads pub/sub messages in a background task; under eventlet
+    or gevent, an unpatched socket read would block the whole hub.
+    """
+    if async_mode == 'eventlet':
+        from eventlet import patcher
+        patched = patcher.is_monkey_patched('socket')
+    elif async_mode in ('gevent', 'gevent_uwsgi'):
+        from gevent import monkey
+        patched = monkey.is_module_patched('socket')
+    else:
+        return
+    if not patched:
+        raise RuntimeError(f"MESSAGE_QUEUE=redis://... needs the socket module monkey-patched under {async_mode}; "
+                           "start the server with app.py")
+
+
+def make_bus(url: str, start_background_task: Callable):
+    """The bus for a ``MESSAGE_QUEUE`` URL: ``local://`` or ``redis://host:port/db``."""
+    if url.startswith('local://'):
+        return LOCAL_BUS
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisBus(url, start_background_task)
+    raise ValueError(f"Unsupported MESSAGE_QUEUE: {url}")
+
+
+# Shared by every server in this process that uses MESSAGE_QUEUE=local://
+LOCAL_BUS = LocalBus()
+
+
+class BusManager(socketio.PubSubManager):
+    """Socket.IO client manager that relays emits and room changes over a bus."""
+
+    name = 'bus'
+
+    def __init__(self, bus, channel: str = 'flask-socketio', write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.bus = bus
+
+    def initialize(self):
+        # The bus calls back with each message, so no listener thread is needed here
+        socketio.Manager.initialize(self)
+        if not self.write_only:
+            self.bus.subscribe(self.channel, self._receive)
+        self._get_logger().info(self.name + ' backend initialized.')
+
+    def _publish(self, data):
+        self.bus.publish(self.channel, data)
+
+    def _receive(self, data):
+        """Apply a message published by any server on the bus (mirrors PubSubManager._thread)."""
+        method = data.get('method') if isinstance(data, dict) else None
+        if method == 'callback':
+            self._handle_callback(data)
+        elif method and data.get('host_id') != self.host_id:
+            handler = {
+                'emit': self._handle_emit,
+                'disconnect': self._handle_disconnect,
+                'enter_room': self._handle_enter_room,
+                'leave_room': self._handle_leave_room,
+                'close_room': self._handle_close_room,
+            }.get(method)
+            if handler is not None:
+                handler(data)
+
+
+class Cluster:
+    """Which worker owns each game, and forwarding of commands to the owner.
+
+    Ownership is first-come: the worker that hosts a game claims it, and
+    keeps it until it releases it. With a `lease`, a claim expires `lease`
+    seconds after it was last renewed; `run_heartbeat` renews this worker's
+    games, so the games of a worker that crashed or was killed (and never
+    released them) become free for another worker to take over.
+    """
+
+    def __init__(self, bus, worker_id: str, lease: Optional[float] = None):
+        self.bus = bus
+        self.worker_id = worker_id
+        self.lease = lease
+
+    @staticmethod
+    def _owner_key(code: str) -> str:
+        return f"game-owner:{code}"
+
+    @staticmethod
+    def _worker_channel(worker_id: str) -> str:
+        return f"worker:{worker_id}"
+
+    def owner(self, code: str) -> Optional[str]:
+        return self.bus.get(self._owner_key(code))
+
+    def claim(self, code: str) -> str:
+        """Make this worker the owner of `code` unless another worker already is; returns the owner."""
+        owner = self.bus.set_default(self._owner_key(code), self.worker_id, self.lease)
+        if owner == self.worker_id:
+            logger.info(f"Worker {self.worker_id} owns game {code}")
+        return owner
+
+    def renew(self, code: str) -> bool:
+        """Keep this worker's claim on `code` alive; returns False if another worker owns it now."""
+        if self.lease is not None and self.bus.renew(self._owner_key(code), self.worker_id, self.lease):
+            return True
+        # The lease lapsed (or there is none): still ours if nobody took it meanwhile
+        return self.claim(code) == self.worker_id
+
+    def release(self, code: str):
+        if self.bus.delete_if(self._owner_key(code), self.worker_id):
+            logger.info(f"Worker {self.worker_id} released game {code}")
+
+    def run_heartbeat(self, codes: Callable[[], Iterable[str]], on_lost: Callable[[str], Any],
+                      sleep: Callable[[float], Any]):
+        """Background loop: renew the claim on every game in `codes()` three times per lease.
+
+        `on_lost(code)` is called for a game whose lease lapsed and another
+        worker took over, so this worker stops hosting its stale copy.
+        """
+        while True:
+            sleep(self.lease / 3)
+            for code in codes():
+                if not self.renew(code):
+                    logger.warning(f"Worker {self.worker_id} lost game {code} to worker {self.owner(code)}")
+                    on_lost(code)
+
+    def forward(self, worker_id: str, command: Dict):
+        """Send a command to the worker that owns its game."""
+        self.bus.publish(self._worker_channel(worker_id), command)
+
+    def listen(self, callback: Callback):
+        """Call `callback(command)` for every command forwarded to this worker."""
+        self.bus.subscribe(self._worker_channel(self.worker_id), callback)
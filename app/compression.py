@@ -0,0 +1,82 @@
+"""
+WebSocket compression (permessage-deflate) with a size threshold.
+
+Eventlet's WebSocket server accepts permessage-deflate whenever the browser
+offers it and then deflates every frame, including the few-byte buzz
+events, where compression costs more CPU than it saves on the air.
+`install` swaps Engine.IO's eventlet WebSocket handler for one that
+negotiates deflate only when ``WS_COMPRESSION`` is on, and sends messages
+shorter than ``COMPRESSION_THRESHOLD`` bytes uncompressed (RFC 7692 lets a
+sender choose per message; the shared compression context is untouched by
+uncompressed messages, so the browser's decoder stays in step).
+
+The subclasses override private methods of eventlet's `RFC6455WebSocket`
+and of Engine.IO's `WebSocketWSGI` (itself eventlet's), so eventlet is
+pinned in requirements.txt and tests/test_payload_budget.py checks that
+those methods are still there.
+
+Long-polling responses are compressed by Engine.IO itself, with the same
+threshold (``http_compression`` / ``compression_threshold``).
+"""
+import logging
+
+try:
+    from eventlet.websocket import RFC6455WebSocket
+    from engineio.async_drivers.eventlet import WebSocketWSGI
+except ImportError:  # optional: only the eventlet server speaks WebSocket here
+    RFC6455WebSocket = WebSocketWSGI = None
+
+logger = logging.getLogger(__name__)
+
+
+if WebSocketWSGI is not None:
+    class ThresholdWebSocket(RFC6455WebSocket):
+        """A WebSocket that deflates only messages of at least `threshold` bytes."""
+        threshold = 0
+        _small = False
+
+        def _pack_message(self, message, masked=False, continuation=False, final=True, control_code=None):
+            # The threshold is in bytes; a str is never shorter in UTF-8, so encode only near it
+            self._small = len(message) < self.threshold and (
+                not isinstance(message, str) or len(message.encode('utf-8')) < self.threshold)
+            try:
+                return super()._pack_message(message, masked=masked, continuation=continuation,
+                                             final=final, control_code=control_code)
+            finally:
+                self._small = False
+
+        def _get_permessage_deflate_enc(self):
+            if self._small:
+                return None
+            return super()._get_permessage_deflate_enc()
+
+    class ThresholdWebSocketWSGI(WebSocketWSGI):
+        """Engine.IO's eventlet WebSocket handler, with configurable deflate."""
+        compression = True
+        threshold = 0
+
+        def _negotiate_permessage_deflate(self, extensions):
+            if not self.compression:
+                return None
+            return super()._negotiate_permessage_deflate(extensions)
+
+        def _handle_hybi_request(self, environ):
+            ws = super()._handle_hybi_request(environ)
+            if isinstance(ws, RFC6455WebSocket):
+                ws.__class__ = ThresholdWebSocket
+                ws.threshold = self.threshold
+            return ws
+
+
+def install(server, enabled: bool, threshold: int) -> bool:
+    """Use thresholded WebSocket compression on a Socket.IO server.
+
+    Returns False (leaving the server as it is) unless it runs on eventlet.
+    """
+    if WebSocketWSGI is None or server.eio.async_mode != 'eventlet':
+        logger.info(f"WebSocket compression settings not applied (async mode {server.eio.async_mode})")
+        return False
+    server.eio._async = dict(server.eio._async, websocket=type(
+        'ThresholdWebSocketWSGI', (ThresholdWebSocketWSGI,), {'compression': enabled, 'threshold': threshold}))
+    logger.info(f"WebSocket compression {'on' if enabled else 'off'}, threshold {threshold} bytes")
+    return True
@@ -1,82 +1,403 @@
+import functools
 import logging
+from typing import Callable, Dict, List, Optional
 
 from flask import request
-from flask_socketio import emit, join_room
+from flask_socketio import ConnectionRefusedError, emit, join_room, leave_room, rooms
 
-from app import socketio
-from app.game_logic import game_manager
-from app.models import QuestionState
+from app import serialization, socketio
+from app.cluster import Cluster
+from app.qr import QRCodes
+from app.registry import ROLE_ROOMS, Game, GameRegistry, normalize_code
+from app.timers import TimerScheduler
 from config import Config
 
-active_timers = {}
+games = GameRegistry()
+timers = TimerScheduler(socketio.start_background_task, lambda: socketio.server.eio.create_event())
+# Join QR codes; create_app runs their generation off the event loop
+qr_codes = QRCodes()
+# Set by create_app when MESSAGE_QUEUE is configured (several workers)
+cluster: Optional[Cluster] = None
+# Handlers that may run on behalf of a client connected to another worker
+FORWARDABLE: Dict[str, Callable] = {}
+
+# Roles that render the board
+BOARD_ROLES = ('trebek', 'display')
 
 logger = logging.getLogger(__name__)
 
+
+def joined_rooms() -> List[str]:
+    """Rooms the requesting client has joined; for forwarded events, as reported by its worker."""
+    forwarded = getattr(request, 'forwarded_rooms', None)
+    return list(forwarded) if forwarded is not None else rooms()
+
+
+def join(room: str):
+    join_room(room)
+    forwarded = getattr(request, 'forwarded_rooms', None)
+    if forwarded is not None and room not in forwarded:
+        forwarded.append(room)
+
+
+def leave(room: str):
+    leave_room(room)
+    forwarded = getattr(request, 'forwarded_rooms', None)
+    if forwarded is not None and room in forwarded:
+        forwarded.remove(room)
+
+
+def current_game() -> Optional[Game]:
+    """Game of the requesting client, resolved from the rooms it has joined."""
+    return games.find_in(joined_rooms())
+
+
+def require_game() -> Optional[Game]:
+    """Like `current_game`, but tells the client when it has not joined a game."""
+    game = current_game()
+    if game is None:
+        logger.warning(f"Event from {request.sid} outside any game")
+        emit('error', {'message': 'Not in a game'})
+    return game
+
+
+def require_trebek(action: str) -> Optional[Game]:
+    """Current game if the requesting client is its Trebek; otherwise reports Unauthorized."""
+    game = require_game()
+    if game is None:
+        return None
+    if request.sid != game.manager.state.trebek_session_id:
+        logger.warning(f"Unauthorized {action} attempt from {request.sid}")
+        emit('error', {'message': 'Unauthorized'})
+        return None
+    return game
+
+
+def find_game(data) -> Optional[Game]:
+    """Game named by `data['game']`, else the client's current game, else the only hosted game."""
+    code = data.get('game') if isinstance(data, dict) else None
+    if code:
+        return games.get(code)
+    return current_game() or games.resolve()
+
+
+def current_role(game: Game) -> str:
+    """Role of the requesting client, from the game's session index or else the rooms it has joined."""
+    role = game.manager.session_role(request.sid)
+    if role is not None:
+        return role
+    joined = joined_rooms()
+    for role in ('trebek', 'display', 'player'):
+        room = game.role_room(role)
+        if room in joined or room + serialization.MSGPACK_ROOM_SUFFIX in joined:
+            return role
+    return 'spectator'
+
+
+def client_codec() -> str:
+    """'msgpack' if the requesting client asked for MessagePack payloads (?codec=msgpack) and the server sends them."""
+    if serialization.msgpack_enabled() and request.args.get('codec') == 'msgpack':
+        return 'msgpack'
+    return 'json'
+
+
+def enter_game(game: Game, role: str = 'spectator'):
+    """Move the requesting client into `game`'s rooms for `role`, leaving every other room."""
+    for room in joined_rooms():
+        if room != request.sid:
+            leave(room)
+    join(game.room)
+    # MessagePack clients get their role's payloads in a room of their own
+    suffix = serialization.MSGPACK_ROOM_SUFFIX if client_codec() == 'msgpack' else ''
+    join(game.role_room(role) + suffix)
+    game.manager.set_session_role(request.sid, role)
+
+
+def owned(handler: Callable) -> Callable:
+    """Run `handler` on the worker that owns the requester's game, forwarding it there if needed.
+
+    The game is the one named by ``data['game']``, else the one whose room
+    the client has joined. Without a cluster, or for games this worker owns
+    (or nobody owns yet), the handler runs here, restoring the game from
+    disk first if another worker left it behind.
+    """
+    FORWARDABLE[handler.__name__] = handler
+
+    @functools.wraps(handler)
+    def wrapper(*args):
+        if cluster is not None:
+            data = args[0] if args else None
+            code = normalize_code(data.get('game')) if isinstance(data, dict) else None
+            joined = rooms()
+            code = code or next((r for r in joined if normalize_code(r) == r), None)
+            owner = cluster.owner(code) if code else None
+            if owner is not None and owner != cluster.worker_id:
+                forward(owner, handler, args, joined)
+                return None
+            if code and code not in games:
+                # Unowned (its worker's lease lapsed) or ours from before a restart: take it over from disk
+                games.get(code)
+        return handler(*args)
+    return wrapper
+
+
+def forward(owner: str, handler: Callable, args, joined: Optional[List[str]] = None):
+    """Have worker `owner` run `handler(*args)` for the requesting client."""
+    logger.debug(f"Forwarding {handler.__name__} to worker {owner}")
+    cluster.forward(owner, {
+        'handler': handler.__name__,
+        'sid': request.sid,
+        'rooms': joined_rooms() if joined is None else joined,
+        'args': list(args),
+    })
+
+
+def run_forwarded(app, command: Dict):
+    """Run a command forwarded by another worker as if its client were connected here.
+
+    Replies and room changes for the client go out through the message
+    queue to the worker the client is connected to.
+    """
+    handler = FORWARDABLE.get(command.get('handler'))
+    if handler is None:
+        logger.warning(f"Ignoring forwarded command for unknown handler: {command.get('handler')}")
+        return
+    with app.test_request_context('/'):
+        request.sid = command['sid']
+        request.namespace = '/'
+        request.forwarded_rooms = list(command['rooms'])
+        handler(*command['args'])
+
+
+def emit_payload(event: str, payload, room: str):
+    """Broadcast a payload to `room`: JSON to its JSON clients, MessagePack to the rest.
+
+    Every broadcast to a role room goes through here, since MessagePack
+    clients only join the role's ``:msgpack`` room.
+    """
+    socketio.emit(event, payload, to=room)
+    if serialization.msgpack_enabled():
+        socketio.emit(event, serialization.packb(payload), to=room + serialization.MSGPACK_ROOM_SUFFIX)
+
+
+def send_payload(event: str, payload):
+    """Send a state payload to the requesting client in the encoding it asked for."""
+    emit(event, serialization.packb(payload) if client_codec() == 'msgpack' else payload)
+
+
+def broadcast_state(game: Game):
+    """Broadcast whatever changed since the last broadcast as per-role game_patches."""
+    # Hold the game lock so sequence numbers go out in the order they were assigned
+    with game.manager.lock:
+        patches = game.channels.update(game.manager.get_game_summary(), game.manager.version)
+        for role, patch in patches.items():
+            emit_payload('game_patch', patch, game.role_room(role))
+
+
+def schedule_broadcast(game: Game):
+    """Broadcast the game's state at the next tick instead of now.
+
+    Every change made before the tick goes out together as one game_patch
+    per role, so the outbound message rate stays bounded however fast
+    joins or buzzes arrive. Latency-critical changes (buzzing opening, the
+    first buzz, host actions) call `broadcast_state` directly instead.
+    """
+    if Config.BROADCAST_TICK <= 0:
+        broadcast_state(game)
+        return
+    name = game.timer_name('broadcast')
+    if not timers.pending(name):
+        timers.schedule(name, Config.BROADCAST_TICK, broadcast_state, game)
+
+
+def send_state(game: Game):
+    """Send a full game_update snapshot for its role to the requesting client.
+
+    The snapshot is the state last broadcast; changes still waiting for a
+    broadcast tick reach the client as the next patch.
+    """
+    with game.manager.lock:
+        if game.channels.version is None:
+            broadcast_state(game)
+        send_payload('game_update', game.channels.snapshot_payload(current_role(game)))
+
+
+def broadcast_disconnects(game: Game):
+    """Broadcast player disconnects after a short delay, so a burst of them goes out as one update."""
+    name = game.timer_name('disconnects')
+    if not timers.pending(name):
+        timers.schedule(name, Config.DISCONNECT_BROADCAST_DELAY, broadcast_state, game)
+
+
+def current_round(game: Game) -> Optional[int]:
+    """Round being played, or None outside a round."""
+    phase = game.manager.state.phase.value
+    return {'round_1': 1, 'round_2': 2}.get(phase)
+
+
+def broadcast_board(game: Game, round_num: int):
+    """Send the board layout for a round to every client of the game that renders it."""
+    with game.manager.lock:
+        board = game.manager.get_board(round_num)
+        for role in BOARD_ROLES:
+            emit_payload('board_update', board.payload(role), game.role_room(role))
+        game.board_versions[round_num] = board.version
+
+
+def broadcast_board_changes(game: Game, round_num: int):
+    """Send the cells changed since the last board broadcast as ``cell_used`` events.
+
+    Falls back to the whole layout when the changes are no longer kept (or
+    the board was rebuilt).
+    """
+    with game.manager.lock:
+        board = game.manager.get_board(round_num)
+        last = game.board_versions.get(round_num)
+        changes = board.changes_since(last) if last is not None else None
+        if changes is None:
+            broadcast_board(game, round_num)
+            return
+        for change in changes:
+            for role in BOARD_ROLES:
+                emit_payload('cell_used', change, game.role_room(role))
+        game.board_versions[round_num] = board.version
+
+
+def send_board(game: Game, round_num: int):
+    """Send the board layout for a round to the requesting client.
+
+    The board rooms are brought up to date first, so the cell_used events
+    that follow apply on top of this layout.
+    """
+    with game.manager.lock:
+        if round_num in game.board_versions:
+            broadcast_board_changes(game, round_num)
+        send_payload('board_update', game.manager.get_board_payload(round_num, current_role(game)))
+
+
+def connection_count() -> int:
+    """Socket.IO sessions connected to this worker, including one being connected."""
+    return len(socketio.server.manager.rooms.get('/', {}).get(None, ()))
+
+
 @socketio.on('connect')
 def handle_connect():
+    if Config.MAX_CONNECTIONS and connection_count() > Config.MAX_CONNECTIONS:
+        logger.warning(f"Refusing connection from {request.remote_addr}: {Config.MAX_CONNECTIONS} already connected")
+        raise ConnectionRefusedError('Server is full')
     logger.info(f"Client connected: session_id={request.sid}, address={request.remote_addr}")
     emit('connection_response', {'status': 'connected', 'sid': request.sid})
-    # Send current game state to newly connected client
-    emit('game_update', game_manager.get_game_summary())
+    # Clients name their game in the connection query (?game=CODE)
+    code = request.args.get('game')
+    if code or games.resolve() is not None:
+        # Join the game as a spectator and send it the current game state
+        handle_request_game_state({'game': code} if code else None)
 
 
 @socketio.on('request_game_state')
-def handle_request_game_state():
+@owned
+def handle_request_game_state(data=None):
     """Client requests current game state."""
-    emit('game_update', game_manager.get_game_summary())
+    game = current_game()
+    if game is None:
+        game = find_game(data)
+        if game is None:
+            emit('error', {'message': 'Game not found'})
+            return
+        enter_game(game)
+    send_state(game)
 
 
 @socketio.on('disconnect')
+@owned
 def handle_disconnect():
     logger.info(f"Client disconnected: {request.sid}")
+    game = current_game()
     # Mark player as disconnected
-    for player in game_manager.state.players.values():
-        if player.session_id == request.sid:
-            player.connected = False
-            emit('game_update', game_manager.get_game_summary(), broadcast=True)
-            break
+    if game is not None and game.manager.disconnect_session(request.sid):
+        broadcast_disconnects(game)
 
 
 @socketio.on('register_trebek')
-def handle_register_trebek():
-    """Register Trebek user."""
-    game_manager.set_trebek(request.sid)
-    game_manager.load_questions()
-    join_room('trebek')
-    emit('registration_success', {'role': 'trebek'})
-    emit('game_update', game_manager.get_game_summary())
+@owned
+def handle_register_trebek(data=None):
+    """Register Trebek user, hosting a new game unless rejoining an existing code."""
+    requested = data.get('game') if isinstance(data, dict) else None
+    claim = None
+    if cluster is not None:
+        # Codes owned by another worker are never hosted here as a second copy
+        claim = lambda code: cluster.claim(code) == cluster.worker_id  # noqa: E731
+    game = games.host(requested, claim=claim)
+    if game is None:
+        # Another worker took the requested code first; it hosts the game
+        owner = cluster.owner(requested)
+        if owner is None:
+            emit('error', {'message': 'Game not available'})
+        else:
+            forward(owner, handle_register_trebek, (data,))
+        return
+    qr_codes.prepare(game.code)
+    game.manager.set_trebek(request.sid)
+    if not Config.QUESTION_LIBRARY:
+        game.manager.load_questions()
+    enter_game(game, 'trebek')
+    emit('registration_success', {'role': 'trebek', 'game': game.code})
+    send_state(game)
 
 
 @socketio.on('register_display')
-def handle_register_display():
+@owned
+def handle_register_display(data=None):
     """Register display screen."""
-    join_room('display')
-    emit('registration_success', {'role': 'display'})
-    emit('game_update', game_manager.get_game_summary())
+    game = find_game(data)
+    if game is None:
+        emit('error', {'message': 'Game not found'})
+        return
+
+    enter_game(game, 'display')
+    emit('registration_success', {'role': 'display', 'game': game.code})
+    send_state(game)
 
     # Send current board if in a round
-    if game_manager.state.phase.value in ['round_1', 'round_2']:
-        round_num = 1 if game_manager.state.phase.value == 'round_1' else 2
-        emit('board_update', {
-            'round': round_num,
-            'board': game_manager.get_board_state(round_num)
-        })
+    round_num = current_round(game)
+    if round_num is not None:
+        send_board(game, round_num)
+
+
+@socketio.on('request_board')
+@owned
+def handle_request_board(data=None):
+    """Board client asks for the whole layout again (after missing a cell_used event)."""
+    game = require_game()
+    if game is None:
+        return
+    round_num = current_round(game)
+    if round_num is None or current_role(game) not in BOARD_ROLES:
+        return
+    logger.debug(f"Board resync for {request.sid} in {game.code}")
+    send_board(game, round_num)
 
 
 @socketio.on('create_team')
+@owned
 def handle_create_team(data):
     """Create a new team."""
+    game = require_game()
+    if game is None:
+        return
+
     team_name = data.get('name', '').strip()
     if not team_name:
         emit('error', {'message': 'Team name required'})
         return
 
-    team = game_manager.create_team(team_name)
-    logger.info(f"Team created: {team.name} (ID: {team.id})")
-    emit('game_update', game_manager.get_game_summary(), broadcast=True)
+    team = game.manager.create_team(team_name)
+    logger.info(f"Team created in {game.code}: {team.name} (ID: {team.id})")
+    schedule_broadcast(game)
 
 
 @socketio.on('join_game')
+@owned
 def handle_join_game(data):
     """Player joins a team."""
     player_name = data.get('name', '').strip()
@@ -89,128 +410,154 @@ def handle_join_game(data):
         emit('error', {'message': 'Name and team required'})
         return
 
-    player = game_manager.add_player(player_name, team_id, request.sid)
+    game = find_game(data)
+    if game is None:
+        emit('error', {'message': 'Game not found'})
+        return
+
+    player = game.manager.add_player(player_name, team_id, request.sid)
     if not player:
         logger.warning(f"Player {player_name} failed to join team {team_id}: invalid team")
         emit('error', {'message': 'Invalid team'})
         return
 
-    logger.info(f"Player {player_name} (ID: {player.id}) successfully joined team {team_id}")
-    join_room('players')
-    join_room(team_id)
+    logger.info(f"Player {player_name} (ID: {player.id}) successfully joined team {team_id} in {game.code}")
+    schedule_broadcast(game)
+    enter_game(game, 'player')
+    join(game.team_room(team_id))
 
     emit('registration_success', {
         'role': 'player',
+        'game': game.code,
         'player_id': player.id,
-        'team_id': team_id
+        'team_id': team_id,
+        'token': player.token
     })
-    emit('game_update', game_manager.get_game_summary(), broadcast=True)
+    send_state(game)
 
 
 @socketio.on('reconnect_player')
+@owned
 def handle_reconnect_player(data):
-    """Player attempts to reconnect with existing ID."""
+    """Player attempts to reconnect with the ID and token it was given when it joined this game."""
     player_id = data.get('player_id')
     team_id = data.get('team_id')
+    token = data.get('token')
 
     logger.info(f"Reconnection attempt: player_id={player_id}, team_id={team_id}, session_id={request.sid}")
 
-    # Verify player exists
-    player = game_manager.state.players.get(player_id)
-    if player and player.team_id == team_id:
-        # Update session ID and mark as connected
-        old_session = player.session_id
-        player.session_id = request.sid
-        player.connected = True
-
-        logger.info(f"Player {player.name} reconnected: {old_session} → {request.sid}")
-        join_room('players')
-        join_room(team_id)
+    # Verify player exists, then update session ID and mark as connected
+    game = find_game(data)
+    player = game.manager.reconnect_player(player_id, team_id, request.sid, token) if game else None
+    if player:
+        schedule_broadcast(game)
+        enter_game(game, 'player')
+        join(game.team_room(team_id))
 
         emit('registration_success', {
             'role': 'player',
+            'game': game.code,
             'player_id': player.id,
-            'team_id': team_id
+            'team_id': team_id,
+            'token': player.token
         })
-        emit('game_update', game_manager.get_game_summary(), broadcast=True)
+        send_state(game)
     else:
         # Player not found or invalid - clear localStorage on client
-        logger.warning(f"Reconnection failed: player_id={player_id} not found or team_id mismatch")
         emit('reconnect_failed')
 
 
 @socketio.on('start_round')
+@owned
 def handle_start_round(data):
     """Start a game round."""
-    if request.sid != game_manager.state.trebek_session_id:
-        logger.warning(f"Unauthorized start_round attempt from {request.sid}")
-        emit('error', {'message': 'Unauthorized'})
+    game = require_trebek('start_round')
+    if game is None:
         return
 
     round_num = data.get('round', 1)
-    logger.info(f"Trebek starting round {round_num}")
-    game_manager.start_round(round_num)
+    logger.info(f"Trebek starting round {round_num} in {game.code}")
+    with game.manager.lock:
+        board_source = game.manager.board_source
+        loaded = True
+        if Config.QUESTION_LIBRARY and (board_source is None or board_source[0] != round_num):
+            loaded = game.manager.load_board(round_num)
+        if loaded:
+            game.manager.start_round(round_num)
+    if not loaded:
+        logger.warning(f"Round {round_num} not started in {game.code}: its board could not be loaded")
+        emit('error', {'message': f'Could not load the board for round {round_num}'})
+        return
 
-    emit('game_update', game_manager.get_game_summary(), broadcast=True)
-    emit('board_update', {
-        'round': round_num,
-        'board': game_manager.get_board_state(round_num)
-    }, broadcast=True)
+    broadcast_state(game)
+    broadcast_board(game, round_num)
 
 
 @socketio.on('select_question')
+@owned
 def handle_select_question(data):
     """Trebek selects a question."""
-    if request.sid != game_manager.state.trebek_session_id:
-        logger.warning(f"Unauthorized select_question attempt from {request.sid}")
-        emit('error', {'message': 'Unauthorized'})
+    game = require_trebek('select_question')
+    if game is None:
         return
 
     category = data.get('category')
     value = data.get('value')
 
-    logger.info(f"Trebek selecting question: {category} ${value}")
-    question = game_manager.select_question(category, value)
+    logger.info(f"Trebek selecting question in {game.code}: {category} ${value}")
+    question = game.manager.select_question(category, value)
     if not question:
         logger.warning(f"Question selection failed: {category} ${value} not available")
         emit('error', {'message': 'Question not available'})
         return
 
-    emit('game_update', game_manager.get_game_summary(), broadcast=True)
+    broadcast_state(game)
 
-    # Start buzz delay timer
-    def enable_buzzing_callback():
-        import time
-        time.sleep(Config.BUZZ_DELAY_SECONDS)
-        game_manager.enable_buzzing()
-        logger.debug(f"Buzz delay ({Config.BUZZ_DELAY_SECONDS}s) expired, buzzing now enabled")
-        socketio.emit('game_update', game_manager.get_game_summary())
+    # Start buzz delay timer; replaces any timer left over from a previous question
+    timers.schedule(game.timer_name('buzz_delay'), Config.BUZZ_DELAY_SECONDS, open_buzzing, game, question)
 
-    socketio.start_background_task(enable_buzzing_callback)
+
+def open_buzzing(game: Game, question):
+    """Buzz delay expired: open buzzing if `question` is still the one on screen."""
+    if game.manager.enable_buzzing(question):
+        logger.debug(f"Buzz delay ({Config.BUZZ_DELAY_SECONDS}s) expired in {game.code}, buzzing now enabled")
+        broadcast_state(game)
 
 
 @socketio.on('buzz')
+@owned
 def handle_buzz(data):
     """Player buzzes in."""
+    game = require_game()
+    if game is None:
+        return
+
     player_id = data.get('player_id')
 
-    success = game_manager.buzz_in(player_id)
+    with game.manager.lock:
+        success = game.manager.buzz_in(player_id)
+        first = success and len(game.manager.state.buzz_queue) == 1
     if success:
         logger.debug(f"Buzz accepted for player {player_id}")
-        emit('game_update', game_manager.get_game_summary(), broadcast=True)
+        # Everyone waits to see who buzzed first; later buzzes only extend the queue
+        if first:
+            broadcast_state(game)
+        else:
+            schedule_broadcast(game)
     else:
         logger.debug(f"Buzz rejected for player {player_id}")
         emit('buzz_rejected', {'reason': 'Already buzzed or team already attempted'})
 
 
 @socketio.on('adjudicate')
+@owned
 def handle_adjudicate(data):
     """Trebek adjudicates an answer."""
-    if request.sid != game_manager.state.trebek_session_id:
-        logger.warning(f"Unauthorized adjudication attempt from {request.sid}")
-        emit('error', {'message': 'Unauthorized'})
+    game = require_trebek('adjudication')
+    if game is None:
         return
 
+    gm = game.manager
     correct = data.get('correct', False)
 
     # Prepare defaults to avoid referencing undefined variables
@@ -218,27 +565,29 @@ def handle_adjudicate(data):
     team_id = None
     old_score = None
 
-    # Get current buzzer info before adjudication if present
-    if game_manager.state.buzz_queue:
-        current_buzzer = game_manager.state.buzz_queue[0]
-        player_name = getattr(current_buzzer, 'player_name', None)
-        team_id = getattr(current_buzzer, 'team_id', None)
-        team = game_manager.state.teams.get(team_id) if team_id else None
-        if team:
-            old_score = team.score
-
-    # Perform adjudication which updates game state
-    next_player_id, score_change = game_manager.adjudicate_answer(correct)
-
-    # Determine authoritative new score if we have a team_id
-    new_score = None
-    if team_id:
-        team_after = game_manager.state.teams.get(team_id)
-        if team_after:
-            new_score = team_after.score
-
-    # Always broadcast updated game state so Trebek/Jennings see changes
-    emit('game_update', game_manager.get_game_summary(), broadcast=True)
+    # Hold the game lock so no buzz or other command lands between these steps
+    with gm.lock:
+        # Get current buzzer info before adjudication if present
+        if gm.state.buzz_queue:
+            current_buzzer = gm.state.buzz_queue[0]
+            player_name = gm.player_name(current_buzzer.player_id)
+            team_id = current_buzzer.team_id
+            team = gm.state.teams.get(team_id) if team_id else None
+            if team:
+                old_score = team.score
+
+        # Perform adjudication which updates game state
+        next_player_id, score_change = gm.adjudicate_answer(correct)
+
+        # Determine authoritative new score if we have a team_id
+        new_score = None
+        if team_id:
+            team_after = gm.state.teams.get(team_id)
+            if team_after:
+                new_score = team_after.score
+
+        # Always broadcast updated game state so Trebek/Jennings see changes
+        broadcast_state(game)
 
     # Send score update to display when we have a valid team to report on
     if team_id:
@@ -251,40 +600,70 @@ def handle_adjudicate(data):
             'new_score': new_score
         }
         logger.debug(f"Emitting score_update to display: {payload}")
-        emit('score_update', payload, to='display')
+        emit_payload('score_update', payload, game.role_room('display'))
     else:
         if correct and not team_id:
             logger.warning("Adjudication marked correct but no buzzer/team found; skipping score_update emit")
 
-    # If question ended (no current question), update the board for all displays
-    current_round = 1 if game_manager.state.phase.value == 'round_1' else 2
-    if game_manager.state.current_question is None:
-        emit('board_update', {
-            'round': current_round,
-            'board': game_manager.get_board_state(current_round)
-        }, broadcast=True)
+    # If question ended (no current question), mark its cell used on every board
+    if gm.state.current_question is None and current_round(game) is not None:
+        broadcast_board_changes(game, current_round(game))
 
 
 @socketio.on('skip_question')
+@owned
 def handle_skip_question():
     """Trebek manually skips the current question and returns to the board."""
-    if request.sid != game_manager.state.trebek_session_id:
-        logger.warning(f"Unauthorized skip_question attempt from {request.sid}")
-        emit('error', {'message': 'Unauthorized'})
+    game = require_trebek('skip_question')
+    if game is None:
         return
 
-    logger.info("Trebek skipping current question")
+    logger.info(f"Trebek skipping current question in {game.code}")
 
     # Clear current question and reset relevant state
-    game_manager.state.current_question = None
-    game_manager.state.buzz_queue = []
-    game_manager.state.teams_attempted = []
-    game_manager.state.question_state = QuestionState.BOARD_ACTIVE
+    timers.cancel(game.timer_name('buzz_delay'))
+    game.manager.skip_question()
 
     # Broadcast updates so all clients return to board
-    emit('game_update', game_manager.get_game_summary(), broadcast=True)
-    current_round = 1 if game_manager.state.phase.value == 'round_1' else 2
-    emit('board_update', {
-        'round': current_round,
-        'board': game_manager.get_board_state(current_round)
-    }, broadcast=True)
+    broadcast_state(game)
+    if current_round(game) is not None:
+        broadcast_board_changes(game, current_round(game))
+
+
+def cancel_timers(game: Game):
+    for name in ('buzz_delay', 'broadcast', 'disconnects'):
+        timers.cancel(game.timer_name(name))
+
+
+def lose_game(code: str):
+    """Stop hosting a game whose ownership lapsed and another worker took over; its clients stay in its rooms."""
+    game = games.get(code) if code in games else None
+    if game is not None:
+        cancel_timers(game)
+        games.drop(code)
+
+
+def end_game(game: Game):
+    """Tell the game's clients it is over, then stop hosting it and free its code."""
+    socketio.emit('game_ended', {'game': game.code}, to=game.room)
+    cancel_timers(game)
+    role_rooms = [game.role_room(role) for role in ROLE_ROOMS]
+    team_rooms = [game.team_room(team_id) for team_id in game.manager.state.teams]
+    for room in [game.room] + role_rooms + [r + serialization.MSGPACK_ROOM_SUFFIX for r in role_rooms] + team_rooms:
+        socketio.close_room(room)
+    qr_codes.discard(game.code)
+    games.remove(game.code)
+    if cluster is not None:
+        cluster.release(game.code)
+
+
+@socketio.on('end_game')
+@owned
+def handle_end_game():
+    """Trebek ends the game; the host page then starts a new one under a fresh code."""
+    game = require_trebek('end_game')
+    if game is None:
+        return
+
+    logger.info(f"Trebek ending game {game.code}")
+    end_game(game)
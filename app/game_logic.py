@@ -1,39 +1,89 @@
-import csv
+import functools
 import logging
+import secrets
+import threading
 import time
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, List, Tuple
 
+from app import question_bank, question_library
 from app.models import GameState, Team, Player, Question, BuzzEntry, GamePhase, QuestionState
+from app.question_index import QuestionIndex, RoundBoard
+from app.serialization import PreEncoded
 from config import Config
 
 logger = logging.getLogger(__name__)
 
 
+def synchronized(method):
+    """Run a GameManager method while holding the game's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class GameManager:
+    """Owns one game's state.
+
+    Every public method that reads or changes state runs under `lock`, a
+    per-game re-entrant lock, so concurrent Socket.IO handlers and background
+    tasks see each command applied atomically and in a single order. Callers
+    that need several steps to be atomic (read the buzz queue, adjudicate,
+    then read the score) hold `lock` around the whole sequence.
+    """
+
     def __init__(self):
         logger.debug("Initializing GameManager")
+        self.lock = threading.RLock()
         self.state = GameState()
         self._team_colors = ["#FFD700", "#4169E1", "#DC143C", "#32CD32", "#FF8C00", "#9370DB"]
         self._next_color_idx = 0
-
+        self._index: Optional[QuestionIndex] = None
+        # Source key of the loaded bank and the list loaded from it (see load_questions)
+        self._bank_key = None
+        self._bank_questions = None
+        # (question list, content digest), kept by app/snapshot.py
+        self.questions_digest: Optional[Tuple[List[Question], bytes]] = None
+        # (round, question ids) of a board loaded from the question library
+        self.board_source: Optional[Tuple[int, List[int]]] = None
+        # Bumped on every state change; cached summaries are keyed by it
+        self.version = 0
+        self._summary: Optional[Dict] = None
+        self._summary_version = -1
+        # Command journal (app/journal.py), attached by the game registry
+        self.journal = None
+        self.journal_seq = 0
+        # Socket.IO session id -> player id, and -> role ('trebek', 'display', 'player', 'spectator')
+        self._session_players: Dict[str, str] = {}
+        self._session_roles: Dict[str, str] = {}
+
+    def _record(self, op: str, *args):
+        """Append a command that has just been applied to the journal, if any."""
+        if self.journal is not None:
+            self.journal_seq += 1
+            self.journal.append({'seq': self.journal_seq, 'op': op, 'args': list(args)})
+
+    @synchronized
+    def mark_dirty(self):
+        """Record a state change so cached summaries are rebuilt on next read.
+
+        GameManager methods call this themselves; code that edits `state`
+        directly must call it too.
+        """
+        self.version += 1
+
+    @synchronized
     def load_questions(self) -> bool:
-        """Load questions from CSV file."""
+        """Load questions from the questions file (via its compiled bank, see app/question_bank.py).
+
+        Does nothing if this bank is already loaded and unchanged, so used
+        questions stay used when the host reconnects. If the file changed,
+        questions that are still in it keep their used flags.
+        """
         logger.info(f"Loading questions from {Config.QUESTIONS_FILE}")
         try:
-            with open(Config.QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                self.state.questions = []
-                for row in reader:
-                    q = Question(
-                        round=int(row['Round']),
-                        category=row['Category'],
-                        value=int(row['Value']),
-                        question=row['Question'],
-                        answer=row['Answer']
-                    )
-                    self.state.questions.append(q)
-            logger.info(f"Successfully loaded {len(self.state.questions)} questions")
-            return len(self.state.questions) > 0
+            bank = question_bank.load_bank(Config.QUESTIONS_FILE)
         except FileNotFoundError:
             logger.error(f"Questions file not found at {Config.QUESTIONS_FILE}")
             return False
@@ -41,6 +91,58 @@ class GameManager:
             logger.error(f"Error loading questions: {e}", exc_info=True)
             return False
 
+        if bank.key == self._bank_key and self.state.questions is self._bank_questions and len(bank):
+            logger.info(f"Questions unchanged, keeping {len(bank)} loaded questions")
+            return True
+
+        # Carry used flags over by (round, category, value, text); only cells with a used question get decoded
+        used: Dict[Tuple[int, str, int], set] = {}
+        for q in self.state.questions:
+            if q.used:
+                used.setdefault((q.round, q.category, q.value), set()).add(q.question)
+        questions = bank.questions()
+        if used:
+            for q in questions:
+                texts = used.get((q.round, q.category, q.value))
+                if texts and q.question in texts:
+                    q.used = True
+        self.state.questions = questions
+        self._bank_key, self._bank_questions = bank.key, questions
+        self.board_source = None
+        self.mark_dirty()
+        self._index = QuestionIndex(questions)
+        self._record('load_questions')
+        logger.info(f"Successfully loaded {len(questions)} questions")
+        return len(questions) > 0
+
+    @synchronized
+    def load_board(self, round_num: int, question_ids: Optional[List[int]] = None) -> bool:
+        """Load one round's board from the question library, replacing the loaded questions.
+
+        Without `question_ids`, samples ``BOARD_CATEGORIES`` categories x the
+        round's ``BOARD_VALUES`` from ``Config.QUESTION_LIBRARY``. The chosen
+        ids are journaled, so replay loads the same board.
+        """
+        try:
+            library = question_library.open_library(Config.QUESTION_LIBRARY)
+            if question_ids is None:
+                question_ids = library.sample_board(round_num, Config.BOARD_CATEGORIES,
+                                                    Config.BOARD_VALUES.get(round_num, []))
+            questions = library.fetch(question_ids)
+        except Exception as e:
+            logger.error(f"Error loading round {round_num} board from {Config.QUESTION_LIBRARY}: {e}")
+            return False
+
+        self.state.questions = questions
+        self._bank_key = self._bank_questions = None
+        self.board_source = (round_num, list(question_ids))
+        self.mark_dirty()
+        self._index = QuestionIndex(questions)
+        self._record('load_board', round_num, list(question_ids))
+        logger.info(f"Round {round_num} board loaded from library: {len(questions)} questions")
+        return len(questions) > 0
+
+    @synchronized
     def create_team(self, name: str) -> Team:
         """Create a new team."""
         team_id = f"team_{len(self.state.teams) + 1}"
@@ -49,29 +151,43 @@ class GameManager:
 
         team = Team(id=team_id, name=name, color=color)
         self.state.teams[team_id] = team
+        self.mark_dirty()
+        self._record('create_team', name)
         logger.info(f"Team created: {name} (ID: {team_id}, Color: {color})")
         return team
 
-    def add_player(self, name: str, team_id: str, session_id: str) -> Optional[Player]:
-        """Add a player to a team."""
+    @synchronized
+    def add_player(self, name: str, team_id: str, session_id: str, token: Optional[str] = None) -> Optional[Player]:
+        """Add a player to a team, with a fresh reconnect `token` unless one is given (journal replay)."""
         if team_id not in self.state.teams:
             logger.warning(f"Player {name} failed to join: team {team_id} does not exist")
             return None
 
         player_id = f"player_{len(self.state.players) + 1}"
-        player = Player(id=player_id, name=name, team_id=team_id, session_id=session_id)
+        token = token or secrets.token_urlsafe(16)
+        player = Player(id=player_id, name=name, team_id=team_id, session_id=session_id, token=token)
 
         self.state.players[player_id] = player
         self.state.teams[team_id].player_ids.append(player_id)
+        self._session_players[session_id] = player_id
+        self._session_roles[session_id] = 'player'
+        self.mark_dirty()
+        self._record('add_player', name, team_id, session_id, token)
 
         logger.info(f"Player added: {name} (ID: {player_id}) to team {team_id}")
         return player
 
+    @synchronized
     def set_trebek(self, session_id: str):
         """Set the Trebek session."""
+        previous = self.state.trebek_session_id
+        if previous is not None and self._session_roles.get(previous) == 'trebek':
+            del self._session_roles[previous]
         self.state.trebek_session_id = session_id
+        self._session_roles[session_id] = 'trebek'
         logger.info(f"Trebek registered with session ID: {session_id}")
 
+    @synchronized
     def start_round(self, round_num: int):
         """Start a game round."""
         if round_num == 1:
@@ -79,58 +195,76 @@ class GameManager:
         elif round_num == 2:
             self.state.phase = GamePhase.ROUND_2
         self.state.question_state = QuestionState.BOARD_ACTIVE
-        logger.info(f"Round {round_num} started")
+        self.mark_dirty()
+        self._record('start_round', round_num)
+        board = self.question_index.board(round_num)
+        logger.info(f"Round {round_num} started (board v{board.version})")
+
+    @property
+    def question_index(self) -> QuestionIndex:
+        """Index over `state.questions`, rebuilt if the list was replaced."""
+        questions = self.state.questions
+        if self._index is None or self._index.questions is not questions or self._index.size != len(questions):
+            self._index = QuestionIndex(questions)
+        return self._index
+
+    def get_board(self, round_num: int) -> RoundBoard:
+        """Get the live board object for a round."""
+        return self.question_index.board(round_num)
 
     def get_board_state(self, round_num: int) -> Dict:
-        """Get the current board state for a round."""
-        round_questions = [q for q in self.state.questions if q.round == round_num]
-
-        # Organize by category
-        categories = {}
-        for q in round_questions:
-            if q.category not in categories:
-                categories[q.category] = []
-            categories[q.category].append({
-                'value': q.value,
-                'used': q.used,
-                'question': q.question,
-                'answer': q.answer
-            })
+        """Get the current board state for a round.
 
-        # Sort values within each category
-        for cat in categories:
-            categories[cat].sort(key=lambda x: x['value'])
+        The returned dict is the board's live state; treat it as read-only.
+        """
+        return self.get_board(round_num).categories
 
-        return categories
+    def get_board_payload(self, round_num: int, role: str = 'trebek') -> PreEncoded:
+        """Get the encoded board_update message for a round as seen by `role`."""
+        return self.get_board(round_num).payload(role)
 
+    @synchronized
     def select_question(self, category: str, value: int) -> Optional[Question]:
         """Select a question from the board."""
         current_round = 1 if self.state.phase == GamePhase.ROUND_1 else 2
 
-        for q in self.state.questions:
-            if (q.round == current_round and
-                    q.category == category and
-                    q.value == value and
-                    not q.used):
-                q.used = True
-                self.state.current_question = q
-                self.state.question_state = QuestionState.QUESTION_REVEALED
-                self.state.buzz_queue = []
-                self.state.teams_attempted = []
-                self.state.buzz_timer_active = True
-                logger.info(f"Question selected: R{current_round} {category} ${value}")
-                logger.debug(f"Question text: {q.question}, Answer: {q.answer}")
-                return q
-
-        logger.warning(f"Question not found or already used: R{current_round} {category} ${value}")
-        return None
-
-    def enable_buzzing(self):
-        """Enable buzzing after timer expires."""
+        q = self.question_index.find(current_round, category, value)
+        if q is None:
+            logger.warning(f"Question not found or already used: R{current_round} {category} ${value}")
+            return None
+
+        q.used = True
+        self.state.current_question = q
+        self.state.question_state = QuestionState.QUESTION_REVEALED
+        self.state.buzz_queue.clear()
+        self.state.teams_attempted.clear()
+        self.state.buzz_timer_active = True
+        self.mark_dirty()
+        self._record('select_question', category, value)
+        logger.info(f"Question selected: R{current_round} {category} ${value}")
+        logger.debug(f"Question text: {q.question}, Answer: {q.answer}")
+        return q
+
+    @synchronized
+    def enable_buzzing(self, question: Optional[Question] = None) -> bool:
+        """Enable buzzing after timer expires.
+
+        If `question` is given, buzzing only opens while that question is still
+        the revealed current question, so a stale timer cannot reopen buzzing
+        after a skip or a reselect.
+        """
+        if question is not None and (self.state.current_question is not question or
+                                     self.state.question_state != QuestionState.QUESTION_REVEALED):
+            logger.debug(f"Ignoring stale buzz timer for {question.category} ${question.value}")
+            return False
         self.state.question_state = QuestionState.BUZZING_OPEN
         self.state.buzz_timer_active = False
+        self.mark_dirty()
+        self._record('enable_buzzing')
         logger.debug("Buzzing enabled")
+        return True
 
+    @synchronized
     def buzz_in(self, player_id: str) -> bool:
         """Player attempts to buzz in."""
         player = self.state.players.get(player_id)
@@ -149,31 +283,31 @@ class GameManager:
             return False
 
         # Check if player already in queue
-        if any(entry.player_id == player_id for entry in self.state.buzz_queue):
+        if self.state.buzz_queue.has_player(player_id):
             logger.debug(f"Buzz rejected for {player.name}: already in queue")
             return False
 
         team = self.state.teams[player.team_id]
-        entry = BuzzEntry(
-            player_id=player_id,
-            player_name=player.name,
-            team_id=player.team_id,
-            team_name=team.name,
-            timestamp=time.time()
-        )
+        entry = BuzzEntry(player_id=player_id, team_id=player.team_id, timestamp=time.monotonic_ns())
 
         self.state.buzz_queue.append(entry)
+        self.mark_dirty()
+        self._record('buzz_in', player_id)
         logger.info(f"Player buzzed: {player.name} ({team.name}), queue position: {len(self.state.buzz_queue)}")
         return True
 
+    @synchronized
     def adjudicate_answer(self, correct: bool) -> Tuple[Optional[str], int]:
         """Adjudicate the current answer. Returns (next_player_id, score_change)."""
         if not self.state.current_question or not self.state.buzz_queue:
             logger.warning("Adjudication attempted with no current question or buzz queue")
             return None, 0
 
+        self.mark_dirty()
+        self._record('adjudicate_answer', correct)
         current_buzzer = self.state.buzz_queue[0]
         team = self.state.teams[current_buzzer.team_id]
+        player_name = self.player_name(current_buzzer.player_id)
         value = self.state.current_question.value
 
         if correct:
@@ -181,23 +315,20 @@ class GameManager:
             old_score = team.score
             team.score += value
             self.state.current_question = None
-            self.state.buzz_queue = []
-            self.state.teams_attempted = []
+            self.state.buzz_queue.clear()
+            self.state.teams_attempted.clear()
             self.state.question_state = QuestionState.BOARD_ACTIVE
-            logger.info(f"Answer correct: {current_buzzer.player_name} ({team.name}) +${value} (${old_score} → ${team.score})")
+            logger.info(f"Answer correct: {player_name} ({team.name}) +${value} (${old_score} → ${team.score})")
             return None, value
         else:
             # Wrong answer - deduct points and move to next buzzer
             old_score = team.score
             team.score -= value
-            logger.info(f"Answer incorrect: {current_buzzer.player_name} ({team.name}) -${value} (${old_score} → ${team.score})")
+            logger.info(f"Answer incorrect: {player_name} ({team.name}) -${value} (${old_score} → ${team.score})")
 
-            # Add team to attempted list if not already present
-            if current_buzzer.team_id not in self.state.teams_attempted:
-                self.state.teams_attempted.append(current_buzzer.team_id)
-
-            # Loop through the buzz queue. If a player from a team that has already attempted is found, remove them.
-            self.state.buzz_queue = [entry for entry in self.state.buzz_queue if entry.team_id not in self.state.teams_attempted]
+            # Mark the team as attempted and drop all of its queued players
+            self.state.teams_attempted.add(current_buzzer.team_id)
+            self.state.buzz_queue.drop_team(current_buzzer.team_id)
 
             if self.state.buzz_queue:
                 # More people in queue - next buzzer answers
@@ -208,24 +339,111 @@ class GameManager:
             else:
                 # No queued buzzers. If there are teams that haven't yet attempted,
                 # keep the question active and allow open buzzing among remaining teams.
-                all_team_ids = list(self.state.teams.keys())
-                remaining_teams = [tid for tid in all_team_ids if tid not in self.state.teams_attempted]
-                if remaining_teams:
+                remaining_teams = len(self.state.teams) - len(self.state.teams_attempted)
+                if remaining_teams > 0:
                     # Open buzzing for remaining teams
                     self.state.question_state = QuestionState.BUZZING_OPEN
                     self.state.buzz_timer_active = False
-                    logger.debug(f"Buzzing reopened for {len(remaining_teams)} remaining team(s)")
+                    logger.debug(f"Buzzing reopened for {remaining_teams} remaining team(s)")
                     return None, -value
                 else:
                     # All teams have attempted - end question and return to board
                     self.state.current_question = None
-                    self.state.teams_attempted = []
+                    self.state.teams_attempted.clear()
                     self.state.question_state = QuestionState.BOARD_ACTIVE
                     logger.info("All teams attempted question, returning to board")
                     return None, -value
 
+    @synchronized
+    def skip_question(self):
+        """Abandon the current question and return to the board."""
+        self.state.current_question = None
+        self.state.buzz_queue.clear()
+        self.state.teams_attempted.clear()
+        self.state.question_state = QuestionState.BOARD_ACTIVE
+        self.mark_dirty()
+        self._record('skip_question')
+        logger.info("Question skipped, returning to board")
+
+    def player_name(self, player_id: str) -> Optional[str]:
+        player = self.state.players.get(player_id)
+        return player.name if player else None
+
+    def team_name(self, team_id: str) -> Optional[str]:
+        team = self.state.teams.get(team_id)
+        return team.name if team else None
+
+    @synchronized
+    def reconnect_player(self, player_id: str, team_id: str, session_id: str, token: str) -> Optional[Player]:
+        """Reattach an existing player to a new session, if `token` is the one the player was given."""
+        player = self.state.players.get(player_id)
+        if not player or player.team_id != team_id:
+            logger.warning(f"Reconnection failed: player_id={player_id} not found or team_id mismatch")
+            return None
+        if not isinstance(token, str) or not secrets.compare_digest(token, player.token):
+            # Player ids repeat across games; the token ties a device to this game's player
+            logger.warning(f"Reconnection failed: wrong token for player_id={player_id}")
+            return None
+
+        old_session = player.session_id
+        if self._session_players.get(old_session) == player_id:
+            del self._session_players[old_session]
+            self._session_roles.pop(old_session, None)
+        player.session_id = session_id
+        player.connected = True
+        self._session_players[session_id] = player_id
+        self._session_roles[session_id] = 'player'
+        self.mark_dirty()
+        logger.info(f"Player {player.name} reconnected: {old_session} → {session_id}")
+        return player
+
+    @synchronized
+    def disconnect_session(self, session_id: str) -> Optional[Player]:
+        """Mark the player using `session_id` as disconnected and forget the session."""
+        self._session_roles.pop(session_id, None)
+        player = self.state.players.get(self._session_players.pop(session_id, None))
+        if player is None or player.session_id != session_id:
+            return None
+        player.connected = False
+        self.mark_dirty()
+        logger.info(f"Player {player.name} disconnected")
+        return player
+
+    @synchronized
+    def clear_sessions(self):
+        """Forget every session (after a restart): players are disconnected and there is no Trebek."""
+        self._session_players.clear()
+        self._session_roles.clear()
+        for player in self.state.players.values():
+            player.connected = False
+        self.state.trebek_session_id = None
+        self.mark_dirty()
+
+    def session_player(self, session_id: str) -> Optional[Player]:
+        """Player using `session_id`, if any."""
+        return self.state.players.get(self._session_players.get(session_id))
+
+    def session_role(self, session_id: str) -> Optional[str]:
+        """Role recorded for `session_id`, or None for sessions this game has not seen."""
+        return self._session_roles.get(session_id)
+
+    @synchronized
+    def set_session_role(self, session_id: str, role: str):
+        """Record the role `session_id` joined the game as."""
+        self._session_roles[session_id] = role
+
+    @synchronized
     def get_game_summary(self) -> Dict:
-        """Get summary of game state for clients."""
+        """Get summary of game state for clients.
+
+        The summary is rebuilt only after a state change; treat it as read-only.
+        """
+        if self._summary_version != self.version:
+            self._summary = self._build_summary()
+            self._summary_version = self.version
+        return self._summary
+
+    def _build_summary(self) -> Dict:
         teams_data = []
         for team in self.state.teams.values():
             players_data = [
@@ -257,8 +475,8 @@ class GameManager:
         buzz_queue_data = [
             {
                 'player_id': entry.player_id,
-                'player_name': entry.player_name,
-                'team_name': entry.team_name,
+                'player_name': self.player_name(entry.player_id),
+                'team_name': self.team_name(entry.team_id),
                 'team_id': entry.team_id
             }
             for entry in self.state.buzz_queue
@@ -284,12 +502,9 @@ class GameManager:
 
     def is_round_complete(self, round_num: int) -> bool:
         """Check if all questions in a round have been used."""
-        round_questions = [q for q in self.state.questions if q.round == round_num]
-        is_complete = all(q.used for q in round_questions)
+        index = self.question_index
+        is_complete = index.is_round_complete(round_num)
         if is_complete:
-            logger.info(f"Round {round_num} complete: all {len(round_questions)} questions used")
+            logger.info(f"Round {round_num} complete: all {index.round_size(round_num)} questions used")
         return is_complete
 
-
-# Global game manager instance
-game_manager = GameManager()
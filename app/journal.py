@@ -0,0 +1,171 @@
+"""
+Append-only journal of game commands, for rebuilding games after a crash.
+
+GameManager appends one record per state-changing command it applies::
+
+    {"seq": 12, "op": "buzz_in", "args": ["player_3"]}
+
+Records are buffered in memory and written + fsynced in groups (group
+commit) by a background task every `commit_interval` seconds, so a command
+never waits on the disk. The write itself runs through `offload` (a native
+thread under eventlet), since file I/O would otherwise block the hub. A crash loses at most the last interval of
+commands. On startup `replay` re-applies the records to a fresh GameManager.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# GameManager methods that are journaled and may be re-applied
+REPLAYABLE = frozenset({
+    'load_questions',
+    'load_board',
+    'create_team',
+    'add_player',
+    'start_round',
+    'select_question',
+    'enable_buzzing',
+    'buzz_in',
+    'adjudicate_answer',
+    'skip_question',
+})
+
+
+class Journal:
+    """One game's command journal file, written with batched fsyncs."""
+
+    def __init__(self, path: str, commit_interval: float = 0.02,
+                 start_background_task: Optional[Callable] = None,
+                 sleep: Callable[[float], Any] = time.sleep,
+                 offload: Optional[Callable[..., Any]] = None):
+        self.path = path
+        self.commit_interval = commit_interval
+        self._start_background_task = start_background_task
+        self._sleep = sleep
+        self._offload = offload or (lambda fn, *args: fn(*args))
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._committer_running = False
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        _drop_partial_record(path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def append(self, record: Dict):
+        """Queue a record; it reaches the disk with the next group commit."""
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            self._pending.append(line)
+            start = not self._committer_running and self._start_background_task is not None
+            if start:
+                self._committer_running = True
+        if start:
+            self._start_background_task(self._run)
+
+    def commit(self) -> int:
+        """Write and fsync every queued record; returns how many were written."""
+        with self._commit_lock:
+            return self._commit_locked()
+
+    def _commit_locked(self) -> int:
+        with self._lock:
+            lines, self._pending = self._pending, []
+        if not lines or self._file.closed:
+            return 0
+        self._offload(_write_lines, self._file, lines)
+        logger.debug(f"Journal {self.path}: committed {len(lines)} record(s)")
+        return len(lines)
+
+    def compact(self, through_seq: int) -> int:
+        """Drop records up to `through_seq` (already captured by a snapshot); returns how many were kept."""
+        with self._commit_lock:
+            self._commit_locked()
+            self._file.close()
+            kept = [r for r in read_journal(self.path) if r['seq'] > through_seq]
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                self._offload(_write_lines, f, [json.dumps(r, separators=(',', ':')) for r in kept])
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        logger.debug(f"Journal {self.path}: compacted through seq {through_seq}, {len(kept)} record(s) kept")
+        return len(kept)
+
+    def close(self):
+        self.commit()
+        self._file.close()
+
+    def abandon(self):
+        """Close without writing queued records (another worker now journals this game)."""
+        with self._commit_lock:
+            with self._lock:
+                self._pending = []
+            self._file.close()
+
+    def _run(self):
+        while True:
+            self._sleep(self.commit_interval)
+            self.commit()
+            with self._lock:
+                if not self._pending:
+                    self._committer_running = False
+                    return
+
+
+def _write_lines(f, lines: List[str]):
+    """Write records to `f` and fsync it."""
+    if lines:
+        f.write('\n'.join(lines) + '\n')
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _drop_partial_record(path: str):
+    """Truncate a record left half-written by a crash, so appends start on a fresh line."""
+    try:
+        with open(path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+                logger.warning(f"Journal {path}: dropped partial record at end of file")
+    except FileNotFoundError:
+        pass
+
+
+def read_journal(path: str) -> Iterator[Dict]:
+    """Yield the records of a journal file, skipping a half-written last record."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                logger.warning(f"Journal {path}: ignoring partial record at end of file")
+                break
+            yield json.loads(line)
+
+
+def replay(manager, records: Iterable[Dict]) -> int:
+    """Re-apply journaled commands to `manager`; returns how many were applied.
+
+    Records at or below `manager.journal_seq` (already in its state) are
+    skipped. The manager must not have a journal attached while replaying.
+    Sessions do not survive a restart, so every player is left disconnected
+    until they reconnect.
+    """
+    applied = 0
+    with manager.lock:
+        for record in records:
+            if record['seq'] <= manager.journal_seq:
+                continue
+            op = record['op']
+            if op not in REPLAYABLE:
+                logger.warning(f"Skipping unknown journal op: {op}")
+                continue
+            getattr(manager, op)(*record['args'])
+            manager.journal_seq = record['seq']
+            applied += 1
+
+        manager.clear_sessions()
+    return applied
@@ -1,6 +1,8 @@
+import sys
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Optional
+from typing import Deque, Iterable, Iterator, List, Dict, Optional, Set
 
 
 class GamePhase(Enum):
@@ -17,16 +19,18 @@ class QuestionState(Enum):
     ANSWER_IN_PROGRESS = "answer_in_progress"
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     id: str
     name: str
     team_id: str
     session_id: str
     connected: bool = True
+    # Secret the player's device presents to reconnect; never broadcast
+    token: str = ''
 
 
-@dataclass
+@dataclass(slots=True)
 class Team:
     id: str
     name: str
@@ -35,23 +39,188 @@ class Team:
     color: str = "#FFD700"  # Gold default
 
 
-@dataclass
 class Question:
-    round: int
-    category: str
-    value: int
-    question: str
-    answer: str
-    used: bool = False
+    """A question in the bank.
 
+    Slotted, with its category interned so a bank shares one string per
+    category. Once a QuestionIndex binds the question, `used` is a bit in
+    the index's bitset rather than a per-object flag.
+    """
+    __slots__ = ('round', 'category', 'value', 'question', 'answer', '_used', '_index', '_bit')
 
-@dataclass
+    def __init__(self, round: int, category: str, value: int, question: str, answer: str, used: bool = False):
+        self.round = round
+        self.category = sys.intern(category)
+        self.value = value
+        self.question = question
+        self.answer = answer
+        self._used = bool(used)
+        self._index = None
+        self._bit = 0
+
+    def bind_index(self, index, bit: int):
+        """Keep `used` in bit `bit` of `index`'s bitset from now on."""
+        self._index = index
+        self._bit = bit
+
+    @property
+    def used(self) -> bool:
+        index = self._index
+        if index is None:
+            return self._used
+        return index.is_used(self._bit)
+
+    @used.setter
+    def used(self, value: bool):
+        index = self._index
+        if index is None:
+            self._used = bool(value)
+        else:
+            index.set_used(self, bool(value))
+
+    def _fields(self):
+        return self.round, self.category, self.value, self.question, self.answer, self.used
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Question):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"Question(round={self.round!r}, category={self.category!r}, value={self.value!r}, "
+                f"question={self.question!r}, answer={self.answer!r}, used={self.used!r})")
+
+
+@dataclass(slots=True)
 class BuzzEntry:
+    """A queued buzz. Names are looked up from the game's players and teams when needed."""
     player_id: str
-    player_name: str
     team_id: str
-    team_name: str
-    timestamp: float
+    timestamp: int  # time.monotonic_ns() when the buzz was accepted
+
+
+class IdSet:
+    """Insertion-ordered set of IDs that compares equal to a list of the same IDs."""
+
+    def __init__(self, ids: Iterable[str] = ()):
+        self._ids: Dict[str, None] = dict.fromkeys(ids)
+
+    def add(self, item_id: str):
+        self._ids[item_id] = None
+
+    def clear(self):
+        self._ids.clear()
+
+    def count(self, item_id: str) -> int:
+        return 1 if item_id in self._ids else 0
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (IdSet, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"IdSet({list(self._ids)!r})"
+
+
+class BuzzQueue:
+    """FIFO of BuzzEntry objects with O(1) lookups by player and by team.
+
+    `drop_team` removes every entry of a team in O(1) amortized time:
+    the team is marked dropped and its entries are discarded lazily when
+    they reach the front. Compares equal to a list of the same entries.
+    """
+
+    def __init__(self, entries: Iterable[BuzzEntry] = ()):
+        self._entries: Deque[BuzzEntry] = deque()
+        self._players: Set[str] = set()
+        self._team_players: Dict[str, Set[str]] = {}
+        self._dropped_teams: Set[str] = set()
+        self._size = 0
+        for entry in entries:
+            self.append(entry)
+
+    def append(self, entry: BuzzEntry):
+        if entry.team_id in self._dropped_teams:
+            # Purge stale entries before the team can queue again
+            self._entries = deque(e for e in self._entries if e.team_id != entry.team_id)
+            self._dropped_teams.discard(entry.team_id)
+        self._entries.append(entry)
+        self._players.add(entry.player_id)
+        self._team_players.setdefault(entry.team_id, set()).add(entry.player_id)
+        self._size += 1
+
+    def popleft(self) -> BuzzEntry:
+        self._trim()
+        entry = self._entries.popleft()
+        self._players.discard(entry.player_id)
+        team_players = self._team_players[entry.team_id]
+        team_players.discard(entry.player_id)
+        if not team_players:
+            del self._team_players[entry.team_id]
+        self._size -= 1
+        self._trim()
+        return entry
+
+    def drop_team(self, team_id: str) -> int:
+        """Remove every queued entry from `team_id`; returns how many were removed."""
+        team_players = self._team_players.pop(team_id, None)
+        if not team_players:
+            return 0
+        self._players -= team_players
+        self._size -= len(team_players)
+        self._dropped_teams.add(team_id)
+        self._trim()
+        return len(team_players)
+
+    def has_player(self, player_id: str) -> bool:
+        return player_id in self._players
+
+    def has_team(self, team_id: str) -> bool:
+        return team_id in self._team_players
+
+    def clear(self):
+        self._entries.clear()
+        self._players.clear()
+        self._team_players.clear()
+        self._dropped_teams.clear()
+        self._size = 0
+
+    def _trim(self):
+        while self._entries and self._entries[0].team_id in self._dropped_teams:
+            self._entries.popleft()
+
+    def __iter__(self) -> Iterator[BuzzEntry]:
+        if not self._dropped_teams:
+            return iter(self._entries)
+        return (e for e in self._entries if e.team_id not in self._dropped_teams)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if index == 0 and self._size:
+            return self._entries[0]
+        return list(self)[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (BuzzQueue, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BuzzQueue({list(self)!r})"
 
 
 @dataclass
@@ -62,7 +231,15 @@ class GameState:
     players: Dict[str, Player] = field(default_factory=dict)
     questions: List[Question] = field(default_factory=list)
     current_question: Optional[Question] = None
-    buzz_queue: List[BuzzEntry] = field(default_factory=list)
-    teams_attempted: List[str] = field(default_factory=list)  # Teams that attempted current question
+    buzz_queue: BuzzQueue = field(default_factory=BuzzQueue)
+    teams_attempted: IdSet = field(default_factory=IdSet)  # Teams that attempted current question
     trebek_session_id: Optional[str] = None
     buzz_timer_active: bool = False
+
+    def __setattr__(self, name, value):
+        # Accept plain lists for the buzz queue and attempted teams
+        if name == 'buzz_queue' and not isinstance(value, BuzzQueue):
+            value = BuzzQueue(value)
+        elif name == 'teams_attempted' and not isinstance(value, IdSet):
+            value = IdSet(value)
+        object.__setattr__(self, name, value)
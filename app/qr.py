@@ -0,0 +1,185 @@
+"""
+Join-URL QR codes, generated once per (base URL, game code) and cached.
+
+Building and rasterizing a QR code takes tens of milliseconds of CPU, and
+finding the LAN address opens a socket; neither belongs on the serving
+loop for output that never changes. `QRCodes` detects the address once,
+generates each game's code when the game is created (or on its first
+request), and keeps the PNG, the SVG and the ``/qr`` JSON body as
+`assets.Asset` values so they are served with ETags (and the SVG gzipped).
+
+Generation and address detection run through `offload`: under eventlet
+that is `eventlet.tpool.execute`, so they run on a native thread while the
+hub keeps serving. `run_address_watch` re-detects the address in the
+background and regenerates the cached codes only when it has changed.
+
+The base URL is `Config.PUBLIC_URL` when set (a reverse proxy or a
+published hostname); otherwise the Host the page was loaded from, with the
+LAN address swapped in when that Host is a loopback name a phone could not
+reach; otherwise (no request, e.g. a game created through another worker)
+the LAN address and the server's `port`.
+"""
+import base64
+import io
+import json
+import logging
+import socket
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import qrcode
+import qrcode.image.svg
+
+from app import assets
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# (base URL, game code); the code is '' for the bare /join URL
+QRKey = Tuple[str, str]
+
+LOOPBACK_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+
+def detect_local_ip() -> str:
+    """LAN address of this machine (the source address of a route to the internet)."""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))
+        ip = s.getsockname()[0]
+        s.close()
+        logger.debug(f"Detected local IP: {ip}")
+        return ip
+    except Exception as e:
+        logger.warning(f"Failed to detect local IP, defaulting to localhost: {e}")
+        return "localhost"
+
+
+def join_url(base: str, code: str) -> str:
+    url = f"{base}/join"
+    if code:
+        url += f"?game={code}"
+    return url
+
+
+class QRImage:
+    """One join URL's QR code as PNG, SVG and the JSON body of ``/qr``."""
+    __slots__ = ('url', 'png', 'svg', 'json')
+
+    def __init__(self, url: str):
+        self.url = url
+        qr = qrcode.QRCode(version=1, box_size=10, border=5)
+        qr.add_data(url)
+        qr.make(fit=True)
+
+        buf = io.BytesIO()
+        qr.make_image(fill_color="black", back_color="white").save(buf, format='PNG')
+        png = buf.getvalue()
+        buf = io.BytesIO()
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buf)
+
+        self.png = assets.Asset('qr.png', png, assets.CONTENT_TYPES['.png'])
+        self.svg = assets.Asset('qr.svg', buf.getvalue(), assets.CONTENT_TYPES['.svg'])
+        body = {'qr_code': f"data:image/png;base64,{base64.b64encode(png).decode()}", 'url': url}
+        self.json = assets.Asset('qr.json', json.dumps(body).encode('utf-8'), assets.CONTENT_TYPES['.json'])
+
+
+class QRCodes:
+    """Cache of join QR codes, keyed by the base URL phones are sent to.
+
+    Callers only ask for the codes of hosted games (and the bare join URL).
+    Request Hosts are client-supplied, so the cache keeps at most
+    `max_images` codes and evicts the least recently used.
+    """
+
+    def __init__(self, port: str = str(Config.PORT), detect_address: Callable[[], str] = detect_local_ip,
+                 offload: Optional[Callable[..., Any]] = None,
+                 start_background_task: Optional[Callable[..., Any]] = None,
+                 public_url: Optional[str] = None, max_images: int = 256):
+        self.port = port
+        self.public_url = public_url.rstrip('/') if public_url else None
+        self.detect_address = detect_address
+        self.offload = offload or (lambda fn, *args: fn(*args))
+        self._start_background_task = start_background_task
+        self.max_images = max_images
+        self._address: Optional[str] = None
+        self._images: 'OrderedDict[QRKey, QRImage]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def address(self) -> str:
+        """The LAN address in join URLs, detected on first use."""
+        if self._address is None:
+            self._address = self.offload(self.detect_address)
+        return self._address
+
+    def base_url(self, host: Optional[str] = None, scheme: str = 'http') -> str:
+        """Scheme and authority of join URLs for a page loaded from `host`."""
+        if self.public_url:
+            return self.public_url
+        if not host:
+            return f"http://{self.address}:{self.port}"
+        parts = urlsplit(f"{scheme}://{host}")
+        if parts.hostname in LOOPBACK_HOSTS or (parts.hostname or '').startswith('127.'):
+            # the host opened the page on this machine; phones need the LAN address
+            return f"{scheme}://{self.address}" + (f":{parts.port}" if parts.port else '')
+        return f"{scheme}://{host}"
+
+    def get(self, code: Optional[str], host: Optional[str] = None, scheme: str = 'http') -> QRImage:
+        """The QR code for the join URL of game `code`, generated on first use."""
+        key = (self.base_url(host, scheme), code or '')
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+        image = self.offload(QRImage, join_url(*key))
+        with self._lock:
+            image = self._images.setdefault(key, image)
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+        logger.info(f"QR code generated for {image.url}")
+        return image
+
+    def prepare(self, code: Optional[str]):
+        """Generate a game's code in the background, ahead of its first request (no-op without background tasks)."""
+        if self._start_background_task is not None:
+            self._start_background_task(self.get, code)
+
+    def discard(self, code: str):
+        """Forget the cached codes of a game that ended."""
+        with self._lock:
+            for key in [key for key in self._images if key[1] == code]:
+                del self._images[key]
+
+    def refresh_address(self) -> bool:
+        """Detect the address again; if it changed, regenerate the cached codes built on it."""
+        address = self.offload(self.detect_address)
+        old = self._address
+        if address == old:
+            return False
+        logger.info(f"Local address changed from {old} to {address}; regenerating QR codes")
+        with self._lock:
+            stale = [key for key in self._images if urlsplit(key[0]).hostname == old]
+        fresh = {}
+        for base, code in stale:
+            parts = urlsplit(base)
+            new_base = f"{parts.scheme}://{address}" + (f":{parts.port}" if parts.port else '')
+            fresh[(new_base, code)] = self.offload(QRImage, join_url(new_base, code))
+        with self._lock:
+            for key in stale:
+                self._images.pop(key, None)
+            self._images.update(fresh)
+            self._address = address
+        return True
+
+    def run_address_watch(self, interval: float, sleep: Callable[[float], Any]):
+        """Background task: re-detect the address every `interval` seconds."""
+        while True:
+            sleep(interval)
+            try:
+                self.refresh_address()
+            except Exception as e:
+                logger.error(f"QR address refresh failed: {e}", exc_info=True)
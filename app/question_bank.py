@@ -0,0 +1,235 @@
+"""
+Compiled question banks, so a game does not re-parse the questions CSV.
+
+The first load of ``questions.csv`` parses it and writes a compiled copy
+next to it, ``questions.csv.bank``. The compiled file records the source's
+path, mtime and size; while they still match, later loads (including those
+of a freshly started process) memory-map the compiled file instead of
+reading the CSV. Inside one process the mapped bank is also kept in memory
+under the same key, so every further game reuses it without touching the
+disk.
+
+Question and answer text stays in the mapped file: `BankQuestion` holds
+round, category, value and used plus its position in the bank, and decodes
+its text only when it is read (revealing the question, or building the
+host's board). Resident memory grows with the questions actually shown,
+not with the size of the bank.
+
+Compiled layout: ``MAGIC``, a format version byte, the source key
+(mtime in ns, size), the row count and category count, three int32 arrays
+(round, value, category number), a uint32 array of string offsets, then
+one UTF-8 blob holding the category names followed by each question's
+question and answer text.
+"""
+import array
+import csv
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.models import Question
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'JPBANK'
+VERSION = 2
+
+_HEADER = struct.Struct('<qqII')
+
+# One question: (round, category, value, question, answer)
+Row = Tuple[int, str, int, str, str]
+BankKey = Tuple[str, int, int]
+
+_cache: Dict[str, 'CompiledBank'] = {}
+_cache_lock = threading.Lock()
+
+
+class CompiledBank:
+    """A compiled bank, memory-mapped from its file (or held in memory if it could not be written)."""
+
+    def __init__(self, key: BankKey, data):
+        self.key = key
+        self._data = data
+        offset = len(MAGIC) + 1
+        if data[:len(MAGIC)] != MAGIC or len(data) < offset or data[offset - 1] != VERSION:
+            raise ValueError("not a compiled question bank of this version")
+        _, _, count, num_categories = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+
+        columns = []
+        for _ in range(3):
+            column = array.array('i')
+            column.frombytes(data[offset:offset + count * column.itemsize])
+            offset += count * column.itemsize
+            columns.append(column)
+        self._rounds, self._values, self._category_ids = columns
+
+        num_strings = num_categories + 2 * count
+        self._offsets = memoryview(data)[offset:offset + (num_strings + 1) * 4].cast('I')
+        self._blob_start = offset + (num_strings + 1) * 4
+        if len(self._rounds) != count or len(self._offsets) != num_strings + 1 \
+                or len(data) != self._blob_start + self._offsets[-1]:
+            raise ValueError("compiled question bank is truncated")
+        self.count = count
+        self._categories = [sys.intern(self.text(i)) for i in range(num_categories)]
+        self._digest: Optional[bytes] = None
+
+    @staticmethod
+    def read(path: str, key: BankKey) -> Optional['CompiledBank']:
+        """Map the compiled bank at `path`, or None if it is missing, stale or unreadable."""
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(len(MAGIC) + 1 + _HEADER.size)
+                if len(header) < len(MAGIC) + 1 + _HEADER.size or header[len(MAGIC)] != VERSION:
+                    return None
+                mtime_ns, size, _, _ = _HEADER.unpack_from(header, len(MAGIC) + 1)
+                if (mtime_ns, size) != key[1:]:
+                    return None
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            bank = CompiledBank(key, data)
+        except (ValueError, IndexError, TypeError, struct.error, UnicodeDecodeError) as e:
+            logger.warning(f"Ignoring unreadable compiled question bank {path}: {e}")
+            return None
+        logger.info(f"Mapped {bank.count} questions from compiled bank {path}")
+        return bank
+
+    def digest(self) -> bytes:
+        """Digest of the bank's content (everything after the source's mtime and size), computed once."""
+        if self._digest is None:
+            start = len(MAGIC) + 1 + 16
+            self._digest = hashlib.blake2b(memoryview(self._data)[start:], digest_size=16).digest()
+        return self._digest
+
+    def text(self, i: int) -> str:
+        """String number `i` of the bank, decoded from the mapped blob."""
+        start = self._blob_start
+        return str(self._data[start + self._offsets[i]:start + self._offsets[i + 1]], 'utf-8')
+
+    def question_text(self, position: int) -> str:
+        return self.text(len(self._categories) + 2 * position)
+
+    def answer_text(self, position: int) -> str:
+        return self.text(len(self._categories) + 2 * position + 1)
+
+    def questions(self) -> List['BankQuestion']:
+        """Fresh (unused) questions for a game, without decoding any question text."""
+        categories = self._categories
+        return [BankQuestion(self, i, round_num, categories[category_id], value)
+                for i, (round_num, value, category_id)
+                in enumerate(zip(self._rounds, self._values, self._category_ids))]
+
+    def rows(self) -> List[Row]:
+        """Every question fully decoded (for tools and tests; games use `questions`)."""
+        return [(q.round, q.category, q.value, q.question, q.answer) for q in self.questions()]
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class BankQuestion(Question):
+    """A Question whose text is read from its CompiledBank on access."""
+    __slots__ = ('_bank', '_position')
+
+    def __init__(self, bank: CompiledBank, position: int, round: int, category: str, value: int):
+        # Category names come interned from the bank, and the text stays in it
+        self.round = round
+        self.category = category
+        self.value = value
+        self._used = False
+        self._index = None
+        self._bit = 0
+        self._bank = bank
+        self._position = position
+
+    @property
+    def question(self) -> str:
+        return self._bank.question_text(self._position)
+
+    @property
+    def answer(self) -> str:
+        return self._bank.answer_text(self._position)
+
+
+def bank_key(path: str) -> BankKey:
+    """Identity of a bank source: absolute path, mtime (ns) and size. Raises OSError if missing."""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def compiled_path(path: str) -> str:
+    return f"{path}.bank"
+
+
+def load_bank(path: str) -> CompiledBank:
+    """The compiled bank for the questions CSV at `path`.
+
+    Served from memory or the compiled file while the source is unchanged;
+    otherwise the CSV is parsed and the compiled file rewritten.
+    """
+    key = bank_key(path)
+    with _cache_lock:
+        bank = _cache.get(key[0])
+        if bank is not None and bank.key == key:
+            return bank
+
+        bank = CompiledBank.read(compiled_path(path), key)
+        if bank is None:
+            data = encode_bank(key, parse_csv(path))
+            try:
+                write_compiled(compiled_path(path), data)
+                bank = CompiledBank.read(compiled_path(path), key)
+            except OSError as e:
+                logger.warning(f"Could not write compiled question bank for {path}: {e}")
+            if bank is None:
+                bank = CompiledBank(key, data)
+        _cache[key[0]] = bank
+        return bank
+
+
+def parse_csv(path: str) -> List[Row]:
+    """Parse a questions CSV (columns Round, Category, Value, Question, Answer)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = [(int(r['Round']), r['Category'], int(r['Value']), r['Question'], r['Answer'])
+                for r in csv.DictReader(f)]
+    logger.info(f"Parsed {len(rows)} questions from {path}")
+    return rows
+
+
+def encode_bank(key: BankKey, rows: List[Row]) -> bytes:
+    """The compiled form of `rows`, read from a source identified by `key`."""
+    categories: Dict[str, int] = {}
+    rounds = array.array('i', (r[0] for r in rows))
+    values = array.array('i', (r[2] for r in rows))
+    category_ids = array.array('i', (categories.setdefault(r[1], len(categories)) for r in rows))
+
+    encoded = [name.encode('utf-8') for name in categories]
+    for r in rows:
+        encoded.append(r[3].encode('utf-8'))
+        encoded.append(r[4].encode('utf-8'))
+    offsets = array.array('I', [0])
+    total = 0
+    for text in encoded:
+        total += len(text)
+        offsets.append(total)
+
+    return b''.join([MAGIC, bytes([VERSION]), _HEADER.pack(key[1], key[2], len(rows), len(categories)),
+                     rounds.tobytes(), values.tobytes(), category_ids.tobytes(), offsets.tobytes(),
+                     *encoded])
+
+
+def write_compiled(path: str, data: bytes):
+    """Write a compiled bank atomically (temp file + rename), so mapped readers keep the old file intact."""
+    # Per-process temp name: several workers may compile the same bank at once
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    logger.debug(f"Compiled question bank written: {path}")
@@ -0,0 +1,224 @@
+import itertools
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.models import Question
+from app.serialization import PreEncoded
+
+logger = logging.getLogger(__name__)
+
+QuestionKey = Tuple[int, str, int]
+
+# The eight flags (least significant bit first) held by each byte value
+_BYTE_BITS = [tuple(bool(b >> i & 1) for i in range(8)) for b in range(256)]
+
+# Shared across boards so a rebuilt board never reuses an older version number
+_board_versions = itertools.count(1)
+
+# cell_used messages kept per board for clients catching up (a round has far fewer cells)
+MAX_CHANGES = 64
+
+
+class RoundBoard:
+    """Board for one round, built once and updated in place as questions are used.
+
+    `categories` has the same shape as `GameManager.get_board_state`. Every
+    change bumps `version`, and `payload()` caches the encoded
+    ``board_update`` message per role until the next change. Only the host
+    gets question and answer text; the display sees values and used flags.
+    The host's cells (and so the question text) are only built the first
+    time they are needed.
+
+    Each change is also kept as a small ``cell_used`` message carrying the
+    version it applies to (``base``) and the version it produces, so clients
+    holding the layout can follow the board without receiving it again.
+    """
+
+    def __init__(self, round_num: int, round_view: Dict[str, List[Question]]):
+        self.round = round_num
+        self.version = next(_board_versions)
+        self._round_view = round_view
+        # Display cells (value and used flag) and, once built, host cells, by id(question)
+        self._display: Dict[str, List[Dict]] = {}
+        self._host: Optional[Dict[str, List[Dict]]] = None
+        self._cells: Dict[int, List[Dict]] = {}
+        # (category, row) of each question's cell, by id(question)
+        self._positions: Dict[int, Tuple[str, int]] = {}
+        self._payloads: Dict[str, PreEncoded] = {}
+        self._changes: Deque[PreEncoded] = deque(maxlen=MAX_CHANGES)
+
+        for category, questions in round_view.items():
+            cells = []
+            for row, q in enumerate(questions):
+                cell = {'value': q.value, 'used': q.used}
+                self._cells[id(q)] = [cell]
+                self._positions[id(q)] = (category, row)
+                cells.append(cell)
+            self._display[category] = cells
+
+    @property
+    def categories(self) -> Dict[str, List[Dict]]:
+        """The host's board: value, used flag, question and answer per cell."""
+        if self._host is None:
+            self._host = {}
+            for category, questions in self._round_view.items():
+                cells = []
+                for q in questions:
+                    cell = {'value': q.value, 'used': q.used, 'question': q.question, 'answer': q.answer}
+                    self._cells[id(q)].append(cell)
+                    cells.append(cell)
+                self._host[category] = cells
+        return self._host
+
+    def set_used(self, question: Question, used: bool):
+        """Flip the cell for `question` and bump the board version."""
+        cells = self._cells.get(id(question))
+        if cells is None or cells[0]['used'] == used:
+            return
+        for cell in cells:
+            cell['used'] = used
+        base = self.version
+        self.version = next(_board_versions)
+        self._payloads = {}
+        category, row = self._positions[id(question)]
+        self._changes.append(PreEncoded({
+            'round': self.round, 'base': base, 'version': self.version,
+            'category': category, 'row': row, 'value': question.value, 'used': used,
+        }))
+        logger.debug(f"Board R{self.round} updated: {question.category} ${question.value} used={used} (v{self.version})")
+
+    def changes_since(self, version: int) -> Optional[List[PreEncoded]]:
+        """The ``cell_used`` messages that take a board at `version` to the current one.
+
+        Returns None if `version` is not a version of this board, or too old
+        for the changes kept; the client then needs the whole layout.
+        """
+        if version == self.version:
+            return []
+        for i, change in enumerate(self._changes):
+            if change.data['base'] == version:
+                return list(itertools.islice(self._changes, i, None))
+        return None
+
+    def payload(self, role: str = 'trebek') -> PreEncoded:
+        """The ``board_update`` message for `role` at the current version, encoded once."""
+        payload = self._payloads.get(role)
+        if payload is None:
+            payload = PreEncoded({
+                'round': self.round,
+                'version': self.version,
+                'board': self.categories if role == 'trebek' else self._display
+            })
+            self._payloads[role] = payload
+        return payload
+
+
+class QuestionIndex:
+    """Lookup tables over a loaded question bank.
+
+    Questions are indexed by (round, category, value), and grouped per round
+    and per category with values pre-sorted, so board lookups never scan the
+    whole bank. Used flags live in one bitset (a bit per question, in bank
+    order); the index binds itself to each question so that flipping
+    ``Question.used`` sets its bit and keeps the per-round remaining counts
+    and the boards current.
+    """
+
+    def __init__(self, questions: List[Question]):
+        self.questions = questions
+        self.size = len(questions)
+        self._by_key: Dict[QuestionKey, List[Question]] = {}
+        self._rounds: Dict[int, Dict[str, List[Question]]] = {}
+        self._remaining: Dict[int, int] = {}
+        self._boards: Dict[int, RoundBoard] = {}
+        self._used = bytearray((len(questions) + 7) // 8)
+
+        for bit, q in enumerate(questions):
+            self._by_key.setdefault((q.round, q.category, q.value), []).append(q)
+            self._rounds.setdefault(q.round, {}).setdefault(q.category, []).append(q)
+            if q.used:
+                self._used[bit >> 3] |= 1 << (bit & 7)
+            else:
+                self._remaining[q.round] = self._remaining.get(q.round, 0) + 1
+            q.bind_index(self, bit)
+
+        # Sort values within each category once, up front
+        for categories in self._rounds.values():
+            for cat_questions in categories.values():
+                cat_questions.sort(key=lambda q: q.value)
+
+        logger.debug(f"Indexed {self.size} questions across {len(self._rounds)} round(s)")
+
+    def find(self, round_num: int, category: str, value: int) -> Optional[Question]:
+        """Return the first unused question at (round, category, value)."""
+        for q in self._by_key.get((round_num, category, value), ()):
+            if not q.used:
+                return q
+        return None
+
+    def round_view(self, round_num: int) -> Dict[str, List[Question]]:
+        """Questions for a round, grouped by category in bank order."""
+        return self._rounds.get(round_num, {})
+
+    def category_view(self, round_num: int, category: str) -> List[Question]:
+        """Questions for one category of a round, sorted by value."""
+        return self._rounds.get(round_num, {}).get(category, [])
+
+    def remaining(self, round_num: int) -> int:
+        """Number of unused questions left in a round."""
+        return self._remaining.get(round_num, 0)
+
+    def round_size(self, round_num: int) -> int:
+        """Total number of questions in a round."""
+        return sum(len(qs) for qs in self.round_view(round_num).values())
+
+    def is_round_complete(self, round_num: int) -> bool:
+        """True once every question in the round has been used."""
+        return self.remaining(round_num) == 0
+
+    def board(self, round_num: int) -> RoundBoard:
+        """The live board for a round, built on first use."""
+        board = self._boards.get(round_num)
+        if board is None:
+            board = RoundBoard(round_num, self.round_view(round_num))
+            self._boards[round_num] = board
+        return board
+
+    def is_used(self, bit: int) -> bool:
+        return bool(self._used[bit >> 3] >> (bit & 7) & 1)
+
+    def set_used(self, question: Question, used: bool):
+        """Set a question's used bit, keeping remaining counts and boards in sync."""
+        bit = question._bit
+        if self.is_used(bit) == used:
+            return
+        self._used[bit >> 3] ^= 1 << (bit & 7)
+        self._remaining[question.round] = self._remaining.get(question.round, 0) + (-1 if used else 1)
+        board = self._boards.get(question.round)
+        if board is not None:
+            board.set_used(question, used)
+
+    def used_bitmap(self) -> bytes:
+        """The used bitset: bit i (least significant first) is question i of the bank."""
+        return bytes(self._used)
+
+    def load_used(self, bitmap: bytes):
+        """Replace every used flag at once from a `used_bitmap` (e.g. from a snapshot) and recount.
+
+        Boards are rebuilt on next use.
+        """
+        if len(bitmap) != len(self._used):
+            raise ValueError(f"Used bitmap has {len(bitmap)} bytes, expected {len(self._used)}")
+        self._used = bytearray(bitmap)
+        remaining: Dict[int, int] = {}
+        for q, used in zip(self.questions, bitmap_flags(bitmap)):
+            if not used:
+                remaining[q.round] = remaining.get(q.round, 0) + 1
+        self._remaining = remaining
+        self._boards = {}
+
+
+def bitmap_flags(bitmap: bytes) -> Iterator[bool]:
+    """The flags of a bitmap, least significant bit of each byte first."""
+    return itertools.chain.from_iterable(_BYTE_BITS[b] for b in bitmap)
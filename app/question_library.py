@@ -0,0 +1,177 @@
+"""
+Optional SQLite question library for archives too large to load whole.
+
+Questions live in a SQLite database (``Config.QUESTION_LIBRARY``) indexed by
+round, category and value, with tags in a side table indexed by tag. A game
+never loads the archive: for each round it samples a board of N categories
+x M values (`sample_board`) and loads just those questions
+(`GameManager.load_board`).
+
+Import a CSV (columns Round, Category, Value, Question, Answer and an
+optional Tags column of ``;``-separated tags) with::
+
+    python -m app.question_library data/library.db archive.csv --tag trivia
+"""
+import argparse
+import csv
+import logging
+import random
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.models import Question
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    round INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_round_category_value ON questions (round, category, value);
+CREATE TABLE IF NOT EXISTS question_tags (
+    tag TEXT NOT NULL,
+    question_id INTEGER NOT NULL REFERENCES questions (id),
+    PRIMARY KEY (tag, question_id)
+) WITHOUT ROWID;
+"""
+
+# (round, category, value, question, answer, tags)
+LibraryRow = Tuple[int, str, int, str, str, Sequence[str]]
+
+_libraries: Dict[str, 'QuestionLibrary'] = {}
+_libraries_lock = threading.Lock()
+
+
+def open_library(path: str) -> 'QuestionLibrary':
+    """The shared QuestionLibrary for the database at `path`, opened on first use."""
+    with _libraries_lock:
+        library = _libraries.get(path)
+        if library is None:
+            library = _libraries[path] = QuestionLibrary(path)
+        return library
+
+
+class QuestionLibrary:
+    """A question archive in SQLite. Safe to share between threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def import_rows(self, rows: Iterable[LibraryRow], batch_size: int = 10_000) -> int:
+        """Bulk-insert questions in batches inside one transaction; returns how many were added."""
+        count = 0
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            batch: List[LibraryRow] = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    count += self._insert(cursor, batch)
+                    batch = []
+            count += self._insert(cursor, batch)
+        logger.info(f"Imported {count} questions into {self.path}")
+        return count
+
+    @staticmethod
+    def _insert(cursor, batch: List[LibraryRow]) -> int:
+        tags = []
+        for row in batch:
+            cursor.execute("INSERT INTO questions (round, category, value, question, answer) VALUES (?, ?, ?, ?, ?)",
+                           row[:5])
+            tags.extend((tag, cursor.lastrowid) for tag in row[5])
+        cursor.executemany("INSERT OR IGNORE INTO question_tags (tag, question_id) VALUES (?, ?)", tags)
+        return len(batch)
+
+    def import_csv(self, path: str, tags: Sequence[str] = ()) -> int:
+        """Import a questions CSV, streaming it row by row; `tags` are added to every question."""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = ((int(r['Round']), r['Category'], int(r['Value']), r['Question'], r['Answer'],
+                     [*tags, *(t.strip() for t in (r.get('Tags') or '').split(';') if t.strip())])
+                    for r in csv.DictReader(f))
+            return self.import_rows(rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def categories(self, round_num: int, values: Sequence[int], tag: Optional[str] = None) -> List[str]:
+        """Categories of a round that have a question at every one of `values` (and `tag`, if given)."""
+        marks = ','.join('?' * len(values))
+        sql = (f"SELECT q.category FROM questions q{_tag_join(tag)} WHERE q.round = ? AND q.value IN ({marks})"
+               " GROUP BY q.category HAVING COUNT(DISTINCT q.value) = ? ORDER BY q.category")
+        params = [*([tag] if tag else []), round_num, *values, len(set(values))]
+        with self._lock:
+            return [category for category, in self._conn.execute(sql, params)]
+
+    def sample_board(self, round_num: int, num_categories: int, values: Sequence[int],
+                     tag: Optional[str] = None, rng: Optional[random.Random] = None) -> List[int]:
+        """Ids of a random board: `num_categories` categories x one question per value, by category then value.
+
+        Only the candidate category names and the ids of each chosen cell are
+        read from the database. Raises ValueError if the round has fewer
+        complete categories than requested.
+        """
+        rng = rng or random
+        candidates = self.categories(round_num, values, tag)
+        if len(candidates) < num_categories:
+            raise ValueError(f"Round {round_num} has {len(candidates)} complete categories, "
+                             f"{num_categories} needed")
+        sql = f"SELECT q.id FROM questions q{_tag_join(tag)} WHERE q.round = ? AND q.category = ? AND q.value = ?"
+        ids = []
+        with self._lock:
+            for category in rng.sample(candidates, num_categories):
+                for value in values:
+                    params = (*([tag] if tag else []), round_num, category, value)
+                    ids.append(rng.choice([qid for qid, in self._conn.execute(sql, params)]))
+        return ids
+
+    def fetch(self, ids: Sequence[int]) -> List[Question]:
+        """Questions for `ids`, in the same order. Raises KeyError for an unknown id."""
+        found: Dict[int, Question] = {}
+        with self._lock:
+            # Stay under SQLite's limit on bound parameters
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                sql = ("SELECT id, round, category, value, question, answer FROM questions "
+                       f"WHERE id IN ({','.join('?' * len(chunk))})")
+                for qid, *fields in self._conn.execute(sql, chunk):
+                    found[qid] = Question(*fields)
+        return [found[qid] for qid in ids]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _tag_join(tag: Optional[str]) -> str:
+    """Join restricting ``questions q`` to one tag (bound as the first parameter)."""
+    return " JOIN question_tags t ON t.tag = ? AND t.question_id = q.id" if tag else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import questions CSVs into a SQLite question library.")
+    parser.add_argument('database')
+    parser.add_argument('csv_files', nargs='+')
+    parser.add_argument('--tag', action='append', default=[], help='tag added to every imported question')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    library = QuestionLibrary(args.database)
+    for path in args.csv_files:
+        library.import_csv(path, args.tag)
+    print(f"{library.count()} questions in {args.database}")
+    library.close()
+
+
+if __name__ == '__main__':
+    main()
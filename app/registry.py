@@ -0,0 +1,307 @@
+"""
+Registry of the games hosted by one server process.
+
+Each game is identified by a short code (e.g. ``KXQB``) that players get
+from the join QR code. Every Socket.IO room a game uses is prefixed with
+its code, so emits for one game never reach the clients of another.
+"""
+import glob
+import logging
+import os
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.game_logic import GameManager
+from app.journal import Journal, read_journal, replay
+from app.snapshot import SnapshotError, encode_state, read_snapshot, restore_state, write_snapshot
+from app.state_sync import RoleChannels
+
+logger = logging.getLogger(__name__)
+
+# Letters that cannot be mistaken for digits when read off a screen
+CODE_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ'
+CODE_LENGTH = 4
+
+# Room (within a game) holding every client of each role
+ROLE_ROOMS = {
+    'trebek': 'trebek',
+    'display': 'display',
+    'player': 'players',
+    'spectator': 'spectators',
+}
+
+
+def normalize_code(code) -> Optional[str]:
+    """Upper-cased game code, or None if `code` is not a well-formed code."""
+    if not isinstance(code, str):
+        return None
+    code = code.strip().upper()
+    if len(code) != CODE_LENGTH or any(c not in CODE_ALPHABET for c in code):
+        return None
+    return code
+
+
+class Game:
+    """One hosted game: its GameManager, its broadcast channels and its room names."""
+
+    def __init__(self, code: str):
+        self.code = code
+        self.manager = GameManager()
+        self.channels = RoleChannels()
+        # Board version the board rooms were last brought to, per round
+        self.board_versions: Dict[int, int] = {}
+
+    @property
+    def room(self) -> str:
+        """Room holding every client of this game."""
+        return self.code
+
+    def role_room(self, role: str) -> str:
+        return f"{self.code}:{ROLE_ROOMS[role]}"
+
+    def team_room(self, team_id: str) -> str:
+        return f"{self.code}:{team_id}"
+
+    def timer_name(self, name: str) -> str:
+        """Timer name scoped to this game, so games never cancel each other's timers."""
+        return f"{self.code}:{name}"
+
+    def __repr__(self) -> str:
+        return f"Game({self.code!r})"
+
+
+class GameRegistry:
+    """Games hosted by this process, keyed by game code.
+
+    With a `journal_dir`, every game journals its commands to
+    ``<journal_dir>/<code>.log``; with a `snapshot_dir`, `save_snapshot`
+    writes ``<snapshot_dir>/<code>.snap`` and trims the journal to the
+    commands after it. `recover` rebuilds the games found on disk, and `get`
+    restores a game another worker left behind (see `restore`). With
+    several workers, `claim(code)` says whether this worker may host a
+    saved game; games it refuses are left to their owner.
+    """
+
+    def __init__(self, journal_dir: Optional[str] = None, commit_interval: float = 0.02,
+                 start_background_task: Optional[Callable] = None,
+                 sleep: Callable[[float], Any] = time.sleep,
+                 snapshot_dir: Optional[str] = None,
+                 claim: Optional[Callable[[str], bool]] = None,
+                 offload: Optional[Callable[..., Any]] = None):
+        self._games: Dict[str, Game] = {}
+        self._lock = threading.Lock()
+        self.journal_dir = journal_dir
+        self.snapshot_dir = snapshot_dir
+        # Asked before a saved game is rebuilt whether this worker may host it
+        self.claim = claim
+        self._commit_interval = commit_interval
+        self._start_background_task = start_background_task
+        self._sleep = sleep
+        # Runs blocking disk work (journal fsyncs, snapshot writes); a native thread under eventlet
+        self.offload = offload or (lambda fn, *args: fn(*args))
+        self._snapshot_versions: Dict[str, int] = {}
+
+    def host(self, code: Optional[str] = None, claim: Optional[Callable[[str], bool]] = None) -> Optional[Game]:
+        """The game hosted under `code`, creating it (under a fresh random code if none is given) when needed.
+
+        Before a game is created, `claim(code)` is asked whether this
+        process may host that code (e.g. whether another worker owns it).
+        Fresh codes are drawn until it agrees; for a requested code it
+        refuses, nothing is created and None is returned.
+        """
+        code = normalize_code(code)
+        if code is not None and code not in self._games:
+            self.restore(code)
+        with self._lock:
+            if code in self._games:
+                return self._games[code]
+            if code is None:
+                code = self._new_code(claim)
+            elif claim is not None and not claim(code):
+                return None
+            game = Game(code)
+            self._attach_journal(game)
+            self._games[code] = game
+        logger.info(f"Game created: {code} ({len(self._games)} hosted)")
+        return game
+
+    def _new_code(self, claim: Optional[Callable[[str], bool]]) -> str:
+        while True:
+            code = ''.join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+            if code not in self._games and (claim is None or claim(code)):
+                return code
+
+    def journal_path(self, code: str) -> str:
+        return os.path.join(self.journal_dir, f"{code}.log")
+
+    def snapshot_path(self, code: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{code}.snap")
+
+    def _attach_journal(self, game: Game):
+        if self.journal_dir:
+            game.manager.journal = Journal(self.journal_path(game.code), self._commit_interval,
+                                           self._start_background_task, self._sleep, self.offload)
+
+    def _saved_codes(self) -> List[str]:
+        """Codes of every game with a journal or snapshot on disk."""
+        paths = []
+        if self.journal_dir:
+            paths += glob.glob(os.path.join(self.journal_dir, '*.log'))
+        if self.snapshot_dir:
+            paths += glob.glob(os.path.join(self.snapshot_dir, '*.snap'))
+        codes = {normalize_code(os.path.splitext(os.path.basename(path))[0]) for path in paths}
+        return sorted(code for code in codes if code is not None)
+
+    def recover(self) -> int:
+        """Rebuild every saved game that is not hosted here or by another worker; returns how many were recovered."""
+        return sum(1 for code in self._saved_codes() if code not in self._games and self.restore(code))
+
+    def restore(self, code: str) -> Optional[Game]:
+        """Rebuild a game from its snapshot plus the journal records after it, and host it.
+
+        Returns None when nothing is saved under `code`, or when `claim`
+        refuses it: another worker hosts the game and keeps writing its
+        journal, so a second copy here must never open (or compact) it. A
+        snapshot that does not load (corrupt, or the question bank changed)
+        is skipped and the journal is replayed on its own.
+        """
+        code = normalize_code(code)
+        snapshot_path = self.snapshot_path(code) if code and self.snapshot_dir else None
+        journal_path = self.journal_path(code) if code and self.journal_dir else None
+        has_snapshot = snapshot_path is not None and os.path.exists(snapshot_path)
+        has_journal = journal_path is not None and os.path.exists(journal_path)
+        if not has_snapshot and not has_journal:
+            return None
+        if self.claim is not None and not self.claim(code):
+            logger.info(f"Game {code} is hosted by another worker; not restoring it")
+            return None
+
+        start = time.perf_counter()
+        game = Game(code)
+        if has_snapshot:
+            try:
+                data = read_snapshot(snapshot_path)
+                restore_state(game.manager, data)
+                self._snapshot_versions[code] = game.manager.version
+            except (OSError, SnapshotError) as e:
+                logger.error(f"Game {code}: ignoring snapshot {snapshot_path}: {e}")
+                game = Game(code)
+        applied = replay(game.manager, read_journal(journal_path)) if has_journal else 0
+        self._attach_journal(game)
+        with self._lock:
+            if code in self._games:
+                # Restored concurrently; keep the game already hosted
+                if game.manager.journal is not None:
+                    game.manager.journal.close()
+                return self._games[code]
+            self._games[code] = game
+        logger.info(f"Game recovered: {code} (snapshot at seq {game.manager.journal_seq - applied}, "
+                    f"{applied} command(s) replayed in {(time.perf_counter() - start) * 1000:.1f} ms)")
+        return game
+
+    def save_snapshot(self, game: Game) -> bool:
+        """Snapshot `game` if it changed since its last snapshot, then trim its journal.
+
+        Only encoding runs under the game's lock; the file write and the
+        journal compaction happen outside it. Returns whether a snapshot was
+        written.
+        """
+        if not self.snapshot_dir:
+            return False
+        manager = game.manager
+        with manager.lock:
+            version = manager.version
+            if self._snapshot_versions.get(game.code) == version:
+                return False
+            data = encode_state(manager)
+            seq = manager.journal_seq
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        self.offload(write_snapshot, self.snapshot_path(game.code), data)
+        self._snapshot_versions[game.code] = version
+        if manager.journal is not None:
+            manager.journal.compact(seq)
+        return True
+
+    def save_snapshots(self) -> int:
+        """Snapshot every hosted game that changed; returns how many were written."""
+        written = 0
+        for game in self:
+            try:
+                written += self.save_snapshot(game)
+            except OSError as e:
+                logger.error(f"Game {game.code}: snapshot failed: {e}")
+        return written
+
+    def run_snapshots(self, interval: float):
+        """Background loop: snapshot changed games every `interval` seconds."""
+        while True:
+            self._sleep(interval)
+            self.save_snapshots()
+
+    def close(self):
+        """Snapshot every game, then commit and close its journal."""
+        self.save_snapshots()
+        for game in self:
+            if game.manager.journal is not None:
+                game.manager.journal.close()
+
+    def get(self, code) -> Optional[Game]:
+        """The game hosted under `code`, restoring it from disk if it was saved but is not hosted yet."""
+        code = normalize_code(code)
+        if not code:
+            return None
+        game = self._games.get(code)
+        if game is None and (self.snapshot_dir or self.journal_dir):
+            game = self.restore(code)
+        return game
+
+    def resolve(self, code=None) -> Optional[Game]:
+        """The game for `code`; without a code, the only hosted game if there is exactly one."""
+        if code:
+            return self.get(code)
+        games = list(self._games.values())
+        return games[0] if len(games) == 1 else None
+
+    def find_in(self, rooms: Iterable[str]) -> Optional[Game]:
+        """The game whose room is among `rooms` (the rooms a socket has joined)."""
+        for room in rooms:
+            game = self._games.get(room)
+            if game is not None:
+                return game
+        return None
+
+    def remove(self, code: str) -> bool:
+        """Stop hosting a finished game and delete its saved state."""
+        with self._lock:
+            game = self._games.pop(code, None)
+        if game is not None:
+            if game.manager.journal is not None:
+                game.manager.journal.close()
+                os.remove(game.manager.journal.path)
+            if self.snapshot_dir and os.path.exists(self.snapshot_path(code)):
+                os.remove(self.snapshot_path(code))
+            self._snapshot_versions.pop(code, None)
+            logger.info(f"Game removed: {code}")
+        return game is not None
+
+    def drop(self, code: str) -> bool:
+        """Stop hosting a game another worker took over, leaving its saved state to the new owner."""
+        with self._lock:
+            game = self._games.pop(code, None)
+        if game is not None:
+            if game.manager.journal is not None:
+                game.manager.journal.abandon()
+            self._snapshot_versions.pop(code, None)
+            logger.info(f"Game dropped: {code} (hosted by another worker now)")
+        return game is not None
+
+    def __contains__(self, code) -> bool:
+        return normalize_code(code) in self._games
+
+    def __iter__(self) -> Iterator[Game]:
+        return iter(list(self._games.values()))
+
+    def __len__(self) -> int:
+        return len(self._games)
@@ -1,76 +1,108 @@
-import base64
-import io
 import logging
+from typing import Dict, Tuple
 
-import qrcode
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, abort, render_template, request, jsonify, url_for
+
+from app import assets, events, serialization
+from app.registry import normalize_code
+from config import Config
 
 logger = logging.getLogger(__name__)
 bp = Blueprint('main', __name__)
 
+# (template, codec, transports) -> rendered page; pages only vary with the server's Socket.IO settings
+_pages: Dict[Tuple[str, str, str], assets.Asset] = {}
 
-def get_local_ip():
-    """Get local IP address for QR code."""
-    import socket
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        logger.debug(f"Detected local IP: {ip}")
-        return ip
-    except Exception as e:
-        logger.warning(f"Failed to detect local IP, defaulting to localhost: {e}")
-        return "localhost"
+
+def render_page(template: str):
+    """Serve a client page, rendered once per payload encoding and transport list the server offers."""
+    codec = 'msgpack' if serialization.msgpack_enabled() else 'json'
+    transports = ','.join(Config.SOCKETIO_TRANSPORTS)
+    key = (template, codec, transports)
+    page = _pages.get(key)
+    if page is None:
+        html = render_template(template, codec=codec, transports=transports).encode('utf-8')
+        page = _pages[key] = assets.Asset(template, html, assets.CONTENT_TYPES['.html'])
+    # Revalidated on every load (the ETag makes that a 304); the bundles it names are immutable
+    return assets.send(page, 'no-cache')
+
+
+@bp.app_template_global()
+def asset_url(name: str) -> str:
+    """URL of a static bundle under its current fingerprinted name."""
+    return url_for('main.asset', filename=assets.bundle_filename(name))
 
 
 @bp.route('/')
 def index():
     """Trebek's main interface."""
     logger.debug(f"Trebek interface requested from {request.remote_addr}")
-    return render_template('trebek.html')
+    return render_page('trebek.html')
 
 
 @bp.route('/join')
 def join():
     """Jennings join and game interface."""
     logger.debug(f"Join interface requested from {request.remote_addr}")
-    return render_template('jennings.html')
+    return render_page('jennings.html')
 
 
-@bp.route('/qr')
-def qr_code():
-    """Generate QR code for join URL."""
-    logger.info("QR code generation requested")
+@bp.route('/assets/<filename>')
+def asset(filename):
+    """A fingerprinted JS/CSS bundle, cached by browsers for a year."""
+    bundle = assets.find(filename)
+    if bundle is None:
+        abort(404)
+    return assets.send(bundle, assets.IMMUTABLE)
+
+
+def hosted(code: str) -> bool:
+    """Whether game `code` is hosted here or, in a cluster, by another worker."""
+    return code in events.games or (events.cluster is not None and events.cluster.owner(code) is not None)
+
+
+def join_qr(fmt: str):
+    """The join QR code of the game named by ?game=CODE, as the `fmt` asset of its cached QRImage."""
+    raw = request.args.get('game')
+    code = normalize_code(raw)
+    if raw and code is None:
+        return jsonify({'error': 'Invalid game code'}), 400
+    if code is not None and not hosted(code):
+        # Only hosted games get a cached image, so arbitrary codes can't grow the cache
+        return jsonify({'error': 'Game not found'}), 404
     try:
-        local_ip = get_local_ip()
-        port = request.host.split(':')[-1]
-        url = f"http://{local_ip}:{port}/join"
-        logger.debug(f"Generating QR code for URL: {url}")
-
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(url)
-        qr.make(fit=True)
-
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        buf = io.BytesIO()
-        img.save(buf, format='PNG')
-        buf.seek(0)
-
-        img_base64 = base64.b64encode(buf.getvalue()).decode()
-        logger.info(f"QR code generated successfully for {url}")
-        return jsonify({
-            'qr_code': f"data:image/png;base64,{img_base64}",
-            'url': url
-        })
+        image = events.qr_codes.get(code, request.host, request.scheme)
     except Exception as e:
         logger.error(f"Failed to generate QR code: {e}", exc_info=True)
         return jsonify({'error': 'Failed to generate QR code'}), 500
+    # Revalidated on every load: the same URL gets a new image if the address changes
+    return assets.send(getattr(image, fmt), 'no-cache')
+
+
+@bp.route('/qr')
+def qr_code():
+    """Join URL for ?game=CODE and its QR code as a PNG data URI."""
+    return join_qr('json')
+
+
+@bp.route('/qr.png')
+def qr_png():
+    return join_qr('png')
+
+
+@bp.route('/qr.svg')
+def qr_svg():
+    return join_qr('svg')
 
 
 @bp.route('/display')
 def display():
     """TV display interface."""
     logger.debug(f"Display interface requested from {request.remote_addr}")
-    return render_template('display.html')
+    return render_page('display.html')
+
+
+@bp.route('/metrics/payloads')
+def payload_metrics():
+    """Size histogram of the Socket.IO packets sent so far, per event."""
+    return jsonify(serialization.payload_sizes.snapshot())
@@ -0,0 +1,133 @@
+import json
+import logging
+import threading
+from typing import Any, Dict, List
+
+from socketio import packet
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for MessagePack payloads
+    msgpack = None
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Rooms of clients that take MessagePack payloads end in this suffix
+MSGPACK_ROOM_SUFFIX = ':msgpack'
+
+
+class PreEncoded:
+    """A payload whose JSON text is computed once and reused on every emit.
+
+    Socket.IO encodes each packet as ``[event, *args]``; when an argument is
+    a PreEncoded, `dumps` splices its cached text into the packet
+    instead of encoding the payload again.
+    """
+    __slots__ = ('data', 'text', '_packed')
+
+    def __init__(self, data: Any):
+        self.data = data
+        self.text = json.dumps(data, separators=(',', ':'))
+        self._packed = None
+
+    def packed(self) -> bytes:
+        """The payload MessagePack-encoded, computed on first use and then reused."""
+        if self._packed is None:
+            self._packed = msgpack.packb(self.data)
+        return self._packed
+
+    def __len__(self):
+        return len(self.text)
+
+
+def _default(obj):
+    if isinstance(obj, PreEncoded):
+        return obj.data
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj, **kwargs) -> str:
+    """Encode a Socket.IO packet, splicing in any PreEncoded arguments."""
+    if isinstance(obj, list) and any(isinstance(item, PreEncoded) for item in obj):
+        return '[' + ','.join(
+            item.text if isinstance(item, PreEncoded) else json.dumps(item, default=_default, **kwargs)
+            for item in obj
+        ) + ']'
+    return json.dumps(obj, default=_default, **kwargs)
+
+
+def loads(s, **kwargs):
+    return json.loads(s, **kwargs)
+
+
+def msgpack_enabled() -> bool:
+    """Whether the server sends MessagePack payloads to clients that ask for them.
+
+    Needs ``SOCKETIO_CODEC=msgpack`` and the optional msgpack package;
+    otherwise every client gets JSON.
+    """
+    return Config.SOCKETIO_CODEC == 'msgpack' and msgpack is not None
+
+
+def packb(payload) -> bytes:
+    """MessagePack encoding of an event payload (a PreEncoded reuses its cached bytes)."""
+    if isinstance(payload, PreEncoded):
+        return payload.packed()
+    return msgpack.packb(payload, default=_default)
+
+
+class PayloadSizes:
+    """Histogram of encoded Socket.IO packet sizes, per event name.
+
+    Each packet is counted once when it is encoded, however many clients
+    it then goes to. Bucket ``n`` counts packets of up to ``2 ** n`` bytes
+    (anything under 64 bytes lands in the first bucket).
+    """
+    MIN_BUCKET = 6
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, event: str, size: int):
+        bucket = max(self.MIN_BUCKET, (size - 1).bit_length())
+        with self._lock:
+            stats = self._events.get(event)
+            if stats is None:
+                stats = self._events[event] = {'count': 0, 'bytes': 0, 'max': 0, 'buckets': {}}
+            stats['count'] += 1
+            stats['bytes'] += size
+            stats['max'] = max(stats['max'], size)
+            stats['buckets'][bucket] = stats['buckets'].get(bucket, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per event: count, total and max bytes, and counts keyed by bucket upper bound (``"<=1024"``)."""
+        with self._lock:
+            return {event: {'count': s['count'], 'bytes': s['bytes'], 'max': s['max'],
+                            'buckets': {f"<={2 ** b}": n for b, n in sorted(s['buckets'].items())}}
+                    for event, s in self._events.items()}
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+
+payload_sizes = PayloadSizes()
+
+
+def wire_size(encoded) -> int:
+    """Bytes of an encoded packet: one text frame, or a text header plus binary attachments."""
+    frames: List = encoded if isinstance(encoded, list) else [encoded]
+    return sum(len(f.encode('utf-8')) if isinstance(f, str) else len(f) for f in frames)
+
+
+class MeasuredPacket(packet.Packet):
+    """A Socket.IO packet that records its encoded size in `payload_sizes`."""
+
+    def encode(self):
+        encoded = super().encode()
+        if self.packet_type in (packet.EVENT, packet.BINARY_EVENT) and self.data:
+            payload_sizes.record(str(self.data[0]), wire_size(encoded))
+        return encoded
@@ -0,0 +1,282 @@
+"""
+Compact binary snapshots of a game's state.
+
+A snapshot holds everything needed to rebuild a GameManager on top of its
+question bank: phase, teams, players, a bitmap of used questions, the
+current question, the buzz queue and the attempted teams, plus the journal
+sequence number it was taken at (journal records above it are replayed on
+top, see app/journal.py).
+
+Layout: ``MAGIC``, a format version byte, then a zlib-compressed body of
+varints, zigzag varints, length-prefixed UTF-8 strings and raw bitmaps.
+Question text is not stored; the bank is reloaded from its source (the
+questions file, or for a board sampled from the question library, the
+stored question ids) and the snapshot refuses to load unless the reloaded
+bank has the same content digest as the one it was taken on.
+
+Snapshots are small (a few hundred bytes for a typical game, well under a
+megabyte for 10k players over a 100k-question bank) and decode in a few
+milliseconds, so a restarted worker can pick up a live game from the
+snapshot directory shared with the worker that hosted it.
+"""
+import hashlib
+import logging
+import os
+import zlib
+from typing import List
+
+from app.models import BuzzEntry, GamePhase, Player, QuestionState, Team
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'JPSNAP'
+VERSION = 1
+
+_PHASES = list(GamePhase)
+_QUESTION_STATES = list(QuestionState)
+
+
+class SnapshotError(ValueError):
+    """A snapshot is corrupt or does not match the loaded question bank."""
+
+
+class _Writer:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def uint(self, n: int):
+        while n >= 0x80:
+            self.buf.append((n & 0x7F) | 0x80)
+            n >>= 7
+        self.buf.append(n)
+
+    def int(self, n: int):
+        self.uint((n << 1) ^ (n >> 63))
+
+    def str(self, s: str):
+        data = s.encode('utf-8')
+        self.uint(len(data))
+        self.buf += data
+
+    def bytes(self, data: bytes):
+        self.uint(len(data))
+        self.buf += data
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def uint(self) -> int:
+        result = shift = 0
+        data = self.data
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def int(self) -> int:
+        n = self.uint()
+        return (n >> 1) ^ -(n & 1)
+
+    def bytes(self) -> bytes:
+        size = self.uint()
+        data = self.data[self.pos:self.pos + size]
+        if len(data) != size:
+            raise SnapshotError("Snapshot is truncated")
+        self.pos += size
+        return data
+
+    def str(self) -> str:
+        return self.bytes().decode('utf-8')
+
+
+def encode_state(manager) -> bytes:
+    """Serialize a GameManager's state; call with the game's lock held for a consistent snapshot."""
+    state = manager.state
+    w = _Writer()
+    w.uint(manager.journal_seq)
+    w.uint(_PHASES.index(state.phase))
+    w.uint(_QUESTION_STATES.index(state.question_state))
+    w.uint(1 if state.buzz_timer_active else 0)
+    w.uint(manager._next_color_idx)
+
+    teams = list(state.teams.values())
+    team_index = {team.id: i for i, team in enumerate(teams)}
+    w.uint(len(teams))
+    for team in teams:
+        w.str(team.id)
+        w.str(team.name)
+        w.str(team.color)
+        w.int(team.score)
+
+    players = list(state.players.values())
+    player_index = {player.id: i for i, player in enumerate(players)}
+    w.uint(len(players))
+    for player in players:
+        w.str(player.id)
+        w.str(player.name)
+        w.str(player.token)
+        w.uint(team_index[player.team_id])
+
+    source = manager.board_source
+    w.uint(0 if source is None else source[0])
+    if source is not None:
+        w.uint(len(source[1]))
+        for question_id in source[1]:
+            w.uint(question_id)
+
+    questions = state.questions
+    w.uint(len(questions))
+    w.bytes(questions_digest(manager))
+    w.bytes(manager.question_index.used_bitmap())
+    current = state.current_question
+    w.uint(0 if current is None else _position(manager, current) + 1)
+
+    entries = list(state.buzz_queue)
+    w.uint(len(entries))
+    for entry in entries:
+        w.uint(player_index[entry.player_id])
+        w.uint(entry.timestamp)
+
+    attempted = list(state.teams_attempted)
+    w.uint(len(attempted))
+    for team_id in attempted:
+        w.uint(team_index[team_id])
+
+    return MAGIC + bytes([VERSION]) + zlib.compress(bytes(w.buf), 6)
+
+
+def questions_digest(manager) -> bytes:
+    """Content digest of the manager's question bank, computed once per loaded bank.
+
+    A bank loaded whole from a compiled file uses the file's digest;
+    anything else (a library board, questions set directly) hashes each
+    question's round, category, value and text in order.
+    """
+    questions = manager.state.questions
+    cached = manager.questions_digest
+    if cached is not None and cached[0] is questions:
+        return cached[1]
+    if questions and questions is manager._bank_questions:
+        digest = questions[0]._bank.digest()
+    else:
+        h = hashlib.blake2b(digest_size=16)
+        for q in questions:
+            h.update(f"{q.round}\x1f{q.category}\x1f{q.value}\x1f{q.question}\x1f{q.answer}\x1e".encode('utf-8'))
+        digest = h.digest()
+    manager.questions_digest = (questions, digest)
+    return digest
+
+
+def _position(manager, question) -> int:
+    if question._index is manager.question_index:
+        return question._bit
+    for i, q in enumerate(manager.state.questions):
+        if q is question:
+            return i
+    raise SnapshotError("Current question is not in the question bank")
+
+
+def restore_state(manager, data: bytes):
+    """Load a snapshot into `manager`, loading its question bank first if needed.
+
+    Players come back disconnected; they rejoin by reconnecting with their token.
+    """
+    if not data.startswith(MAGIC) or len(data) <= len(MAGIC):
+        raise SnapshotError("Not a game snapshot")
+    version = data[len(MAGIC)]
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    try:
+        r = _Reader(zlib.decompress(data[len(MAGIC) + 1:]))
+    except zlib.error as e:
+        raise SnapshotError(f"Corrupt snapshot: {e}") from e
+
+    try:
+        with manager.lock:
+            _restore(manager, r)
+    except (IndexError, UnicodeDecodeError) as e:
+        raise SnapshotError(f"Corrupt snapshot: {e}") from e
+
+
+def _restore(manager, r: _Reader):
+    state = manager.state
+    journal_seq = r.uint()
+    phase = _PHASES[r.uint()]
+    question_state = _QUESTION_STATES[r.uint()]
+    buzz_timer_active = bool(r.uint())
+    next_color_idx = r.uint()
+
+    teams: List[Team] = []
+    for _ in range(r.uint()):
+        team_id, name, color = r.str(), r.str(), r.str()
+        teams.append(Team(id=team_id, name=name, color=color, score=r.int()))
+
+    players: List[Player] = []
+    for _ in range(r.uint()):
+        player_id, name, token = r.str(), r.str(), r.str()
+        team = teams[r.uint()]
+        players.append(Player(id=player_id, name=name, team_id=team.id, session_id='', connected=False,
+                              token=token))
+        team.player_ids.append(player_id)
+
+    board_round = r.uint()
+    if board_round:
+        board_ids = [r.uint() for _ in range(r.uint())]
+        if manager.board_source != (board_round, board_ids):
+            manager.load_board(board_round, board_ids)
+
+    count = r.uint()
+    if count and not state.questions:
+        manager.load_questions()
+    questions = state.questions
+    if count != len(questions):
+        raise SnapshotError(f"Snapshot has {count} questions but the loaded bank has {len(questions)}")
+    if r.bytes() != questions_digest(manager):
+        raise SnapshotError("Snapshot was taken on a different question bank")
+    bitmap = r.bytes()
+    current = r.uint()
+
+    teams_by_id = {team.id: team for team in teams}
+    buzz_queue = []
+    for _ in range(r.uint()):
+        player = players[r.uint()]
+        buzz_queue.append(BuzzEntry(player_id=player.id, team_id=player.team_id, timestamp=r.uint()))
+    attempted = [teams[r.uint()].id for _ in range(r.uint())]
+
+    if len(bitmap) != (count + 7) // 8:
+        raise SnapshotError("Snapshot used-bitmap does not match its question count")
+    manager.question_index.load_used(bitmap)
+
+    state.phase = phase
+    state.question_state = question_state
+    state.buzz_timer_active = buzz_timer_active
+    state.teams = teams_by_id
+    state.players = {player.id: player for player in players}
+    state.current_question = questions[current - 1] if current else None
+    state.buzz_queue = buzz_queue
+    state.teams_attempted = attempted
+    manager._next_color_idx = next_color_idx
+    manager.journal_seq = journal_seq
+    manager.clear_sessions()
+
+
+def write_snapshot(path: str, data: bytes):
+    """Write snapshot bytes atomically: readers see the old snapshot or the new one, never a mix."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    logger.debug(f"Snapshot written: {path} ({len(data)} bytes)")
+
+
+def read_snapshot(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
@@ -0,0 +1,184 @@
+"""
+Versioned delta encoding for game_update broadcasts.
+
+Clients receive a full snapshot (``game_update``) when they connect or ask for
+``request_game_state``; the snapshot carries the sequence number it was taken
+at. Every later change is broadcast as a ``game_patch``::
+
+    {'seq': 7, 'ops': [['team', 'team_2', {'score': 400}],
+                       ['append', 'buzz_queue', [{...}]]]}
+
+Operations:
+
+- ``['set', key, value]``       replace a top-level summary key
+- ``['team', team_id, fields]`` update some fields of one team
+- ``['team_add', team]``        append a new team
+- ``['append', key, items]``    extend a top-level list (buzz_queue, teams_attempted)
+
+A client applies a patch only if ``patch.seq == state.seq + 1``; on a gap it
+emits ``request_game_state`` to resync.
+
+Each role (trebek, display, player, spectator) has its own channel and sees
+its own projection of the summary, so answers only ever reach the host.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.serialization import PreEncoded
+
+logger = logging.getLogger(__name__)
+
+Op = List[Any]
+
+ROLES = ('trebek', 'display', 'player', 'spectator')
+
+
+def project_summary(summary: Dict, role: str) -> Dict:
+    """The part of a game summary a client with `role` is allowed to see.
+
+    - trebek: everything, including the answer
+    - display: the question text but not the answer
+    - player: category and value of the current question only
+    - spectator: phase and teams, enough to pick a team to join
+    """
+    if role == 'trebek':
+        return summary
+    if role == 'spectator':
+        return {'phase': summary['phase'], 'teams': summary['teams']}
+
+    question = summary['current_question']
+    if question is not None:
+        if role == 'display':
+            question = {k: v for k, v in question.items() if k != 'answer'}
+        else:
+            question = {'category': question['category'], 'value': question['value']}
+    return dict(summary, current_question=question)
+
+
+def _diff_list(key: str, old: List, new: List) -> List[Op]:
+    if old == new:
+        return []
+    if len(new) > len(old) and new[:len(old)] == old:
+        return [['append', key, new[len(old):]]]
+    return [['set', key, new]]
+
+
+def _diff_teams(old: List[Dict], new: List[Dict]) -> List[Op]:
+    if len(new) < len(old) or any(o['id'] != n['id'] for o, n in zip(old, new)):
+        return [['set', 'teams', new]]
+
+    ops = []
+    for old_team, new_team in zip(old, new):
+        changed = {k: v for k, v in new_team.items() if old_team.get(k) != v}
+        if changed:
+            ops.append(['team', new_team['id'], changed])
+    for team in new[len(old):]:
+        ops.append(['team_add', team])
+    return ops
+
+
+def diff_summary(old: Dict, new: Dict) -> List[Op]:
+    """Compute the patch operations that turn summary `old` into `new`."""
+    ops: List[Op] = []
+    for key, value in new.items():
+        if key not in old:
+            ops.append(['set', key, value])
+        elif key == 'teams':
+            ops.extend(_diff_teams(old[key], value))
+        elif key in ('buzz_queue', 'teams_attempted'):
+            ops.extend(_diff_list(key, old[key], value))
+        elif old[key] != value:
+            ops.append(['set', key, value])
+    return ops
+
+
+def apply_patch(summary: Dict, ops: List[Op]) -> Dict:
+    """Apply patch operations to a summary in place (mirror of the client code)."""
+    for op in ops:
+        kind = op[0]
+        if kind == 'set':
+            summary[op[1]] = op[2]
+        elif kind == 'append':
+            summary[op[1]] = summary[op[1]] + op[2]
+        elif kind == 'team':
+            team = next(t for t in summary['teams'] if t['id'] == op[1])
+            team.update(op[2])
+        elif kind == 'team_add':
+            summary['teams'].append(op[1])
+        else:
+            raise ValueError(f"Unknown patch op: {kind}")
+    return summary
+
+
+class StateChannel:
+    """Tracks the last state broadcast to a group of clients and its sequence number."""
+
+    def __init__(self):
+        self.seq = 0
+        self._state: Optional[Dict] = None
+        self._snapshot: Optional[Dict] = None
+        self._snapshot_payload: Optional[PreEncoded] = None
+
+    def update(self, summary: Dict) -> Optional[Dict]:
+        """Record a new summary; return the game_patch message, or None if nothing changed."""
+        if self._state is None:
+            self._state = summary
+            self._snapshot = self._snapshot_payload = None
+            return None
+
+        ops = diff_summary(self._state, summary)
+        if not ops:
+            return None
+
+        self.seq += 1
+        self._state = summary
+        self._snapshot = self._snapshot_payload = None
+        logger.debug(f"State patch seq={self.seq}: {len(ops)} op(s)")
+        return {'seq': self.seq, 'ops': ops}
+
+    def snapshot(self) -> Dict:
+        """Full game_update message for the last recorded state."""
+        if self._snapshot is None:
+            self._snapshot = dict(self._state or {}, seq=self.seq)
+        return self._snapshot
+
+    def snapshot_payload(self) -> PreEncoded:
+        """The snapshot JSON-encoded, reused until the next change."""
+        if self._snapshot_payload is None:
+            self._snapshot_payload = PreEncoded(self.snapshot())
+        return self._snapshot_payload
+
+
+class RoleChannels:
+    """One StateChannel per role, each fed its own projection of the summary.
+
+    Projections are computed once per `update` (i.e. once per state version)
+    and reused for every snapshot until the next change.
+    """
+
+    def __init__(self):
+        self.channels = {role: StateChannel() for role in ROLES}
+        self.version: Optional[int] = None
+
+    def update(self, summary: Dict, version: Optional[int] = None) -> Dict[str, Dict]:
+        """Record a new summary; return the game_patch message for each role that changed.
+
+        When `version` matches the last recorded state version, nothing is diffed.
+        """
+        if version is not None and version == self.version:
+            return {}
+        self.version = version
+        patches = {}
+        for role, channel in self.channels.items():
+            patch = channel.update(project_summary(summary, role))
+            if patch:
+                patches[role] = patch
+        return patches
+
+    def snapshot(self, role: str) -> Dict:
+        """Full game_update message for `role`."""
+        return self.channels[role].snapshot()
+
+    def snapshot_payload(self, role: str) -> PreEncoded:
+        """Full game_update message for `role`, JSON-encoded."""
+        return self.channels[role].snapshot_payload()
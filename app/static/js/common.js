@@ -0,0 +1,43 @@
+// Shared by every page; bundled ahead of the page's own script.
+
+// MessagePack payloads if the server offers them and the decoder loaded; JSON otherwise
+const codec = document.documentElement.dataset.codec === 'msgpack' && window.MessagePack ? 'msgpack' : 'json';
+
+// Socket.IO options for a connection with `query`, limited to the transports the server accepts
+function socketOptions(query) {
+    return { query, transports: document.documentElement.dataset.transports.split(',') };
+}
+
+function decodePayload(data) {
+    return data instanceof ArrayBuffer || ArrayBuffer.isView(data) ? MessagePack.decode(data) : data;
+}
+
+function applyPatch(state, patch) {
+    patch.ops.forEach(([kind, key, value]) => {
+        if (kind === 'set') {
+            state[key] = value;
+        } else if (kind === 'append') {
+            state[key] = state[key].concat(value);
+        } else if (kind === 'team') {
+            Object.assign(state.teams.find(t => t.id === key), value);
+        } else if (kind === 'team_add') {
+            state.teams.push(key);
+        }
+    });
+    state.seq = patch.seq;
+}
+
+// Apply a cell_used event to the board layout: true if it changed the board,
+// false if the board already had it, null if an earlier change was missed
+// (the page should ask for the whole board again)
+function applyCellUsed(board, cell) {
+    if (board && cell.round === board.round && cell.version <= board.version) {
+        return false;  // Already in the layout we hold
+    }
+    if (!board || cell.round !== board.round || cell.base !== board.version) {
+        return null;
+    }
+    board.board[cell.category][cell.row].used = cell.used;
+    board.version = cell.version;
+    return true;
+}
@@ -0,0 +1,294 @@
+// Game to show, from /display?game=CODE (the server picks the only game if omitted)
+let gameCode = new URLSearchParams(window.location.search).get('game');
+const query = gameCode ? { game: gameCode } : {};
+if (codec === 'msgpack') query.codec = codec;
+const socket = io(socketOptions(query));
+let gameState = null;
+let resyncRequested = false;
+let currentBoard = null;
+let boardResyncRequested = false;
+let timerInterval = null;
+let lastAnswerer = null;
+let lastCorrect = null;
+let lastScoreChange = 0;
+
+socket.on('connect', () => {
+    console.log('Display connected');
+    socket.emit('register_display', { game: gameCode });
+});
+
+socket.on('registration_success', (data) => {
+    gameCode = data.game;
+    if (gameState && gameState.phase === 'lobby') loadQRCode();
+});
+
+socket.on('game_ended', () => {
+    gameState = null;
+    currentBoard = null;
+    setActiveScreen('lobbyScreen');
+    document.getElementById('qrCode').removeAttribute('src');
+    document.getElementById('joinUrl').textContent = 'This game has ended';
+    document.getElementById('teamsDisplay').innerHTML = '';
+});
+
+socket.on('game_update', (data) => {
+    data = decodePayload(data);
+    gameState = data;
+    resyncRequested = false;
+    updateDisplay();
+});
+
+socket.on('game_patch', (patch) => {
+    patch = decodePayload(patch);
+    if (!gameState || patch.seq !== gameState.seq + 1) {
+        // Missed or out-of-order patch: ask for a fresh snapshot
+        if (!resyncRequested && (!gameState || patch.seq > gameState.seq)) {
+            resyncRequested = true;
+            socket.emit('request_game_state');
+        }
+        return;
+    }
+    applyPatch(gameState, patch);
+    updateDisplay();
+});
+
+socket.on('board_update', (data) => {
+    data = decodePayload(data);
+    currentBoard = data;
+    boardResyncRequested = false;
+    renderBoard();
+});
+
+socket.on('cell_used', (cell) => {
+    const applied = applyCellUsed(currentBoard, decodePayload(cell));
+    if (applied === null && !boardResyncRequested) {
+        // Missed a change: ask for the whole board once
+        boardResyncRequested = true;
+        socket.emit('request_board');
+    } else if (applied) {
+        renderBoard();
+    }
+});
+
+socket.on('score_update', (data) => {
+    data = decodePayload(data);
+    // Show score update screen
+    lastAnswerer = data.player_name;
+    lastCorrect = data.correct;
+    lastScoreChange = data.score_change;
+    showScoreUpdate(data);
+});
+
+function updateDisplay() {
+    if (!gameState) return;
+
+    if (gameState.phase === 'lobby') {
+        showLobby();
+    } else if (gameState.current_question) {
+        if (gameState.buzz_timer_active) {
+            showQuestionWithTimer();
+        } else {
+            showQuestion();
+        }
+    } else if (gameState.phase === 'round_1' || gameState.phase === 'round_2') {
+        showBoard();
+    }
+}
+
+function showLobby() {
+    setActiveScreen('lobbyScreen');
+    loadQRCode();
+    renderTeams();
+}
+
+function showBoard() {
+    setActiveScreen('boardScreen');
+    renderScoreboard('scoreboard');
+    if (currentBoard) {
+        renderBoard();
+    }
+}
+
+function showQuestion() {
+    setActiveScreen('questionScreen');
+    document.getElementById('questionCategory').textContent = gameState.current_question.category;
+    document.getElementById('questionValue').textContent = '$' + gameState.current_question.value;
+    document.getElementById('questionText').textContent = gameState.current_question.question;
+    document.getElementById('questionText').style.display = 'block';
+    document.getElementById('buzzTimer').style.display = 'none';
+    renderScoreboard('scoreboardBottom');
+}
+
+function showQuestionWithTimer() {
+    setActiveScreen('questionScreen');
+    document.getElementById('questionCategory').textContent = gameState.current_question.category;
+    document.getElementById('questionValue').textContent = '$' + gameState.current_question.value;
+    document.getElementById('questionText').textContent = gameState.current_question.question;
+    document.getElementById('questionText').style.display = 'block';
+    document.getElementById('buzzTimer').style.display = 'block';
+
+    startTimer(4);
+    renderScoreboard('scoreboardBottom');
+}
+
+function showScoreUpdate(data) {
+    setActiveScreen('scoreUpdateScreen');
+
+    // Safely resolve team and prefer authoritative new_score from server
+    const team = gameState && gameState.teams ? gameState.teams.find(t => t.id === data.team_id) : null;
+    const teamName = team ? team.name : (data.team_id || 'Unknown Team');
+    const newScore = (data.new_score !== undefined && data.new_score !== null)
+        ? data.new_score
+        : (team ? team.score : null);
+
+    document.getElementById('answererInfo').textContent = `${data.player_name || 'Unknown'} from ${teamName}`;
+
+    const indicator = document.getElementById('correctIndicator');
+    indicator.textContent = data.correct ? '✓ CORRECT!' : '✗ INCORRECT';
+    indicator.className = 'correct-indicator ' + (data.correct ? 'correct' : 'incorrect');
+
+    const change = document.getElementById('scoreChange');
+    change.textContent = (data.score_change >= 0 ? '+' : '') + '$' + Math.abs(data.score_change || 0);
+    change.className = 'score-change ' + ((data.score_change || 0) >= 0 ? 'positive' : 'negative');
+
+    document.getElementById('newScore').textContent = newScore !== null ? 'New Score: $' + newScore : '';
+
+    // Return to appropriate screen after 3 seconds based on latest gameState
+    setTimeout(() => {
+        // If a question is still active, show the question screen (so next buzzer can be adjudicated)
+        if (gameState && gameState.current_question) {
+            if (gameState.buzz_timer_active) {
+                showQuestionWithTimer();
+            } else {
+                showQuestion();
+            }
+        } else {
+            // No current question - show board
+            showBoard();
+        }
+    }, 3000);
+}
+
+function setActiveScreen(screenId) {
+    document.querySelectorAll('.screen').forEach(s => s.classList.remove('active'));
+    document.getElementById(screenId).classList.add('active');
+}
+
+function loadQRCode() {
+    if (!gameCode) return;
+    fetch('/qr?game=' + encodeURIComponent(gameCode))
+        .then(r => r.json())
+        .then(data => {
+            document.getElementById('qrCode').src = '/qr.svg?game=' + encodeURIComponent(gameCode);
+            document.getElementById('joinUrl').textContent = data.url;
+        });
+}
+
+function renderTeams() {
+    if (!gameState || !gameState.teams) return;
+
+    const container = document.getElementById('teamsDisplay');
+    container.innerHTML = '';
+
+    gameState.teams.forEach(team => {
+        const card = document.createElement('div');
+        card.className = 'team-card';
+        card.style.borderLeftColor = team.color;
+        card.innerHTML = `
+            <div class="team-card-name">${team.name}</div>
+            <div class="team-card-players">
+                ${team.players.map(p => p.name).join('<br>')}
+            </div>
+        `;
+        container.appendChild(card);
+    });
+}
+
+function renderScoreboard(elementId) {
+    if (!gameState || !gameState.teams) return;
+
+    const scoreboard = document.getElementById(elementId);
+    scoreboard.innerHTML = '';
+
+    gameState.teams.forEach(team => {
+        const item = document.createElement('div');
+        item.className = 'score-item';
+        item.innerHTML = `
+            <div class="score-team-name" style="color: ${team.color}">${team.name}</div>
+            <div class="score-value">$${team.score}</div>
+        `;
+        scoreboard.appendChild(item);
+    });
+}
+
+function renderBoard() {
+    if (!currentBoard) return;
+
+    const board = document.getElementById('board');
+    board.innerHTML = '';
+
+    const categories = Object.keys(currentBoard.board);
+    const round = currentBoard.round;
+    const expectedValues = round === 1
+        ? [100, 200, 300, 400, 500]
+        : [200, 400, 600, 800, 1000];
+
+    board.style.gridTemplateRows = `auto repeat(${expectedValues.length}, 1fr)`;
+
+    categories.forEach((cat, colIndex) => {
+        const header = document.createElement('div');
+        header.className = 'category-header';
+        header.textContent = cat;
+        header.style.gridColumn = colIndex + 1;
+        header.style.gridRow = 1;
+        board.appendChild(header);
+    });
+
+    categories.forEach((cat, colIndex) => {
+        const questions = currentBoard.board[cat];
+
+        expectedValues.forEach((expectedValue, rowIndex) => {
+            const cell = document.createElement('div');
+            cell.style.gridColumn = colIndex + 1;
+            cell.style.gridRow = rowIndex + 2;
+
+            const q = questions.find(question => question.value === expectedValue);
+
+            if (q) {
+                cell.className = 'question-cell' + (q.used ? ' used' : '');
+                cell.textContent = '$' + q.value;
+            } else {
+                cell.className = 'question-cell used';
+                cell.textContent = '—';
+                cell.style.opacity = '0.3';
+            }
+
+            board.appendChild(cell);
+        });
+    });
+}
+
+function startTimer(seconds) {
+    stopTimer();
+    let remaining = seconds;
+    const display = document.getElementById('buzzTimer');
+    display.textContent = remaining;
+
+    timerInterval = setInterval(() => {
+        remaining--;
+        if (remaining >= 0) {
+            display.textContent = remaining;
+        } else {
+            stopTimer();
+            document.getElementById('buzzTimer').style.display = 'none';
+            document.getElementById('questionText').style.display = 'block';
+        }
+    }, 1000);
+}
+
+function stopTimer() {
+    if (timerInterval) {
+        clearInterval(timerInterval);
+        timerInterval = null;
+    }
+}
@@ -0,0 +1,200 @@
+// Game to join, from the QR code link /join?game=CODE
+const gameCode = new URLSearchParams(window.location.search).get('game');
+const query = gameCode ? { game: gameCode } : {};
+if (codec === 'msgpack') query.codec = codec;
+const socket = io(socketOptions(query));
+let myPlayerId = null;
+let myTeamId = null;
+let gameState = null;
+let resyncRequested = false;
+
+// Check if player was already registered in this game
+function checkExistingPlayer() {
+    const savedPlayerId = localStorage.getItem('jeopardy_player_id');
+    const savedTeamId = localStorage.getItem('jeopardy_team_id');
+    const savedToken = localStorage.getItem('jeopardy_player_token');
+    const savedGame = localStorage.getItem('jeopardy_player_game');
+
+    // Player ids repeat in every game, so only reconnect to the game they came from
+    if (savedPlayerId && savedTeamId && savedToken && gameCode && savedGame === gameCode.trim().toUpperCase()) {
+        // Try to reconnect as existing player
+        socket.emit('reconnect_player', {
+            player_id: savedPlayerId,
+            team_id: savedTeamId,
+            token: savedToken,
+            game: gameCode
+        });
+    }
+}
+
+function forgetPlayer() {
+    localStorage.removeItem('jeopardy_player_id');
+    localStorage.removeItem('jeopardy_team_id');
+    localStorage.removeItem('jeopardy_player_token');
+    localStorage.removeItem('jeopardy_player_game');
+}
+
+socket.on('connect', () => {
+    console.log('Connected to server');
+    // Request initial game state
+    socket.emit('request_game_state', { game: gameCode });
+    // Check if we're reconnecting
+    checkExistingPlayer();
+});
+
+socket.on('game_update', (data) => {
+    data = decodePayload(data);
+    gameState = data;
+    resyncRequested = false;
+
+    // Update team dropdown if still in join view
+    if (!myPlayerId) {
+        loadTeams();
+    }
+
+    updateUI();
+});
+
+socket.on('game_patch', (patch) => {
+    patch = decodePayload(patch);
+    if (!gameState || patch.seq !== gameState.seq + 1) {
+        // Missed or out-of-order patch: ask for a fresh snapshot
+        if (!resyncRequested && (!gameState || patch.seq > gameState.seq)) {
+            resyncRequested = true;
+            socket.emit('request_game_state');
+        }
+        return;
+    }
+    applyPatch(gameState, patch);
+    if (!myPlayerId) {
+        loadTeams();
+    }
+    updateUI();
+});
+
+socket.on('registration_success', (data) => {
+    if (data.role === 'player') {
+        myPlayerId = data.player_id;
+        myTeamId = data.team_id;
+
+        // Save to localStorage for reconnection to this game
+        localStorage.setItem('jeopardy_player_id', myPlayerId);
+        localStorage.setItem('jeopardy_team_id', myTeamId);
+        localStorage.setItem('jeopardy_player_token', data.token);
+        localStorage.setItem('jeopardy_player_game', data.game);
+
+        document.getElementById('joinView').classList.add('hidden');
+        document.getElementById('gameView').classList.remove('hidden');
+    }
+});
+
+socket.on('buzz_rejected', (data) => {
+    setStatus('Buzz rejected: ' + data.reason, 'error');
+});
+
+socket.on('error', (data) => {
+    alert('Error: ' + data.message);
+});
+
+socket.on('game_ended', () => {
+    // The stored player belonged to the ended game
+    forgetPlayer();
+    myPlayerId = null;
+    myTeamId = null;
+    setStatus('The host ended this game', 'error');
+});
+
+socket.on('reconnect_failed', () => {
+    // Clear invalid stored credentials
+    forgetPlayer();
+});
+
+function loadTeams() {
+    const select = document.getElementById('teamSelect');
+
+    if (!gameState || !gameState.teams || gameState.teams.length === 0) {
+        select.innerHTML = '<option value="">No teams created yet...</option>';
+        return;
+    }
+
+    select.innerHTML = '<option value="">Select your team...</option>';
+    gameState.teams.forEach(team => {
+        const option = document.createElement('option');
+        option.value = team.id;
+        option.textContent = team.name;
+        select.appendChild(option);
+    });
+}
+
+function joinGame() {
+    const name = document.getElementById('playerName').value.trim();
+    const teamId = document.getElementById('teamSelect').value;
+
+    if (!name || !teamId) {
+        alert('Please enter your name and select a team');
+        return;
+    }
+
+    socket.emit('join_game', { name, team_id: teamId, game: gameCode });
+}
+
+function buzz() {
+    socket.emit('buzz', { player_id: myPlayerId });
+}
+
+function updateUI() {
+    if (!gameState || !myTeamId) return;
+
+    const myTeam = gameState.teams.find(t => t.id === myTeamId);
+    if (!myTeam) return;
+
+    document.getElementById('teamName').textContent = myTeam.name;
+    document.getElementById('teamScore').textContent = `${myTeam.score}`;
+
+    const buzzButton = document.getElementById('buzzButton');
+    const questionInfo = document.getElementById('questionInfo');
+
+    if (gameState.current_question) {
+        questionInfo.classList.remove('hidden');
+        document.getElementById('questionCategory').textContent = gameState.current_question.category;
+        document.getElementById('questionValue').textContent = `${gameState.current_question.value}`;
+
+        if (gameState.buzz_timer_active) {
+            buzzButton.disabled = true;
+            setStatus('Reading question... wait for buzz activation');
+        } else if (gameState.question_state === 'buzzing_open') {
+            // Check if my team already attempted (server-provided list) or is in the buzz queue
+            const attemptedTeams = gameState.teams_attempted || [];
+            const myTeamAttempted = attemptedTeams.includes(myTeamId) || gameState.buzz_queue.some(entry => entry.team_id === myTeamId);
+            const myBuzzPosition = gameState.buzz_queue.findIndex(entry => entry.player_id === myPlayerId);
+
+            if (myBuzzPosition >= 0) {
+                buzzButton.disabled = true;
+                if (myBuzzPosition === 0) {
+                    setStatus("You're up! Answer the question!", 'active');
+                } else {
+                    setStatus(`You buzzed in! Position: ${myBuzzPosition + 1}`, 'waiting');
+                }
+            } else if (myTeamAttempted) {
+                buzzButton.disabled = true;
+                setStatus('Your team already attempted this question');
+            } else {
+                buzzButton.disabled = false;
+                setStatus('BUZZ IN NOW!', 'ready');
+            }
+        }
+    } else {
+        questionInfo.classList.add('hidden');
+        buzzButton.disabled = true;
+        setStatus('Waiting for next question...');
+    }
+}
+
+function setStatus(message, type = '') {
+    const statusEl = document.getElementById('statusMessage');
+    statusEl.textContent = message;
+    statusEl.style.background = type === 'ready' ? 'rgba(50,205,50,0.3)' :
+                               type === 'active' ? 'rgba(255,215,0,0.3)' :
+                               type === 'error' ? 'rgba(220,20,60,0.3)' :
+                               'rgba(0,0,0,0.3)';
+}
@@ -0,0 +1,307 @@
+const socket = io(socketOptions(codec === 'msgpack' ? { codec } : {}));
+// Game this host runs; kept so a page reload takes back the same game
+let gameCode = localStorage.getItem('jeopardy_game_code');
+let gameState = null;
+let resyncRequested = false;
+let currentBoard = null;
+let boardResyncRequested = false;
+let myRole = null;
+let timerInterval = null;
+
+socket.on('connect', () => {
+    console.log('Connected to server');
+    socket.emit('register_trebek', { game: gameCode });
+});
+
+socket.on('registration_success', (data) => {
+    myRole = data.role;
+    gameCode = data.game;
+    localStorage.setItem('jeopardy_game_code', gameCode);
+    console.log('Registered as:', myRole, 'in game', gameCode);
+    loadQRCode();
+});
+
+socket.on('game_ended', () => {
+    // Host a fresh game under a new code instead of rejoining the ended one
+    localStorage.removeItem('jeopardy_game_code');
+    gameCode = null;
+    gameState = null;
+    currentBoard = null;
+    socket.emit('register_trebek', {});
+});
+
+socket.on('game_update', (data) => {
+    data = decodePayload(data);
+    gameState = data;
+    resyncRequested = false;
+    updateUI();
+});
+
+socket.on('game_patch', (patch) => {
+    patch = decodePayload(patch);
+    if (!gameState || patch.seq !== gameState.seq + 1) {
+        // Missed or out-of-order patch: ask for a fresh snapshot
+        if (!resyncRequested && (!gameState || patch.seq > gameState.seq)) {
+            resyncRequested = true;
+            socket.emit('request_game_state');
+        }
+        return;
+    }
+    applyPatch(gameState, patch);
+    updateUI();
+});
+
+socket.on('board_update', (data) => {
+    data = decodePayload(data);
+    currentBoard = data;
+    boardResyncRequested = false;
+    renderBoard();
+});
+
+socket.on('cell_used', (cell) => {
+    const applied = applyCellUsed(currentBoard, decodePayload(cell));
+    if (applied === null && !boardResyncRequested) {
+        // Missed a change: ask for the whole board once
+        boardResyncRequested = true;
+        socket.emit('request_board');
+    } else if (applied) {
+        renderBoard();
+    }
+});
+
+function loadQRCode() {
+    fetch('/qr?game=' + encodeURIComponent(gameCode))
+        .then(r => r.json())
+        .then(data => {
+            document.getElementById('qrCode').src = '/qr.svg?game=' + encodeURIComponent(gameCode);
+            document.getElementById('joinUrl').textContent = data.url;
+            document.getElementById('gameCode').textContent =
+                'Game code: ' + gameCode + ' — display: /display?game=' + gameCode;
+        });
+}
+
+function createTeam() {
+    const name = document.getElementById('teamNameInput').value.trim();
+    if (name) {
+        socket.emit('create_team', { name });
+        document.getElementById('teamNameInput').value = '';
+    }
+}
+
+function startRound(round) {
+    socket.emit('start_round', { round });
+    document.getElementById('lobbyView').classList.add('hidden');
+    document.getElementById('gameView').classList.remove('hidden');
+    document.getElementById('currentRound').textContent = `Round ${round}`;
+}
+
+function selectQuestion(category, value) {
+    socket.emit('select_question', { category, value });
+}
+
+function adjudicate(correct) {
+    socket.emit('adjudicate', { correct });
+}
+
+function skipQuestion() {
+    socket.emit('skip_question');
+}
+
+function newGame() {
+    if (confirm('End this game for everyone and start a new one?')) {
+        socket.emit('end_game');
+    }
+}
+
+function updateUI() {
+    if (!gameState) return;
+
+    // Update teams in lobby
+    const teamsList = document.getElementById('teamsList');
+    teamsList.innerHTML = '';
+    gameState.teams.forEach(team => {
+        const card = document.createElement('div');
+        card.className = 'team-card';
+        card.style.borderLeftColor = team.color;
+        card.innerHTML = `
+            <div class="team-name">${team.name}</div>
+            <div class="player-list">
+                ${team.players.map(p => `${p.name}${p.connected ? '' : ' (disconnected)'}`).join('<br>')}
+            </div>
+        `;
+        teamsList.appendChild(card);
+    });
+
+    // Update teams in game
+    const gameTeamsList = document.getElementById('gameTeamsList');
+    gameTeamsList.innerHTML = '';
+    gameState.teams.forEach(team => {
+        const card = document.createElement('div');
+        card.className = 'team-card';
+        card.style.borderLeftColor = team.color;
+        card.innerHTML = `
+            <div class="team-name">${team.name}</div>
+            <div class="team-score">${team.score}</div>
+            <div class="player-list">
+                ${team.players.map(p => `${p.name}`).join(', ')}
+            </div>
+        `;
+        gameTeamsList.appendChild(card);
+    });
+
+    // Handle question display
+    const questionDisplay = document.getElementById('questionDisplay');
+    const timerDisplay = document.getElementById('timerDisplay');
+    const buzzQueue = document.getElementById('buzzQueue');
+
+    if (gameState.current_question) {
+        questionDisplay.classList.remove('hidden');
+        document.getElementById('questionText').textContent = gameState.current_question.question;
+        document.getElementById('answerText').textContent = gameState.current_question.answer;
+
+        if (gameState.buzz_timer_active) {
+            startTimer(4);
+            timerDisplay.classList.remove('hidden');
+            buzzQueue.classList.add('hidden');
+        } else {
+            stopTimer();
+            timerDisplay.classList.add('hidden');
+
+            if (gameState.buzz_queue.length > 0) {
+                buzzQueue.classList.remove('hidden');
+                renderBuzzQueue();
+                // Show skip button only when a question is active (Trebek may want to skip)
+                document.getElementById('skipQuestionButton').classList.remove('hidden');
+            } else {
+                buzzQueue.classList.add('hidden');
+                // If no buzz queue but question is active, allow Trebek to skip
+                if (gameState.current_question) {
+                    document.getElementById('skipQuestionButton').classList.remove('hidden');
+                } else {
+                    document.getElementById('skipQuestionButton').classList.add('hidden');
+                }
+            }
+        }
+    } else {
+        questionDisplay.classList.add('hidden');
+        timerDisplay.classList.add('hidden');
+        buzzQueue.classList.add('hidden');
+        stopTimer();
+        document.getElementById('skipQuestionButton').classList.add('hidden');
+    }
+
+    // Update round 2 button state
+    const round2Button = document.getElementById('round2Button');
+    if (round2Button) {
+        if (gameState.phase === 'round_1') {
+            // Enable Round 2 button only if Round 1 is complete
+            round2Button.disabled = !gameState.round_1_complete;
+            round2Button.style.display = 'block';
+        } else if (gameState.phase === 'round_2') {
+            // Hide button once in Round 2
+            round2Button.style.display = 'none';
+        }
+    }
+}
+
+function renderBoard() {
+    if (!currentBoard) return;
+
+    const board = document.getElementById('board');
+    board.innerHTML = '';
+
+    const categories = Object.keys(currentBoard.board);
+
+    // Determine expected values based on round
+    const round = currentBoard.round;
+    const expectedValues = round === 1
+        ? [100, 200, 300, 400, 500]
+        : [200, 400, 600, 800, 1000];
+
+    // Set grid to have correct number of rows
+    board.style.gridTemplateRows = `auto repeat(${expectedValues.length}, 1fr)`;
+
+    // Add category headers with explicit grid positioning
+    categories.forEach((cat, colIndex) => {
+        const header = document.createElement('div');
+        header.className = 'category-header';
+        header.textContent = cat;
+        header.style.gridColumn = colIndex + 1;
+        header.style.gridRow = 1;
+        board.appendChild(header);
+    });
+
+    // Add question cells with explicit grid positioning
+    categories.forEach((cat, colIndex) => {
+        const questions = currentBoard.board[cat];
+
+        expectedValues.forEach((expectedValue, rowIndex) => {
+            const cell = document.createElement('div');
+            cell.style.gridColumn = colIndex + 1;
+            cell.style.gridRow = rowIndex + 2; // +2 because row 1 is headers
+
+            // Find the question with this value
+            const q = questions.find(question => question.value === expectedValue);
+
+            if (q) {
+                cell.className = 'question-cell' + (q.used ? ' used' : '');
+                cell.textContent = '$' + q.value;
+                if (!q.used) {
+                    cell.onclick = () => selectQuestion(cat, q.value);
+                }
+            } else {
+                // No question for this value - show empty/missing cell
+                cell.className = 'question-cell used';
+                cell.textContent = '—';
+                cell.style.opacity = '0.3';
+            }
+
+            board.appendChild(cell);
+        });
+    });
+}
+
+function renderBuzzQueue() {
+    const buzzList = document.getElementById('buzzList');
+    buzzList.innerHTML = '';
+
+    gameState.buzz_queue.forEach((entry, index) => {
+        const div = document.createElement('div');
+        div.className = 'buzz-entry' + (index === 0 ? ' active' : '');
+        div.innerHTML = `
+            <div>
+                <strong>${entry.player_name}</strong> (${entry.team_name})
+            </div>
+            ${index === 0 ? `
+                <div class="buzz-actions">
+                    <button class="btn-success" onclick="adjudicate(true)">✓ Correct</button>
+                    <button class="btn-danger" onclick="adjudicate(false)">✗ Wrong</button>
+                </div>
+            ` : ''}
+        `;
+        buzzList.appendChild(div);
+    });
+}
+
+function startTimer(seconds) {
+    stopTimer();
+    let remaining = seconds;
+    const display = document.getElementById('timerDisplay');
+    display.textContent = remaining;
+
+    timerInterval = setInterval(() => {
+        remaining--;
+        if (remaining >= 0) {
+            display.textContent = remaining;
+        } else {
+            stopTimer();
+        }
+    }, 1000);
+}
+
+function stopTimer() {
+    if (timerInterval) {
+        clearInterval(timerInterval);
+        timerInterval = null;
+    }
+}
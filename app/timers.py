@@ -0,0 +1,123 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    """A scheduled callback; cancelled timers stay in the heap and are skipped."""
+    __slots__ = ('name', 'deadline', 'callback', 'args', 'cancelled')
+
+    def __init__(self, name: str, deadline: float, callback: Callable, args: Tuple):
+        self.name = name
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class TimerScheduler:
+    """Runs named, cancellable timers from a single background task.
+
+    Timers live in a heap ordered by deadline. One background task (started
+    with the Socket.IO server's `start_background_task`, so it is a green
+    thread under eventlet and a thread otherwise) waits on an event until
+    the earliest deadline, and exits once no timers are left. Scheduling a
+    timer that becomes the earliest sets the event, so the loop wakes up and
+    waits for the new deadline instead. `create_event` makes that event
+    (the server's `create_event`, so it is green under eventlet).
+    Scheduling a name that is already pending replaces the old timer.
+    """
+
+    def __init__(self, start_background_task: Optional[Callable] = None,
+                 create_event: Callable[[], Any] = threading.Event,
+                 clock: Callable[[], float] = time.monotonic):
+        self._start_background_task = start_background_task
+        self._create_event = create_event
+        self._clock = clock
+        self._wakeup: Any = None
+        self._heap: List[Tuple[float, int, Timer]] = []
+        self._timers: Dict[str, Timer] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def schedule(self, name: str, delay: float, callback: Callable, *args) -> Timer:
+        """Run `callback(*args)` after `delay` seconds, replacing any pending timer called `name`."""
+        with self._lock:
+            previous = self._timers.get(name)
+            if previous is not None:
+                previous.cancelled = True
+            timer = Timer(name, self._clock() + delay, callback, args)
+            self._timers[name] = timer
+            earliest = not self._heap or timer.deadline < self._heap[0][0]
+            heapq.heappush(self._heap, (timer.deadline, next(self._counter), timer))
+            start = not self._running and self._start_background_task is not None
+            if start:
+                self._running = True
+                self._wakeup = self._create_event()
+            elif earliest and self._running:
+                self._wakeup.set()
+        logger.debug(f"Timer scheduled: {name} in {delay}s")
+        if start:
+            self._start_background_task(self._run)
+        return timer
+
+    def cancel(self, name: str) -> bool:
+        """Cancel the pending timer called `name`; returns False if there was none."""
+        with self._lock:
+            timer = self._timers.pop(name, None)
+            if timer is None:
+                return False
+            timer.cancelled = True
+        logger.debug(f"Timer cancelled: {name}")
+        return True
+
+    def pending(self, name: str) -> bool:
+        with self._lock:
+            return name in self._timers
+
+    def run_due(self, now: Optional[float] = None) -> int:
+        """Fire every timer whose deadline has passed; returns how many fired."""
+        now = self._clock() if now is None else now
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, timer = heapq.heappop(self._heap)
+                if timer.cancelled:
+                    continue
+                del self._timers[timer.name]
+                due.append(timer)
+
+        for timer in due:
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                logger.error(f"Timer {timer.name} failed: {e}", exc_info=True)
+        return len(due)
+
+    def _next_delay(self) -> Optional[float]:
+        """Seconds until the earliest deadline, or None (and the loop stops) when no timers are left."""
+        with self._lock:
+            # Cleared under the lock, so a timer scheduled after this still wakes the loop
+            self._wakeup.clear()
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                self._running = False
+                return None
+            return max(0.0, self._heap[0][0] - self._clock())
+
+    def _run(self):
+        logger.debug("Timer loop started")
+        while True:
+            self.run_due()
+            delay = self._next_delay()
+            if delay is None:
+                break
+            self._wakeup.wait(delay)
+        logger.debug("Timer loop idle, exiting")
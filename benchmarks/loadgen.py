@@ -0,0 +1,300 @@
+"""
+Load generator: hundreds of buzzing players against the real server.
+
+Starts ``app.py`` as a subprocess (see benchmarks/serving.py) for each
+--players count, connects a host and that many Socket.IO player clients
+spread over --teams teams, and plays --questions scripted questions:
+
+1. select:     the host picks the next unused cell on the board
+2. buzz storm: after the buzz delay (BUZZ_DELAY_SECONDS, --buzz-delay)
+               buzzing opens and every player buzzes as soon as it sees
+               that, after a random --jitter
+3. adjudicate: once every buzz is acknowledged, the host rules the first
+               --wrong answers incorrect, then one correct, and the question
+               ends
+
+Players keep their game state from game_update snapshots and game_patch
+deltas, as the pages do, and resync on a gap.
+
+Reported per player count:
+
+- buzz ack p50/p95/p99:  ms from a player emitting buzz to the first state
+                         it receives with itself in the buzz queue (or a
+                         buzz_rejected)
+- fan-out p50/p95/p99:   ms from the first client seeing buzzing open to
+                         each player seeing it
+- events/s:              events received by all clients per second while
+                         the questions were played
+- server CPU:            CPU seconds the server used during the questions
+- client CPU:            CPU seconds this process used in the same time; if it
+                         is close to the elapsed time, the load generator
+                         (not the server) is the limit
+
+Usage:
+    python benchmarks/loadgen.py --players 100 200 400 --teams 12 --questions 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.state_sync import apply_patch  # noqa: E402
+from serving import MODES, cpu_seconds, free_port, percentile, start_server  # noqa: E402
+from sio_client import SocketIOClient  # noqa: E402
+
+
+class GameState:
+    """A client's copy of the game state, kept from snapshots and patches."""
+
+    def __init__(self, client: SocketIOClient, code: str):
+        self.client = client
+        self.code = code
+        self.state: Optional[Dict] = None
+        self.resyncs = 0
+        self.listeners: List[Callable[[Dict, float], None]] = []
+        self._changed = asyncio.Event()
+        client.on('game_update', self._snapshot)
+        client.on('game_patch', self._patch)
+
+    def _snapshot(self, data, now):
+        # A player's first snapshot is the spectator view; the one after join_game replaces it
+        self.state = data
+        self._notify(now)
+
+    def _patch(self, patch, now):
+        if self.state is None or patch['seq'] <= self.state['seq']:
+            return
+        if patch['seq'] != self.state['seq'] + 1:
+            self.resyncs += 1
+            asyncio.ensure_future(self.client.emit('request_game_state', {'game': self.code}))
+            return
+        apply_patch(self.state, patch['ops'])
+        self.state['seq'] = patch['seq']
+        self._notify(now)
+
+    def _notify(self, now):
+        for listener in self.listeners:
+            listener(self.state, now)
+        self._changed.set()
+
+    async def until(self, predicate: Callable[[Dict], Any], timeout: float = 30.0):
+        """Wait for a state matching `predicate`."""
+        async def changed():
+            while self.state is None or not predicate(self.state):
+                self._changed.clear()
+                await self._changed.wait()
+        await asyncio.wait_for(changed(), timeout)
+
+
+class Player:
+    """A player client that buzzes once per question as soon as buzzing opens."""
+
+    def __init__(self, client: SocketIOClient, game: GameState, jitter: float):
+        self.client = client
+        self.game = game
+        self.jitter = jitter
+        self.player_id: Optional[str] = None
+        self.question: Optional[Dict] = None
+        self.opened: Optional[float] = None
+        self.sent: Optional[float] = None
+        self.acked: Optional[asyncio.Future] = None
+        game.listeners.append(self._on_state)
+        client.on('buzz_rejected', lambda data, now: self._ack(now, accepted=False))
+
+    def arm(self, category, value):
+        """Buzz on question (`category`, `value`) when it opens; the returned future resolves with the ack."""
+        # Patches about the previous question may still be on their way to this client
+        self.question = {'category': category, 'value': value}
+        self.opened = self.sent = None
+        self.acked = asyncio.get_running_loop().create_future()
+        return self.acked
+
+    def _on_state(self, state, now):
+        if (state.get('question_state') == 'buzzing_open' and state['current_question'] == self.question
+                and self.acked is not None and self.opened is None):
+            self.opened = now
+            asyncio.ensure_future(self._buzz())
+        elif self.sent is not None and any(e['player_id'] == self.player_id for e in state.get('buzz_queue', ())):
+            self._ack(now, accepted=True)
+
+    async def _buzz(self):
+        if self.jitter:
+            await asyncio.sleep(random.uniform(0, self.jitter))
+        self.sent = time.perf_counter()
+        await self.client.emit('buzz', {'player_id': self.player_id})
+
+    def _ack(self, now, accepted):
+        if self.sent is not None and self.acked is not None and not self.acked.done():
+            self.acked.set_result((now - self.sent, accepted))
+            self.sent = None
+
+
+async def setup(port, player_ports, upgrade, args):
+    """Connect the host to `port` and a player to each of `player_ports`; returns (host, state, players, seconds)."""
+    host = SocketIOClient('127.0.0.1', port, upgrade=upgrade)
+    await host.connect()
+    registered = host.expect('registration_success')
+    await host.emit('register_trebek')
+    code = (await registered)[0]['game']
+    host_state = GameState(host, code)
+    for t in range(args.teams):
+        await host.emit('create_team', {'name': f'Team {t + 1}'})
+    await host.emit('request_game_state', {'game': code})
+    await host_state.until(lambda s: len(s['teams']) == args.teams)
+    team_ids = [team['id'] for team in host_state.state['teams']]
+
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def connect_player(i):
+        async with limit:
+            client = SocketIOClient('127.0.0.1', player_ports[i], query={'game': code}, upgrade=upgrade)
+            player = Player(client, GameState(client, code), args.jitter / 1e3)
+            await client.connect()
+            joined = client.expect('registration_success')
+            await client.emit('join_game', {'name': f'Player {i}', 'team_id': team_ids[i % len(team_ids)],
+                                            'game': code})
+            player.player_id = (await joined)[0]['player_id']
+            await player.game.until(lambda s: 'buzz_queue' in s)
+            return player
+
+    start = time.perf_counter()
+    players = await asyncio.gather(*(connect_player(i) for i in range(len(player_ports))))
+    connect_seconds = time.perf_counter() - start
+    await host_state.until(lambda s: sum(len(t['players']) for t in s['teams']) == len(players))
+    return host, host_state, players, connect_seconds
+
+
+async def start_round(host, round_num):
+    """Start a round; returns its unused (category, value) cells in board order."""
+    board = host.expect('board_update', lambda data: data['round'] == round_num)
+    await host.emit('start_round', {'round': round_num})
+    layout = (await board)[0]['board']
+    return [(round_num, category, cell['value']) for category, cells in layout.items()
+            for cell in cells if not cell['used']]
+
+
+async def play_question(host, host_state, players, round_num, category, value, args):
+    """Select a question, let every player buzz, adjudicate; returns (ack latencies, fan-out latencies, rejected)."""
+    acks = [player.arm(category, value) for player in players]
+    opened_at = []
+
+    def host_saw_open(state, now):
+        if state['question_state'] == 'buzzing_open':
+            opened_at.append(now)
+
+    host_state.listeners.append(host_saw_open)
+    await host.emit('select_question', {'category': category, 'value': value})
+    results = await asyncio.wait_for(asyncio.gather(*acks), args.buzz_delay + 30)
+    host_state.listeners.pop()
+
+    first_open = min(opened_at[:1] + [p.opened for p in players])
+    fan_out = [p.opened - first_open for p in players]
+    latencies = [latency for latency, accepted in results]
+    rejected = sum(1 for _, accepted in results if not accepted)
+
+    await host_state.until(lambda s: len(s['buzz_queue']) == len(players) - rejected)
+    for _ in range(args.wrong):
+        head = host_state.state['buzz_queue'][0]['team_id'] if host_state.state['buzz_queue'] else None
+        if head is None:
+            break
+        await host.emit('adjudicate', {'correct': False})
+        await host_state.until(lambda s: head in s['teams_attempted'])
+    if host_state.state['current_question'] is not None and host_state.state['buzz_queue']:
+        await host.emit('adjudicate', {'correct': True})
+    elif host_state.state['current_question'] is not None:
+        await host.emit('skip_question')
+    await host_state.until(lambda s: s['current_question'] is None)
+    for player in players:
+        player.acked = None
+    return latencies, fan_out, rejected
+
+
+async def play_game(host, host_state, players, args):
+    """Play up to `args.questions` questions over both rounds; returns (acks, fan-outs, rejected, played)."""
+    cells: List = []
+    round_num = 0
+    acks: List[float] = []
+    fan_out: List[float] = []
+    rejected = 0
+    played = 0
+    while played < args.questions:
+        if not cells:
+            if round_num == 2:
+                print(f"  board exhausted after {played} questions")
+                break
+            round_num += 1
+            cells = await start_round(host, round_num)
+            continue
+        _, category, value = cells.pop(0)
+        q_acks, q_fan_out, q_rejected = await play_question(host, host_state, players, round_num, category, value,
+                                                            args)
+        acks += q_acks
+        fan_out += q_fan_out
+        rejected += q_rejected
+        played += 1
+    return acks, fan_out, rejected, played
+
+
+async def run_load(port, upgrade, args, players_count, server_pid):
+    host, host_state, players, connect_seconds = await setup(port, [port] * players_count, upgrade, args)
+    clients = [host] + [p.client for p in players]
+
+    before = sum(sum(c.received.values()) for c in clients)
+    server_cpu = cpu_seconds(server_pid)
+    client_cpu = time.process_time()
+    start = time.perf_counter()
+    acks, fan_out, rejected, _ = await play_game(host, host_state, players, args)
+    elapsed = time.perf_counter() - start
+    server_cpu = cpu_seconds(server_pid) - server_cpu
+    client_cpu = time.process_time() - client_cpu
+    delivered = sum(sum(c.received.values()) for c in clients) - before
+    resyncs = sum(p.game.resyncs for p in players)
+
+    for client in clients:
+        await client.close()
+    return {
+        'connect': connect_seconds, 'acks': acks, 'fan_out': fan_out, 'rejected': rejected, 'resyncs': resyncs,
+        'rate': delivered / elapsed, 'server_cpu': server_cpu, 'client_cpu': client_cpu,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--players', type=int, nargs='+', default=[100, 200, 400], help='player counts to run')
+    parser.add_argument('--teams', type=int, default=12)
+    parser.add_argument('--questions', type=int, default=10, help='questions per run')
+    parser.add_argument('--wrong', type=int, default=1, help='answers ruled incorrect before the correct one')
+    parser.add_argument('--buzz-delay', type=float, default=0.5, help='seconds before buzzing opens')
+    parser.add_argument('--jitter', type=float, default=0, help='max random ms a player waits before buzzing')
+    parser.add_argument('--concurrency', type=int, default=50, help='connections opened at a time')
+    parser.add_argument('--mode', default='prod', choices=list(MODES), help='server mode (see serving.py)')
+    args = parser.parse_args()
+
+    print(f"{args.teams} teams, {args.questions} questions, {args.mode} server, buzz delay {args.buzz_delay}s, "
+          f"jitter {args.jitter:g}ms")
+    print(f"{'players':>7} {'connect s':>9} {'ack p50':>8} {'p95':>8} {'p99':>8} {'fan-out p50':>11} {'p95':>8} "
+          f"{'p99':>8} {'events/s':>9} {'server CPU s':>12} {'client CPU s':>12} {'rejected':>8} {'resyncs':>7}")
+    env, upgrade = MODES[args.mode]
+    for players_count in args.players:
+        port = free_port()
+        proc = start_server(dict(env, BUZZ_DELAY_SECONDS=str(args.buzz_delay)), port)
+        try:
+            r = asyncio.run(run_load(port, upgrade, args, players_count, proc.pid))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+        ms = lambda values, p: percentile(values, p) * 1e3  # noqa: E731
+        print(f"{players_count:>7} {r['connect']:>9.2f} {ms(r['acks'], 50):>6.1f}ms {ms(r['acks'], 95):>6.1f}ms "
+              f"{ms(r['acks'], 99):>6.1f}ms {ms(r['fan_out'], 50):>9.1f}ms {ms(r['fan_out'], 95):>6.1f}ms "
+              f"{ms(r['fan_out'], 99):>6.1f}ms {r['rate']:>9.0f} {r['server_cpu']:>12.2f} {r['client_cpu']:>12.2f} "
+              f"{r['rejected']:>8} {r['resyncs']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark: memory per model object, before and after slotting the models.
+
+Builds --players players (each with a queued buzz) and --questions questions
+twice: once with the original plain-dataclass models (copied below as
+`Legacy*`, with question text parsed from CSV and held per object), and once
+with the current models from app/models.py (slotted, interned categories,
+used flags in the QuestionIndex bitset, question text left in the
+memory-mapped compiled bank). Memory is measured with tracemalloc, so only
+Python allocations count; the mapped bank file is paged in by the OS on
+demand and is not included.
+
+Reported per model:
+
+- before / after: bytes allocated per object (including its strings and
+  per-object containers)
+- saved:          reduction in percent
+
+Usage:
+    python benchmarks/memory.py --players 10000 --questions 100000
+"""
+import argparse
+import csv
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import question_bank  # noqa: E402
+from app.models import BuzzEntry, Player, Team  # noqa: E402
+from app.question_index import QuestionIndex  # noqa: E402
+
+
+@dataclass
+class LegacyPlayer:
+    id: str
+    name: str
+    team_id: str
+    session_id: str
+    connected: bool = True
+
+
+@dataclass
+class LegacyTeam:
+    id: str
+    name: str
+    score: int = 0
+    player_ids: List[str] = field(default_factory=list)
+    color: str = "#FFD700"
+
+
+@dataclass
+class LegacyQuestion:
+    round: int
+    category: str
+    value: int
+    question: str
+    answer: str
+    used: bool = False
+
+
+@dataclass
+class LegacyBuzzEntry:
+    player_id: str
+    player_name: str
+    team_id: str
+    team_name: str
+    timestamp: float
+
+
+def measure(build):
+    """Bytes still allocated after `build()` returns, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated, result
+
+
+def write_bank(path, count):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Round', 'Category', 'Value', 'Question', 'Answer'])
+        for i in range(count):
+            writer.writerow([1 + i % 2, f'Category {i // 50}', 100 * (1 + i % 5),
+                             f'This clue, number {i}, is about as long as a typical clue on the board?',
+                             f'Answer {i}'])
+
+
+def legacy_questions(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [LegacyQuestion(int(r['Round']), r['Category'], int(r['Value']), r['Question'], r['Answer'])
+                for r in csv.DictReader(f)]
+
+
+def current_questions(path):
+    questions = question_bank.load_bank(path).questions()
+    return questions, QuestionIndex(questions)
+
+
+def legacy_players(count, teams):
+    players = [LegacyPlayer(f'player_{i + 1}', f'Player {i}', f'team_{i % teams + 1}', f'sid-{i:020d}')
+               for i in range(count)]
+    team_objs = [LegacyTeam(f'team_{t + 1}', f'Team {t}') for t in range(teams)]
+    for p in players:
+        team_objs[int(p.team_id[5:]) - 1].player_ids.append(p.id)
+    queue = [LegacyBuzzEntry(p.id, p.name, p.team_id, team_objs[int(p.team_id[5:]) - 1].name, time.time())
+             for p in players]
+    return players, team_objs, queue
+
+
+def current_players(count, teams):
+    players = [Player(f'player_{i + 1}', f'Player {i}', f'team_{i % teams + 1}', f'sid-{i:020d}')
+               for i in range(count)]
+    team_objs = [Team(f'team_{t + 1}', f'Team {t}') for t in range(teams)]
+    for p in players:
+        team_objs[int(p.team_id[5:]) - 1].player_ids.append(p.id)
+    queue = [BuzzEntry(p.id, p.team_id, time.monotonic_ns()) for p in players]
+    return players, team_objs, queue
+
+
+def buzz_entries(build, count, teams):
+    """Bytes for the buzz queue alone: players and teams are built first, outside the measurement."""
+    players, team_objs, _ = build(count, teams)
+    entry_type = type(build(1, 1)[2][0])
+    if entry_type is LegacyBuzzEntry:
+        names = {t.id: t.name for t in team_objs}
+        return measure(lambda: [LegacyBuzzEntry(p.id, p.name, p.team_id, names[p.team_id], time.time())
+                                for p in players])[0]
+    return measure(lambda: [BuzzEntry(p.id, p.team_id, time.monotonic_ns()) for p in players])[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--players', type=int, default=10_000)
+    parser.add_argument('--teams', type=int, default=12)
+    parser.add_argument('--questions', type=int, default=100_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='membench-'), 'questions.csv')
+    write_bank(path, args.questions)
+    question_bank.load_bank(path)  # compile once; the game loads below map the compiled bank
+    question_bank._cache.clear()
+
+    rows = []
+    before, _ = measure(lambda: legacy_players(args.players, 1)[0])
+    after, _ = measure(lambda: current_players(args.players, 1)[0])
+    rows.append(('Player', args.players, before / args.players, after / args.players))
+
+    before = buzz_entries(legacy_players, args.players, args.teams)
+    after = buzz_entries(current_players, args.players, args.teams)
+    rows.append(('BuzzEntry', args.players, before / args.players, after / args.players))
+
+    before, _ = measure(lambda: legacy_questions(path))
+    after, _ = measure(lambda: current_questions(path))
+    rows.append(('Question', args.questions, before / args.questions, after / args.questions))
+
+    print(f"{args.players} players in {args.teams} teams, {args.questions} questions")
+    print(f"{'model':>10} {'objects':>9} {'before B':>9} {'after B':>9} {'saved':>7}")
+    for name, count, before, after in rows:
+        print(f"{name:>10} {count:>9} {before:>9.0f} {after:>9.0f} {1 - after / before:>7.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: bytes on the wire and encode time per state payload, JSON vs MessagePack.
+
+Builds a game with --teams teams of --players players and a bank of
+--questions questions per round (category x value cells, as on the board),
+starts round 1, selects a question and queues a buzz from every team. Then,
+for each payload:
+
+- game_update (host):   the full state snapshot sent to the Trebek page
+- board_update (host):  the board with question and answer text
+- board_update (display): the board without text
+
+encodes it as a complete Socket.IO packet both ways -- JSON text, and
+JSON header + MessagePack binary attachment as sent to ``?codec=msgpack``
+clients -- and reports:
+
+- bytes:  packet size on the wire (header and attachment together)
+- encode: microseconds to encode the packet, payload included (no cached encodings)
+
+Usage:
+    python benchmarks/payload_codecs.py --teams 12 --players 5 --questions 30
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from socketio import packet  # noqa: E402
+
+from app import serialization  # noqa: E402
+from app.game_logic import GameManager  # noqa: E402
+from app.models import Question  # noqa: E402
+from app.question_index import RoundBoard  # noqa: E402
+from app.state_sync import project_summary  # noqa: E402
+
+packet.Packet.json = serialization
+
+
+def build_game(teams, players, questions):
+    gm = GameManager()
+    for t in range(teams):
+        team = gm.create_team(f'Team {t + 1}')
+        for p in range(players):
+            gm.add_player(f'Player {t + 1}-{p + 1}', team.id, f'sid-{t}-{p}')
+    categories = max(1, questions // 5)
+    gm.state.questions = [
+        Question(round_num, f'Category {c + 1}', value * round_num,
+                 f'This clue in category {c + 1} for ${value * round_num} is about as long as a real clue?',
+                 f'What is answer {c + 1}-{value}?')
+        for round_num in (1, 2) for c in range(categories) for value in (100, 200, 300, 400, 500)
+    ]
+    gm.start_round(1)
+    first = gm.state.questions[0]
+    gm.select_question(first.category, first.value)
+    gm.enable_buzzing(first)
+    for team in gm.state.teams.values():
+        gm.buzz_in(team.player_ids[0])
+    return gm
+
+
+def wire_bytes(encoded):
+    """Size of an encoded Socket.IO packet: one text frame, or a text header plus binary attachments."""
+    frames = encoded if isinstance(encoded, list) else [encoded]
+    return sum(len(f.encode('utf-8')) if isinstance(f, str) else len(f) for f in frames)
+
+
+def measure(event, payload, number):
+    """(bytes, µs per encode) for JSON and, if msgpack is installed, MessagePack packets carrying `payload`."""
+    def encode_json():
+        return packet.Packet(packet.EVENT, data=[event, serialization.PreEncoded(payload)]).encode()
+
+    def encode_msgpack():
+        return packet.Packet(packet.EVENT, data=[event, serialization.msgpack.packb(payload)]).encode()
+
+    rows = [(wire_bytes(encode_json()), timeit.timeit(encode_json, number=number) / number * 1e6)]
+    if serialization.msgpack is not None:
+        rows.append((wire_bytes(encode_msgpack()), timeit.timeit(encode_msgpack, number=number) / number * 1e6))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--teams', type=int, default=12)
+    parser.add_argument('--players', type=int, default=5, help='players per team')
+    parser.add_argument('--questions', type=int, default=30, help='questions per round')
+    parser.add_argument('--number', type=int, default=500, help='encodes timed per payload')
+    args = parser.parse_args()
+
+    gm = build_game(args.teams, args.players, args.questions)
+    board = RoundBoard(1, gm.question_index.round_view(1))
+    payloads = [
+        ('game_update', 'host', dict(project_summary(gm.get_game_summary(), 'trebek'), seq=1)),
+        ('board_update', 'host', board.payload('trebek').data),
+        ('board_update', 'display', board.payload('display').data),
+    ]
+
+    print(f"{args.teams} teams x {args.players} players, {len(gm.state.questions) // 2} questions per round")
+    if serialization.msgpack is None:
+        print("msgpack is not installed: showing JSON only (pip install msgpack)")
+    print(f"{'payload':>24} {'json B':>8} {'msgpack B':>10} {'json µs':>9} {'msgpack µs':>11}")
+    for event, role, payload in payloads:
+        rows = measure(event, payload, args.number)
+        (json_bytes, json_us), (packed_bytes, packed_us) = rows[0], rows[1] if len(rows) > 1 else (None, None)
+        packed_bytes = f"{packed_bytes:>10}" if packed_bytes is not None else f"{'n/a':>10}"
+        packed_us = f"{packed_us:>11.1f}" if packed_us is not None else f"{'n/a':>11}"
+        print(f"{f'{event} ({role})':>24} {json_bytes:>8} {packed_bytes} {json_us:>9.1f} {packed_us}")
+
+
+if __name__ == '__main__':
+    main()
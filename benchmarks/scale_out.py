@@ -0,0 +1,137 @@
+"""
+Benchmark: connections and events/sec as the number of worker processes grows.
+
+Starts --workers ``app.py`` processes on one Redis message queue (--queue),
+as in a multi-worker deployment behind a load balancer (see app/cluster.py),
+and plays --games games at once. Each game's host connects to one worker,
+which owns the game; --remote of its players connect to the next worker,
+so their commands are forwarded to the owner and the owner's emits reach
+them through the queue. Every game has --teams x --players players and
+plays --questions questions: select, every player buzzes once buzzing
+opens, the host rules --wrong answers incorrect and then one correct.
+
+Reported per worker count:
+
+- connections: Socket.IO clients connected across all workers
+- commands/s:  client events sent per second (selects, buzzes, rulings)
+- events/s:    server events delivered to clients per second
+- ack p50/p99: buzz-to-acknowledgement latency (see loadgen.py) of players
+               on the owning worker, and of players whose buzz is forwarded
+- server CPU:  CPU seconds used by all workers together
+
+With one worker every player is local. Clients connect over WebSocket only,
+so no sticky sessions are needed. Needs a running Redis server and
+``pip install redis`` (``--queue local:// --workers 1`` runs a single
+worker without Redis, as a baseline).
+
+Usage:
+    python benchmarks/scale_out.py --workers 1 2 4 --queue redis://localhost:6379/0
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadgen import play_game, setup  # noqa: E402
+from serving import MODES, cpu_seconds, free_port, percentile, start_server  # noqa: E402
+
+
+async def run_load(ports, args):
+    """Set up and play every game at once; returns the measurements."""
+    _, upgrade = MODES['prod']
+    per_game = args.teams * args.players
+    remote = int(per_game * args.remote) if len(ports) > 1 else 0
+    games = []
+    start = time.perf_counter()
+    for g in range(args.games):
+        owner, other = ports[g % len(ports)], ports[(g + 1) % len(ports)]
+        # Players are spread over the teams round-robin, so remote players are in every team
+        player_ports = [other if i < remote else owner for i in range(per_game)]
+        games.append(await setup(owner, player_ports, upgrade, args))
+    connect_seconds = time.perf_counter() - start
+    clients = [c for host, _, players, _ in games for c in [host] + [p.client for p in players]]
+
+    before = sum(sum(c.received.values()) for c in clients)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(play_game(host, state, players, args) for host, state, players, _ in games))
+    elapsed = time.perf_counter() - start
+    delivered = sum(sum(c.received.values()) for c in clients) - before
+
+    local_acks, remote_acks, commands = [], [], 0
+    for (host, _, players, _), (acks, _, _, played) in zip(games, results):
+        per_question = len(players)
+        for q in range(played):
+            for player, ack in zip(players, acks[q * per_question:(q + 1) * per_question]):
+                (local_acks if player.client.port == host.port else remote_acks).append(ack)
+        commands += played * (1 + len(players) + args.wrong + 1)
+
+    for client in clients:
+        await client.close()
+    return {
+        'connections': len(clients), 'connect': connect_seconds, 'commands': commands / elapsed,
+        'events': delivered / elapsed, 'local_acks': local_acks, 'remote_acks': remote_acks,
+    }
+
+
+def run(workers, args):
+    """Start `workers` app.py processes on the queue and drive them; returns the measurements."""
+    env, _ = MODES['prod']
+    ports = [free_port() for _ in range(workers)]
+    procs = []
+    try:
+        for i, port in enumerate(ports):
+            procs.append(start_server(dict(env, MESSAGE_QUEUE=args.queue, WORKER_ID=f'w{i + 1}',
+                                           BUZZ_DELAY_SECONDS=str(args.buzz_delay)), port))
+        cpu_before = sum(cpu_seconds(proc.pid) for proc in procs)
+        result = asyncio.run(run_load(ports, args))
+        result['cpu'] = sum(cpu_seconds(proc.pid) for proc in procs) - cpu_before
+        return result
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--queue', default='redis://localhost:6379/0', help='MESSAGE_QUEUE for the workers')
+    parser.add_argument('--games', type=int, default=4, help='games played at once')
+    parser.add_argument('--teams', type=int, default=4)
+    parser.add_argument('--players', type=int, default=5, help='players per team')
+    parser.add_argument('--remote', type=float, default=0.5,
+                        help='fraction of each game\'s players connected to a worker that does not own it')
+    parser.add_argument('--questions', type=int, default=10, help='questions played per game')
+    parser.add_argument('--wrong', type=int, default=1, help='answers ruled incorrect before the correct one')
+    parser.add_argument('--buzz-delay', type=float, default=0.5, help='seconds before buzzing opens')
+    parser.add_argument('--jitter', type=float, default=0, help='max random ms a player waits before buzzing')
+    parser.add_argument('--concurrency', type=int, default=50, help='connections opened at a time')
+    args = parser.parse_args()
+
+    if args.queue.startswith('local://'):
+        if max(args.workers) > 1:
+            sys.exit("local:// only reaches one process; use a Redis queue for several workers")
+    else:
+        try:
+            import redis
+            redis.Redis.from_url(args.queue).ping()
+        except Exception as e:
+            sys.exit(f"Redis at {args.queue} is not usable ({e}); pip install redis and start a server")
+
+    print(f"{os.cpu_count()} CPU(s); {args.games} games, {args.teams} teams x {args.players} players, "
+          f"{args.remote:.0%} remote, {args.questions} questions, queue {args.queue}")
+    print(f"{'workers':>8} {'connections':>12} {'commands/s':>11} {'events/s':>9} {'local ack p50':>14} {'p99':>8} "
+          f"{'remote ack p50':>15} {'p99':>8} {'server CPU s':>13}")
+    ms = lambda values, p: percentile(values, p) * 1e3  # noqa: E731
+    for workers in args.workers:
+        r = run(workers, args)
+        print(f"{workers:>8} {r['connections']:>12} {r['commands']:>11.0f} {r['events']:>9.0f} "
+              f"{ms(r['local_acks'], 50):>12.1f}ms {ms(r['local_acks'], 99):>6.1f}ms "
+              f"{ms(r['remote_acks'], 50):>13.1f}ms {ms(r['remote_acks'], 99):>6.1f}ms {r['cpu']:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark: the development server against production mode, over real sockets.
+
+Starts ``app.py`` as a subprocess once per mode, then connects --clients
+Socket.IO player clients to one game (with --teams teams and a host) and
+has every player ask for the game state --requests times.
+
+Modes:
+
+- dev:  the Werkzeug server (ASYNC_MODE=threading); clients connect with
+        Socket.IO's default transports, long-polling first and then an
+        upgrade to WebSocket, as browsers do
+- prod: APP_ENV=production (eventlet), SOCKETIO_TRANSPORTS=websocket;
+        clients connect straight over WebSocket
+
+Both run with DEBUG=0 so neither pays for the reloader or request logging.
+
+Reported per mode:
+
+- connect p50/p95: ms from opening a connection to the first game_update
+- connect all:     seconds to connect every client (--concurrency at a time)
+- rtt p50/p99:     ms from request_game_state to its game_update
+- events/s:        events received by clients per second during the requests
+- server CPU:      CPU seconds the server process used from the first connection on
+
+Usage:
+    python benchmarks/serving.py --clients 200 --requests 20
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sio_client import SocketIOClient  # noqa: E402
+
+MODES = {
+    'dev': ({'APP_ENV': 'development', 'ASYNC_MODE': 'threading'}, True),
+    'prod': ({'APP_ENV': 'production', 'SOCKETIO_TRANSPORTS': 'websocket'}, False),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(env_overrides, port):
+    """app.py in a subprocess with fresh journal/snapshot dirs; returns once it accepts connections."""
+    state = tempfile.mkdtemp(prefix='serving-')
+    env = dict(os.environ, PORT=str(port), DEBUG='0', SECRET_KEY='benchmark',
+               JOURNAL_DIR=os.path.join(state, 'journal'), SNAPSHOT_DIR=os.path.join(state, 'snapshots'),
+               **env_overrides)
+    proc = subprocess.Popen([sys.executable, 'app.py'], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def cpu_seconds(pid) -> float:
+    """User + system CPU time of a process (Linux /proc)."""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] if values else float('nan')
+
+
+async def run_load(port, upgrade, args):
+    """Connect and exercise the clients; returns the measurements."""
+    host = SocketIOClient('127.0.0.1', port, upgrade=upgrade)
+    await host.connect()
+    registered = host.expect('registration_success')
+    await host.emit('register_trebek')
+    code = (await registered)[0]['game']
+    for t in range(args.teams):
+        await host.emit('create_team', {'name': f'Team {t + 1}'})
+    state = None
+    while state is None or len(state['teams']) < args.teams:
+        # Team changes arrive as patches; ask for a snapshot until every team is in it
+        reply = host.expect('game_update')
+        await host.emit('request_game_state', {'game': code})
+        state = (await reply)[0]
+    team_ids = [team['id'] for team in state['teams']]
+
+    limit = asyncio.Semaphore(args.concurrency)
+    connect_times = []
+
+    async def connect_player(i):
+        async with limit:
+            client = SocketIOClient('127.0.0.1', port, query={'game': code}, upgrade=upgrade)
+            start = time.perf_counter()
+            first_state = client.expect('game_update')
+            await client.connect()
+            _, arrived = await first_state
+            connect_times.append(arrived - start)
+            joined = client.expect('registration_success')
+            await client.emit('join_game', {'name': f'Player {i}', 'team_id': team_ids[i % len(team_ids)],
+                                            'game': code})
+            await joined
+            return client
+
+    start = time.perf_counter()
+    players = await asyncio.gather(*(connect_player(i) for i in range(args.clients)))
+    connect_all = time.perf_counter() - start
+
+    rtts = []
+
+    async def ask(client):
+        for _ in range(args.requests):
+            reply = client.expect('game_update')
+            sent = time.perf_counter()
+            await client.emit('request_game_state', {'game': code})
+            _, arrived = await reply
+            rtts.append(arrived - sent)
+
+    before = sum(sum(c.received.values()) for c in players)
+    start = time.perf_counter()
+    await asyncio.gather(*(ask(c) for c in players))
+    elapsed = time.perf_counter() - start
+    delivered = sum(sum(c.received.values()) for c in players) - before
+
+    for client in players + [host]:
+        await client.close()
+    return connect_times, connect_all, rtts, delivered / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--clients', type=int, default=200, help='player connections')
+    parser.add_argument('--teams', type=int, default=12)
+    parser.add_argument('--requests', type=int, default=20, help='state requests per player')
+    parser.add_argument('--concurrency', type=int, default=50, help='connections opened at a time')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    print(f"{args.clients} players in {args.teams} teams, {args.requests} state requests each")
+    print(f"{'mode':>5} {'connect p50':>12} {'p95':>8} {'all s':>7} {'rtt p50':>8} {'p99':>8} "
+          f"{'events/s':>9} {'server CPU s':>13}")
+    for mode in args.modes:
+        env, upgrade = MODES[mode]
+        port = free_port()
+        proc = start_server(env, port)
+        try:
+            cpu_before = cpu_seconds(proc.pid)
+            connect_times, connect_all, rtts, rate = asyncio.run(run_load(port, upgrade, args))
+            cpu = cpu_seconds(proc.pid) - cpu_before
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+        print(f"{mode:>5} {percentile(connect_times, 50) * 1e3:>10.1f}ms {percentile(connect_times, 95) * 1e3:>6.1f}ms "
+              f"{connect_all:>7.2f} {percentile(rtts, 50) * 1e3:>6.1f}ms {percentile(rtts, 99) * 1e3:>6.1f}ms "
+              f"{rate:>9.0f} {cpu:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+Minimal asyncio Socket.IO client for the benchmarks.
+
+Speaks Engine.IO 4 over real sockets, so the server under test runs its
+whole network path. Connections go straight to WebSocket, or
+(``upgrade=True``) do the long-polling handshake first and then upgrade,
+as a browser with Socket.IO's default transports does. WebSocket framing
+is done by wsproto (installed with python-engineio), offering
+permessage-deflate like a browser.
+
+Events are JSON only (no binary attachments). Every received event is
+counted; handlers registered with `on` and futures from `expect`/`wait`
+get the payload and the ``time.perf_counter()`` of its arrival.
+"""
+import asyncio
+import json
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from wsproto import ConnectionType, WSConnection
+from wsproto.events import (AcceptConnection, BytesMessage, CloseConnection, Message, Ping, RejectConnection,
+                            Request, TextMessage)
+from wsproto.extensions import PerMessageDeflate
+
+PATH = '/socket.io/'
+RECORD_SEPARATOR = '\x1e'
+
+
+class ConnectError(Exception):
+    pass
+
+
+async def http_request(host: str, port: int, method: str, path: str, body: bytes = b'') -> Tuple[int, bytes]:
+    """One HTTP/1.1 request on its own connection; (status, body)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n"
+                 f"Content-Type: text/plain;charset=UTF-8\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    raw = await reader.read()
+    writer.close()
+    head, _, content = raw.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    if b'transfer-encoding: chunked' in head.lower():
+        chunks, rest = [], content
+        while rest:
+            size_line, _, rest = rest.partition(b'\r\n')
+            size = int(size_line.split(b';')[0], 16)
+            if size == 0:
+                break
+            chunks.append(rest[:size])
+            rest = rest[size + 2:]
+        content = b''.join(chunks)
+    return status, content
+
+
+class SocketIOClient:
+    """One Socket.IO connection to the default namespace."""
+
+    def __init__(self, host: str, port: int, query: Optional[dict] = None, upgrade: bool = False):
+        self.host = host
+        self.port = port
+        self.query = dict(query or {})
+        self.upgrade = upgrade
+        self.sid: Optional[str] = None
+        self.received: Counter = Counter()
+        self.last: dict = {}
+        self._handlers: Dict[str, List[Callable[[Any, float], None]]] = defaultdict(list)
+        self._waiters: List[Tuple[str, Callable[[Any], bool], asyncio.Future]] = []
+        self._ws: Optional[WSConnection] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connected: Optional[asyncio.Future] = None
+
+    def _url(self, **params) -> str:
+        return PATH + '?' + urlencode({**self.query, 'EIO': 4, **params})
+
+    async def connect(self, timeout: float = 30.0):
+        """Open the connection and join the namespace; raises ConnectError if refused."""
+        self._connected = asyncio.get_running_loop().create_future()
+        if self.upgrade:
+            await self._polling_handshake()
+            await self._open_websocket(self._url(transport='websocket', sid=self.sid))
+            await self._send_raw('2probe')
+            await self._wait_raw_probe()
+            await self._send_raw('5')
+        else:
+            await self._open_websocket(self._url(transport='websocket'))
+            await self._send_raw('40')
+        self._reader_task = asyncio.create_task(self._read_loop())
+        await asyncio.wait_for(self._connected, timeout)
+
+    async def _polling_handshake(self):
+        status, body = await http_request(self.host, self.port, 'GET', self._url(transport='polling'))
+        if status != 200 or not body.startswith(b'0'):
+            raise ConnectError(f"polling handshake failed: {status} {body[:80]!r}")
+        self.sid = json.loads(body[1:])['sid']
+        status, _ = await http_request(self.host, self.port, 'POST', self._url(transport='polling', sid=self.sid),
+                                       b'40')
+        if status != 200:
+            raise ConnectError(f"namespace connect failed: {status}")
+        status, body = await http_request(self.host, self.port, 'GET', self._url(transport='polling', sid=self.sid))
+        for packet in body.decode('utf-8').split(RECORD_SEPARATOR):
+            self._handle(packet)
+
+    async def _open_websocket(self, target: str):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self._reader, self._writer = reader, writer
+        self._ws = WSConnection(ConnectionType.CLIENT)
+        writer.write(self._ws.send(Request(host=f"{self.host}:{self.port}", target=target,
+                                           extensions=[PerMessageDeflate()])))
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                raise ConnectError("connection closed during WebSocket handshake")
+            self._ws.receive_data(data)
+            for event in self._ws.events():
+                if isinstance(event, AcceptConnection):
+                    return
+                if isinstance(event, RejectConnection):
+                    raise ConnectError(f"WebSocket rejected: {event.status_code}")
+
+    async def _wait_raw_probe(self):
+        async for message in self._messages():
+            if message == '3probe':
+                return
+            self._handle(message)
+
+    async def _messages(self):
+        """Complete text messages from the WebSocket."""
+        parts: List[str] = []
+        while True:
+            data = await self._reader.read(65536)
+            if not data:
+                return
+            self._ws.receive_data(data)
+            for event in self._ws.events():
+                if isinstance(event, Ping):
+                    self._writer.write(self._ws.send(event.response()))
+                elif isinstance(event, CloseConnection):
+                    return
+                elif isinstance(event, (TextMessage, BytesMessage)):
+                    parts.append(event.data if isinstance(event, TextMessage) else event.data.decode('utf-8'))
+                    if event.message_finished:
+                        yield ''.join(parts)
+                        parts = []
+
+    async def _read_loop(self):
+        async for message in self._messages():
+            self._handle(message)
+        self._fail(ConnectError("connection closed"))
+
+    def _handle(self, packet: str):
+        if not packet:
+            return
+        kind = packet[0]
+        if kind == '2':
+            asyncio.ensure_future(self._send_raw('3'))
+        elif kind == '4':
+            self._handle_socketio(packet[1:])
+
+    def _handle_socketio(self, packet: str):
+        kind = packet[0]
+        if kind == '0':
+            if not self._connected.done():
+                self._connected.set_result(json.loads(packet[1:])['sid'])
+        elif kind == '4':
+            self._fail(ConnectError(f"connection refused: {packet[1:]}"))
+        elif kind == '2':
+            name, *args = json.loads(packet[1:])
+            data = args[0] if args else None
+            now = time.perf_counter()
+            self.received[name] += 1
+            self.last[name] = data
+            for handler in self._handlers.get(name, ()):
+                handler(data, now)
+            for waiter in list(self._waiters):
+                event, predicate, future = waiter
+                if event == name and not future.done() and predicate(data):
+                    future.set_result((data, now))
+                    self._waiters.remove(waiter)
+
+    def _fail(self, error: Exception):
+        if self._connected is not None and not self._connected.done():
+            self._connected.set_exception(error)
+        for _, _, future in self._waiters:
+            if not future.done():
+                future.set_exception(error)
+        self._waiters.clear()
+
+    async def _send_raw(self, text: str):
+        self._writer.write(self._ws.send(Message(data=text)))
+        await self._writer.drain()
+
+    async def emit(self, event: str, data: Any = None):
+        await self._send_raw('42' + json.dumps([event] if data is None else [event, data]))
+
+    def on(self, event: str, handler: Callable[[Any, float], None]):
+        """Call `handler(payload, arrival time)` for every `event`, before any `expect` future resolves."""
+        self._handlers[event].append(handler)
+
+    def expect(self, event: str, predicate: Callable[[Any], bool] = lambda data: True) -> asyncio.Future:
+        """A future for the next `event` matching `predicate`: (payload, arrival time). Register before emitting."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((event, predicate, future))
+        return future
+
+    async def wait(self, event: str, predicate: Callable[[Any], bool] = lambda data: True,
+                   timeout: float = 30.0) -> Tuple[Any, float]:
+        return await asyncio.wait_for(self.expect(event, predicate), timeout)
+
+    async def close(self):
+        if self._writer is None:
+            return
+        try:
+            await self._send_raw('41')
+            self._writer.write(self._ws.send(CloseConnection(code=1000)))
+            await self._writer.drain()
+        except (ConnectionError, RuntimeError):
+            pass
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self._writer.close()
@@ -1,10 +1,76 @@
 import os
+import socket
+
+DEFAULT_SECRET_KEY = 'jeopardy-secret-key-change-in-production'
+
+
+def env_flag(name: str, default: bool) -> bool:
+    """Boolean environment variable: 0/false/no/off (or empty) are false, anything else true."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ('0', 'false', 'no', 'off', '')
 
 
 class Config:
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'jeopardy-secret-key-change-in-production'
-    PORT = 9001
-    HOST = '0.0.0.0'  # Allow connections from any device on local network
-    DEBUG = True
+    # APP_ENV=production: no debug or reloader, eventlet instead of the Werkzeug dev server
+    APP_ENV = os.environ.get('APP_ENV', 'development')
+    PRODUCTION = APP_ENV == 'production'
+    SECRET_KEY = os.environ.get('SECRET_KEY') or DEFAULT_SECRET_KEY
+    PORT = int(os.environ.get('PORT', 9001))
+    HOST = os.environ.get('HOST', '0.0.0.0')  # Allow connections from any device on local network
+    DEBUG = env_flag('DEBUG', not PRODUCTION)
+    # Socket.IO server: 'eventlet' or 'threading' (Werkzeug dev server); unset picks
+    # eventlet when installed. Production defaults to eventlet.
+    ASYNC_MODE = os.environ.get('ASYNC_MODE') or ('eventlet' if PRODUCTION else None)
+    # 'websocket' alone skips the long-polling handshake and upgrade (clients must reach the server by WebSocket)
+    SOCKETIO_TRANSPORTS = [t.strip() for t in os.environ.get('SOCKETIO_TRANSPORTS', 'polling,websocket').split(',')
+                           if t.strip()]
+    # Seconds between Engine.IO pings, and to wait for the pong before dropping the client
+    PING_INTERVAL = float(os.environ.get('PING_INTERVAL', 25))
+    PING_TIMEOUT = float(os.environ.get('PING_TIMEOUT', 20))
+    # Socket.IO connections accepted by one worker; further ones are refused. 0 is unlimited
+    MAX_CONNECTIONS = int(os.environ.get('MAX_CONNECTIONS', 0))
     QUESTIONS_FILE = 'data/questions.csv'
-    BUZZ_DELAY_SECONDS = 4
+    # SQLite question library (see app/question_library.py). When set, each
+    # round's board is sampled from it instead of loading QUESTIONS_FILE.
+    QUESTION_LIBRARY = os.environ.get('QUESTION_LIBRARY', '')
+    BOARD_CATEGORIES = int(os.environ.get('BOARD_CATEGORIES', 5))
+    BOARD_VALUES = {1: [100, 200, 300, 400, 500], 2: [200, 400, 600, 800, 1000]}
+    # Seconds from a question being shown until players may buzz
+    BUZZ_DELAY_SECONDS = float(os.environ.get('BUZZ_DELAY_SECONDS', 4))
+    # Seconds between batched state broadcasts per game (joins, buzzes after the first); 0 sends each change at once
+    BROADCAST_TICK = float(os.environ.get('BROADCAST_TICK', 0.03))
+    # 'msgpack' sends game_update/game_patch/board_update as MessagePack binary to
+    # clients that ask for it (?codec=msgpack; the pages do when the server offers
+    # it), JSON to everyone else. Needs the msgpack package.
+    SOCKETIO_CODEC = os.environ.get('SOCKETIO_CODEC', 'json')
+    # permessage-deflate on WebSocket frames (eventlet server) and gzip/deflate on
+    # long-polling responses; messages under COMPRESSION_THRESHOLD bytes go uncompressed
+    WS_COMPRESSION = env_flag('WS_COMPRESSION', True)
+    COMPRESSION_THRESHOLD = int(os.environ.get('COMPRESSION_THRESHOLD', 1024))
+    # Disconnects within this many seconds go out as one game update (e.g. a Wi-Fi drop)
+    DISCONNECT_BROADCAST_DELAY = float(os.environ.get('DISCONNECT_BROADCAST_DELAY', 0.25))
+    # Base of join URLs in QR codes when phones reach the server through another name
+    # (e.g. https://quiz.example.com behind a proxy); unset uses the Host the page was loaded from
+    PUBLIC_URL = os.environ.get('PUBLIC_URL', '')
+    # Seconds between checks of the LAN address in join QR codes; codes are regenerated only if it changed. 0 disables
+    QR_ADDRESS_CHECK_INTERVAL = float(os.environ.get('QR_ADDRESS_CHECK_INTERVAL', 30))
+    # Message queue shared by several workers, e.g. redis://localhost:6379/0
+    # (local:// keeps the queue in-process). Unset runs a single worker.
+    MESSAGE_QUEUE = os.environ.get('MESSAGE_QUEUE')
+    WORKER_ID = os.environ.get('WORKER_ID') or f"{socket.gethostname()}-{os.getpid()}"
+    # Seconds a worker's claim on a game outlives its last heartbeat; after a crash
+    # (or a kill that skipped the shutdown hand-off) another worker takes the game over then
+    OWNER_LEASE_SECONDS = float(os.environ.get('OWNER_LEASE_SECONDS', 15))
+    # Command journals for crash recovery (one file per game), e.g. data/journal;
+    # unset keeps games in memory only
+    JOURNAL_DIR = os.environ.get('JOURNAL_DIR', '')
+    # Seconds between group commits (one fsync per journal per interval)
+    JOURNAL_COMMIT_INTERVAL = float(os.environ.get('JOURNAL_COMMIT_INTERVAL', 0.02))
+    # Binary game snapshots (one file per game); the journal is trimmed to the
+    # commands after each snapshot. Share this directory between workers so a
+    # restarted worker can take over a live game. Unset disables snapshots.
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', '')
+    # Seconds between background snapshots of changed games; 0 only snapshots on shutdown
+    SNAPSHOT_INTERVAL = float(os.environ.get('SNAPSHOT_INTERVAL', 5))
@@ -118,3 +118,91 @@ def full_round_questions():
     ]
     return questions
 
+
+
+@pytest.fixture(scope='session')
+def flask_app(tmp_path_factory):
+    """Flask app with Socket.IO handlers registered (created once per session)."""
+    from app import create_app
+    from config import Config
+    Config.JOURNAL_DIR = str(tmp_path_factory.mktemp('journal'))
+    Config.SNAPSHOT_DIR = str(tmp_path_factory.mktemp('snapshots'))
+    Config.SNAPSHOT_INTERVAL = 0
+    Config.QR_ADDRESS_CHECK_INTERVAL = 0
+    return create_app()
+
+
+@pytest.fixture
+def socket_client(flask_app, monkeypatch, mock_questions_file):
+    """Factory for Socket.IO test clients talking to a fresh game registry.
+
+    Returns:
+        callable: Creates a connected test client on each call; keyword
+        arguments (e.g. ``query_string='game=ABCD'``) go to the test client
+    """
+    from app import socketio, events
+    from app.qr import QRCodes
+    from app.registry import GameRegistry
+    from app.timers import TimerScheduler
+    monkeypatch.setattr(events, 'games', GameRegistry())
+    # QR codes are generated on first request, for a fixed address
+    monkeypatch.setattr(events, 'qr_codes', QRCodes(detect_address=lambda: '192.168.1.20'))
+    # Timers only fire when a test calls events.timers.run_due()
+    monkeypatch.setattr(events, 'timers', TimerScheduler())
+    clients = []
+
+    def connect(**kwargs):
+        client = socketio.test_client(flask_app, **kwargs)
+        client.get_received()
+        clients.append(client)
+        return client
+
+    yield connect
+
+    for client in clients:
+        if client.is_connected():
+            client.disconnect()
+
+
+def received(client, name):
+    """Return the payloads of every `name` event the client has received."""
+    return [msg['args'][0] if msg['args'] else None for msg in client.get_received() if msg['name'] == name]
+
+
+def play_some(gm):
+    """Drive a game through teams, players, a wrong answer, a right answer and a skip, leaving a buzz queued."""
+    gm.load_questions()
+    alpha = gm.create_team('Alpha')
+    beta = gm.create_team('Beta')
+    alice = gm.add_player('Alice', alpha.id, 's1')
+    bob = gm.add_player('Bob', beta.id, 's2')
+    gm.start_round(1)
+
+    gm.select_question('Geography', 100)
+    gm.enable_buzzing()
+    gm.buzz_in(alice.id)
+    gm.buzz_in(bob.id)
+    gm.adjudicate_answer(False)
+    gm.adjudicate_answer(True)
+
+    gm.select_question('Science', 200)
+    gm.skip_question()
+
+    gm.select_question('Geography', 200)
+    gm.enable_buzzing()
+    gm.buzz_in(bob.id)
+
+
+def comparable(gm):
+    """Game summary without per-session details that do not survive a restart."""
+    summary = gm.get_game_summary()
+    return {
+        'phase': summary['phase'],
+        'question_state': summary['question_state'],
+        'teams': [{k: v for k, v in team.items() if k != 'players'} for team in summary['teams']],
+        'current_question': summary['current_question'],
+        'buzz_queue': [e['player_id'] for e in summary['buzz_queue']],
+        'teams_attempted': summary['teams_attempted'],
+        'used': [q.used for q in gm.state.questions],
+        'players': {p.id: (p.name, p.team_id) for p in gm.state.players.values()},
+    }
@@ -19,8 +19,7 @@ def setup_simple_game():
 def test_correct_flow():
     gm, t1, t2, p1, p2 = setup_simple_game()
     gm.state.buzz_queue = [
-        BuzzEntry(player_id=p1.id, player_name=p1.name, team_id=p1.team_id, team_name=gm.state.teams[p1.team_id].name,
-                  timestamp=0)]
+        BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)]
     next_player, score_change = gm.adjudicate_answer(True)
     print('Correct flow -> next_player:', next_player, 'score_change:', score_change)
     assert next_player is None
@@ -35,8 +34,7 @@ def test_correct_flow():
 def test_wrong_no_queue_flow():
     gm, t1, t2, p1, p2 = setup_simple_game()
     gm.state.buzz_queue = [
-        BuzzEntry(player_id=p1.id, player_name=p1.name, team_id=p1.team_id, team_name=gm.state.teams[p1.team_id].name,
-                  timestamp=0)]
+        BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)]
     next_player, score_change = gm.adjudicate_answer(False)
     print('Wrong/no-queue flow -> next_player:', next_player, 'score_change:', score_change)
     # Since there is another team (t2), question should remain active and buzzing open
@@ -15,8 +15,7 @@ class TestAdjudicateCorrectAnswer:
 
         # Player 1 from team 1 buzzes
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=p1.team_id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)
         ]
 
         next_player, score_change = gm.adjudicate_answer(correct=True)
@@ -37,8 +36,7 @@ class TestAdjudicateCorrectAnswer:
         gm.state.teams[t1.id].score = 50
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=p1.team_id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)
         ]
 
         next_player, score_change = gm.adjudicate_answer(correct=True)
@@ -52,8 +50,7 @@ class TestAdjudicateCorrectAnswer:
         gm.state.teams_attempted = [t1.id]  # Add some state to clear
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=p1.team_id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)
         ]
 
         gm.adjudicate_answer(correct=True)
@@ -72,8 +69,7 @@ class TestAdjudicateCorrectAnswer:
         gm.state.current_question = q
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=p1.team_id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)
         ]
 
         next_player, score_change = gm.adjudicate_answer(correct=True)
@@ -89,8 +85,7 @@ class TestAdjudicateWrongAnswerSingleBuzzer:
         gm, t1, t2, p1, p2, q = simple_game
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=p1.team_id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)
         ]
 
         next_player, score_change = gm.adjudicate_answer(correct=False)
@@ -110,8 +105,7 @@ class TestAdjudicateWrongAnswerSingleBuzzer:
         gm.state.teams[t1.id].score = 100
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=p1.team_id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)
         ]
 
         gm.adjudicate_answer(correct=False)
@@ -123,8 +117,7 @@ class TestAdjudicateWrongAnswerSingleBuzzer:
         gm, t1, t2, p1, p2, q = simple_game
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=p1.team_id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)
         ]
 
         gm.adjudicate_answer(correct=False)
@@ -141,10 +134,8 @@ class TestAdjudicateWrongAnswerQueuedBuzzers:
 
         # Add both players to queue
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=t1.id, team_name='Alpha', timestamp=0),
-            BuzzEntry(player_id=p2.id, player_name=p2.name,
-                     team_id=t2.id, team_name='Beta', timestamp=1)
+            BuzzEntry(player_id=p1.id, team_id=t1.id, timestamp=0),
+            BuzzEntry(player_id=p2.id, team_id=t2.id, timestamp=1)
         ]
 
         next_player, score_change = gm.adjudicate_answer(correct=False)
@@ -161,10 +152,8 @@ class TestAdjudicateWrongAnswerQueuedBuzzers:
         gm, t1, t2, p1, p2, q = simple_game
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=t1.id, team_name='Alpha', timestamp=0),
-            BuzzEntry(player_id=p2.id, player_name=p2.name,
-                     team_id=t2.id, team_name='Beta', timestamp=1)
+            BuzzEntry(player_id=p1.id, team_id=t1.id, timestamp=0),
+            BuzzEntry(player_id=p2.id, team_id=t2.id, timestamp=1)
         ]
 
         initial_queue_len = len(gm.state.buzz_queue)
@@ -192,8 +181,7 @@ class TestAdjudicateAllTeamsAttempted:
 
         # Final buzzer from third team
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=players[2].id, player_name=players[2].name,
-                     team_id=teams[2].id, team_name=teams[2].name, timestamp=0)
+            BuzzEntry(player_id=players[2].id, team_id=teams[2].id, timestamp=0)
         ]
 
         next_player, score_change = gm.adjudicate_answer(correct=False)
@@ -252,8 +240,7 @@ class TestAdjudicateMultipleRounds:
         gm.state.current_question = q
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=t1.id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=t1.id, timestamp=0)
         ]
 
         next_player, score_change = gm.adjudicate_answer(correct=True)
@@ -270,8 +257,7 @@ class TestAdjudicateMultipleRounds:
         gm.state.current_question = q
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=t1.id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=t1.id, timestamp=0)
         ]
 
         next_player, score_change = gm.adjudicate_answer(correct=False)
@@ -290,8 +276,7 @@ class TestAdjudicateTeamsAttemptedTracking:
         assert gm.state.teams_attempted == []
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=t1.id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=t1.id, timestamp=0)
         ]
 
         gm.adjudicate_answer(correct=False)
@@ -305,8 +290,7 @@ class TestAdjudicateTeamsAttemptedTracking:
         gm.state.teams_attempted = [t2.id]
 
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=t1.id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=t1.id, timestamp=0)
         ]
 
         gm.adjudicate_answer(correct=True)
@@ -319,8 +303,7 @@ class TestAdjudicateTeamsAttemptedTracking:
 
         gm.state.teams_attempted = [t1.id]
         gm.state.buzz_queue = [
-            BuzzEntry(player_id=p1.id, player_name=p1.name,
-                     team_id=t1.id, team_name='Alpha', timestamp=0)
+            BuzzEntry(player_id=p1.id, team_id=t1.id, timestamp=0)
         ]
 
         gm.adjudicate_answer(correct=False)
@@ -0,0 +1,177 @@
+"""
+Tests for the buzz queue data structures and buzz_in admission.
+"""
+import pytest
+from app.game_logic import GameManager
+from app.models import BuzzEntry, BuzzQueue, GameState, IdSet, Question, QuestionState
+
+
+def entry(player, team):
+    return BuzzEntry(player_id=player, team_id=team, timestamp=0)
+
+
+class TestBuzzQueue:
+    """Tests for BuzzQueue."""
+
+    def test_fifo_order(self):
+        """Test that entries come out in the order they were added."""
+        queue = BuzzQueue([entry('p1', 't1'), entry('p2', 't2')])
+
+        assert queue.popleft().player_id == 'p1'
+        assert queue[0].player_id == 'p2'
+        assert len(queue) == 1
+
+    def test_membership(self):
+        """Test player and team membership lookups."""
+        queue = BuzzQueue([entry('p1', 't1')])
+
+        assert queue.has_player('p1')
+        assert queue.has_team('t1')
+        assert not queue.has_player('p2')
+        assert not queue.has_team('t2')
+
+    def test_drop_team_removes_all_its_entries(self):
+        """Test that dropping a team removes its players wherever they are."""
+        queue = BuzzQueue([entry('p1', 't1'), entry('p2', 't2'), entry('p3', 't1'), entry('p4', 't3')])
+
+        assert queue.drop_team('t1') == 2
+
+        assert [e.player_id for e in queue] == ['p2', 'p4']
+        assert len(queue) == 2
+        assert queue[0].player_id == 'p2'
+        assert not queue.has_player('p3')
+        assert not queue.has_team('t1')
+
+    def test_drop_team_then_popleft_skips_dropped(self):
+        """Test that lazily dropped entries never reach the front."""
+        queue = BuzzQueue([entry('p1', 't1'), entry('p2', 't2'), entry('p3', 't1'), entry('p4', 't3')])
+        queue.drop_team('t1')
+
+        assert queue.popleft().player_id == 'p2'
+        assert queue.popleft().player_id == 'p4'
+        assert len(queue) == 0
+        assert not queue
+
+    def test_dropped_team_can_queue_again(self):
+        """Test that a dropped team's old entries do not come back."""
+        queue = BuzzQueue([entry('p2', 't2'), entry('p1', 't1')])
+        queue.drop_team('t1')
+
+        queue.append(entry('p3', 't1'))
+
+        assert [e.player_id for e in queue] == ['p2', 'p3']
+
+    def test_drop_unknown_team(self):
+        """Test that dropping a team with no entries is a no-op."""
+        queue = BuzzQueue([entry('p1', 't1')])
+
+        assert queue.drop_team('t9') == 0
+        assert len(queue) == 1
+
+    def test_compares_equal_to_list(self):
+        """Test list equality used throughout the tests."""
+        e1 = entry('p1', 't1')
+
+        assert BuzzQueue() == []
+        assert BuzzQueue([e1]) == [e1]
+        assert BuzzQueue([e1]) != []
+
+    def test_clear(self):
+        """Test that clear resets every index."""
+        queue = BuzzQueue([entry('p1', 't1')])
+        queue.drop_team('t1')
+        queue.append(entry('p2', 't2'))
+
+        queue.clear()
+
+        assert queue == []
+        assert not queue.has_player('p2')
+
+
+class TestIdSet:
+    """Tests for IdSet."""
+
+    def test_ordered_and_deduplicated(self):
+        """Test insertion order and duplicate handling."""
+        ids = IdSet(['t2', 't1'])
+        ids.add('t2')
+
+        assert list(ids) == ['t2', 't1']
+        assert ids.count('t2') == 1
+        assert ids == ['t2', 't1']
+
+    def test_game_state_wraps_lists(self):
+        """Test that assigning lists to GameState produces the indexed types."""
+        state = GameState()
+
+        state.buzz_queue = [entry('p1', 't1')]
+        state.teams_attempted = ['t1']
+
+        assert isinstance(state.buzz_queue, BuzzQueue)
+        assert isinstance(state.teams_attempted, IdSet)
+        assert state.buzz_queue.has_player('p1')
+
+
+@pytest.fixture
+def tournament():
+    """30 teams of 4 players with a question open for buzzing."""
+    gm = GameManager()
+    players = []
+    for t in range(30):
+        team = gm.create_team(f'Team {t}')
+        players.append([gm.add_player(f'P{t}-{i}', team.id, f's{t}-{i}') for i in range(4)])
+    q = Question(round=1, category='Cat', value=100, question='Q?', answer='A')
+    gm.state.questions = [q]
+    gm.state.current_question = q
+    gm.state.question_state = QuestionState.BUZZING_OPEN
+    return gm, players
+
+
+class TestBuzzAdmission:
+    """Tests for buzz_in admission under many teams."""
+
+    def test_every_player_admitted_once(self, tournament):
+        """Test that each player can queue once per question."""
+        gm, players = tournament
+
+        for team_players in players:
+            for p in team_players:
+                assert gm.buzz_in(p.id) is True
+                assert gm.buzz_in(p.id) is False
+
+        assert len(gm.state.buzz_queue) == 120
+
+    def test_wrong_answer_prunes_whole_team(self, tournament):
+        """Test that a wrong answer removes the answering team's other buzzers."""
+        gm, players = tournament
+        for i in range(4):
+            for team_players in players[:3]:
+                gm.buzz_in(team_players[i].id)
+
+        next_player, _ = gm.adjudicate_answer(correct=False)
+
+        assert next_player == players[1][0].id
+        assert len(gm.state.buzz_queue) == 8
+        assert not gm.state.buzz_queue.has_team(players[0][0].team_id)
+
+    def test_attempted_team_rejected(self, tournament):
+        """Test that players from a team that already answered cannot buzz."""
+        gm, players = tournament
+        gm.buzz_in(players[0][0].id)
+        gm.adjudicate_answer(correct=False)
+
+        assert gm.buzz_in(players[0][1].id) is False
+        assert gm.buzz_in(players[1][0].id) is True
+
+    def test_all_teams_wrong_returns_to_board(self, tournament):
+        """Test that the question ends once every team has answered wrong."""
+        gm, players = tournament
+        for team_players in players:
+            gm.buzz_in(team_players[0].id)
+
+        for _ in players:
+            gm.adjudicate_answer(correct=False)
+
+        assert gm.state.current_question is None
+        assert gm.state.question_state == QuestionState.BOARD_ACTIVE
+        assert gm.state.teams_attempted == []
@@ -0,0 +1,356 @@
+"""
+Tests for the multi-worker message bus, game ownership and command forwarding (app/cluster.py).
+"""
+import pytest
+import socketio
+from app.cluster import BusManager, Cluster, LocalBus, make_bus, require_patched_sockets
+from conftest import received
+
+
+class TestLocalBus:
+    """Tests for the in-process bus."""
+
+    def test_publish_reaches_subscribers_of_channel(self):
+        """Test that messages go to every subscriber of their channel only."""
+        bus = LocalBus()
+        got_a, got_b, got_other = [], [], []
+        bus.subscribe('a', got_a.append)
+        bus.subscribe('a', got_b.append)
+        bus.subscribe('other', got_other.append)
+
+        bus.publish('a', {'n': 1})
+
+        assert got_a == got_b == [{'n': 1}]
+        assert got_other == []
+
+    def test_messages_are_copied(self):
+        """Test that subscribers never share objects with the publisher."""
+        bus = LocalBus()
+        got = []
+        bus.subscribe('a', got.append)
+        message = {'items': [1]}
+
+        bus.publish('a', message)
+
+        assert got[0] == message and got[0] is not message
+
+    def test_set_default_keeps_first_value(self):
+        """Test that set_default only stores a value once."""
+        bus = LocalBus()
+
+        assert bus.set_default('k', 'w1') == 'w1'
+        assert bus.set_default('k', 'w2') == 'w1'
+        assert bus.delete_if('k', 'w2') is False
+        assert bus.delete_if('k', 'w1') is True
+        assert bus.get('k') is None
+
+    def test_keys_expire_after_ttl(self):
+        """Test that a key set with a ttl lapses unless its holder renews it."""
+        now = [100.0]
+        bus = LocalBus(clock=lambda: now[0])
+        bus.set_default('k', 'w1', ttl=10)
+
+        now[0] += 9
+        assert bus.renew('k', 'w2', 10) is False
+        assert bus.renew('k', 'w1', 10) is True
+        now[0] += 9
+        assert bus.get('k') == 'w1'
+        now[0] += 2
+        assert bus.get('k') is None
+        assert bus.set_default('k', 'w2', ttl=10) == 'w2'
+
+    def test_make_bus(self):
+        """Test picking a bus from a MESSAGE_QUEUE URL."""
+        assert isinstance(make_bus('local://', None), LocalBus)
+        with pytest.raises(ValueError):
+            make_bus('carrier-pigeon://', None)
+
+    def test_redis_needs_patched_sockets(self):
+        """Test that a Redis bus is refused under an eventlet that has not patched sockets."""
+        pytest.importorskip('eventlet')
+        with pytest.raises(RuntimeError, match='monkey-patched'):
+            require_patched_sockets('eventlet')
+        require_patched_sockets('threading')
+
+
+def make_server(bus, sent):
+    """A Socket.IO server on `bus` that records (eio_sid, event, data) for each packet it sends."""
+    server = socketio.Server(client_manager=BusManager(bus), async_mode='threading')
+    server.manager_initialized = True
+    server.manager.initialize()
+
+    def send_eio_packet(eio_sid, eio_pkt):
+        pkt = socketio.packet.Packet(encoded_packet=eio_pkt.data)
+        sent.append((eio_sid, pkt.data[0], pkt.data[1]))
+    server._send_eio_packet = send_eio_packet
+    return server
+
+
+class TestBusManager:
+    """Tests for Socket.IO emits relayed between servers over the bus."""
+
+    def test_room_emit_reaches_other_server(self):
+        """Test that a broadcast from one server reaches room members on another."""
+        bus = LocalBus()
+        sent_a, sent_b = [], []
+        server_a = make_server(bus, sent_a)
+        server_b = make_server(bus, sent_b)
+        sid_b = server_b.manager.connect('eio-b', '/')
+        server_b.enter_room(sid_b, 'ABCD:players')
+
+        server_a.emit('game_patch', {'seq': 1}, to='ABCD:players')
+
+        assert sent_b == [('eio-b', 'game_patch', {'seq': 1})]
+        assert sent_a == []
+
+    def test_enter_room_for_remote_client(self):
+        """Test that a server can put a client connected elsewhere into a room."""
+        bus = LocalBus()
+        sent_a, sent_b = [], []
+        server_a = make_server(bus, sent_a)
+        server_b = make_server(bus, sent_b)
+        sid_b = server_b.manager.connect('eio-b', '/')
+
+        server_a.enter_room(sid_b, 'ABCD')
+        server_a.emit('hello', {}, to='ABCD')
+
+        assert 'ABCD' in server_b.rooms(sid_b)
+        assert sent_b == [('eio-b', 'hello', {})]
+
+
+class TestCluster:
+    """Tests for game ownership."""
+
+    def test_first_claim_wins(self):
+        """Test that a game stays with the first worker that claims it."""
+        bus = LocalBus()
+        w1, w2 = Cluster(bus, 'w1'), Cluster(bus, 'w2')
+
+        assert w1.claim('ABCD') == 'w1'
+        assert w2.claim('ABCD') == 'w1'
+        assert w2.owner('ABCD') == 'w1'
+
+    def test_release_only_by_owner(self):
+        """Test that only the owner can release a game."""
+        bus = LocalBus()
+        w1, w2 = Cluster(bus, 'w1'), Cluster(bus, 'w2')
+        w1.claim('ABCD')
+
+        w2.release('ABCD')
+        assert w1.owner('ABCD') == 'w1'
+        w1.release('ABCD')
+        assert w2.claim('ABCD') == 'w2'
+
+    def test_lapsed_lease_taken_over(self):
+        """Test that a game whose owner stops renewing goes to the next worker that claims it."""
+        now = [100.0]
+        bus = LocalBus(clock=lambda: now[0])
+        w1, w2 = Cluster(bus, 'w1', lease=15), Cluster(bus, 'w2', lease=15)
+        w1.claim('ABCD')
+
+        now[0] += 10
+        assert w1.renew('ABCD') is True
+        now[0] += 10
+        assert w2.claim('ABCD') == 'w1'
+        now[0] += 10
+        assert w2.claim('ABCD') == 'w2'
+        assert w1.renew('ABCD') is False
+
+    def test_renew_reclaims_lapsed_game_nobody_took(self):
+        """Test that a late heartbeat keeps a game no other worker claimed meanwhile."""
+        now = [100.0]
+        bus = LocalBus(clock=lambda: now[0])
+        w1 = Cluster(bus, 'w1', lease=15)
+        w1.claim('ABCD')
+        now[0] += 20
+
+        assert w1.renew('ABCD') is True
+        assert w1.owner('ABCD') == 'w1'
+
+    def test_heartbeat_reports_lost_games(self):
+        """Test that the heartbeat renews this worker's games and reports the ones taken over."""
+        now = [100.0]
+        bus = LocalBus(clock=lambda: now[0])
+        w1, w2 = Cluster(bus, 'w1', lease=15), Cluster(bus, 'w2', lease=15)
+        w1.claim('ABCD')
+        w1.claim('WXYZ')
+        lost, beats = [], []
+
+        def sleep(delay):
+            beats.append(delay)
+            if len(beats) == 3:
+                raise StopIteration
+            now[0] += 20
+            if len(beats) == 2:
+                w2.claim('WXYZ')
+
+        with pytest.raises(StopIteration):
+            w1.run_heartbeat(lambda: ['ABCD', 'WXYZ'], lost.append, sleep)
+
+        assert beats == [5, 5, 5]
+        assert lost == ['WXYZ']
+        assert w2.owner('ABCD') == 'w1'
+
+    def test_forward_reaches_owner_only(self):
+        """Test that commands are delivered on the owner's channel."""
+        bus = LocalBus()
+        w1, w2 = Cluster(bus, 'w1'), Cluster(bus, 'w2')
+        got_1, got_2 = [], []
+        w1.listen(got_1.append)
+        w2.listen(got_2.append)
+
+        w1.forward('w2', {'handler': 'handle_buzz'})
+
+        assert got_2 == [{'handler': 'handle_buzz'}]
+        assert got_1 == []
+
+
+@pytest.fixture
+def two_workers(flask_app, monkeypatch):
+    """This process as worker w1, with every game it hosts owned by a second worker w2.
+
+    Commands forwarded to w2 are run by `run_forwarded` in this same process,
+    so a client talking to w1 is served end to end through forwarding.
+    """
+    from app import events
+    bus = LocalBus()
+    monkeypatch.setattr(events, 'cluster', Cluster(bus, 'w1'))
+    w2 = Cluster(bus, 'w2')
+    forwarded = []
+
+    def run_on_w2(command):
+        forwarded.append(command)
+        events.run_forwarded(flask_app, command)
+    w2.listen(run_on_w2)
+    return w2, forwarded
+
+
+class TestForwarding:
+    """Tests for handlers forwarded to the worker that owns the game."""
+
+    def test_events_for_remote_game_are_forwarded(self, socket_client, two_workers):
+        """Test that events for a game owned by another worker are forwarded to it."""
+        from app import events
+        w2, forwarded = two_workers
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        code = received(trebek, 'registration_success')[0]['game']
+        events.cluster.release(code)
+        w2.claim(code)
+
+        trebek.emit('create_team', {'name': 'Alpha'})
+        events.timers.run_due(now=float('inf'))
+
+        assert [c['handler'] for c in forwarded] == ['handle_create_team']
+        assert code in forwarded[0]['rooms']
+        assert [t.name for t in events.games.get(code).manager.state.teams.values()] == ['Alpha']
+        assert received(trebek, 'game_patch')[-1]['ops'][0][0] == 'team_add'
+
+    def test_owned_games_run_locally(self, socket_client, two_workers):
+        """Test that games owned by this worker are never forwarded."""
+        w2, forwarded = two_workers
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        trebek.emit('create_team', {'name': 'Alpha'})
+
+        assert forwarded == []
+
+    def test_new_game_skips_codes_owned_elsewhere(self, socket_client, two_workers, monkeypatch):
+        """Test that a new game never takes a code another worker already owns."""
+        from app import events, registry
+        w2, forwarded = two_workers
+        letters = iter('AAAA' + 'BBBB')
+        monkeypatch.setattr(registry.secrets, 'choice', lambda alphabet: next(letters))
+        w2.claim('AAAA')
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+
+        assert received(trebek, 'registration_success')[0]['game'] == 'BBBB'
+        assert 'AAAA' not in events.games
+        assert events.cluster.owner('BBBB') == 'w1'
+        assert forwarded == []
+
+    def test_forwarded_join_enters_rooms(self, socket_client, two_workers):
+        """Test that a player joining through the owner ends up in the game's rooms."""
+        from app import events
+        w2, forwarded = two_workers
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        code = received(trebek, 'registration_success')[0]['game']
+        trebek.emit('create_team', {'name': 'Alpha'})
+        events.cluster.release(code)
+        w2.claim(code)
+
+        player = socket_client()
+        player.emit('join_game', {'name': 'Alice', 'team_id': 'team_1', 'game': code})
+        assert received(player, 'registration_success')[0]['role'] == 'player'
+
+        trebek.emit('start_round', {'round': 1})
+        trebek.emit('select_question', {'category': 'Geography', 'value': 100})
+
+        ops = [op for patch in received(player, 'game_patch') for op in patch['ops']]
+        assert ['set', 'current_question', {'category': 'Geography', 'value': 100}] in ops
+        assert 'handle_join_game' in [c['handler'] for c in forwarded]
+
+    def test_ended_game_released(self, socket_client, two_workers):
+        """Test that ending a game frees its code for every worker."""
+        from app import events
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        code = received(trebek, 'registration_success')[0]['game']
+        trebek.emit('end_game')
+
+        assert events.cluster.owner(code) is None
+
+    def test_lapsed_game_restored_here(self, socket_client, monkeypatch, tmp_path):
+        """Test that once a dead worker's lease lapses, an event for its game restores and claims it here."""
+        from app import events
+        from app.registry import GameRegistry
+        crashed = GameRegistry(journal_dir=str(tmp_path))
+        code = crashed.host().code
+        crashed.get(code).manager.create_team('Alpha')
+        crashed.close()
+        now = [100.0]
+        bus = LocalBus(clock=lambda: now[0])
+        Cluster(bus, 'w2', lease=15).claim(code)
+        monkeypatch.setattr(events, 'cluster', Cluster(bus, 'w1', lease=15))
+        monkeypatch.setattr(events, 'games', GameRegistry(
+            journal_dir=str(tmp_path), claim=lambda c: events.cluster.claim(c) == 'w1'))
+        client = socket_client()
+
+        client.emit('request_game_state', {'game': code})
+        assert received(client, 'game_update') == []
+        now[0] += 20
+        client.emit('request_game_state', {'game': code})
+
+        assert [t['name'] for t in received(client, 'game_update')[0]['teams']] == ['Alpha']
+        assert events.cluster.owner(code) == 'w1'
+
+    def test_lost_game_dropped(self, socket_client, two_workers):
+        """Test that a game another worker took over is no longer hosted here and its timers stop."""
+        from app import events
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        code = received(trebek, 'registration_success')[0]['game']
+        trebek.emit('start_round', {'round': 1})
+        trebek.emit('select_question', {'category': 'Geography', 'value': 100})
+
+        events.lose_game(code)
+
+        assert code not in events.games
+        assert not events.timers.pending(f'{code}:buzz_delay')
+
+    def test_qr_for_game_owned_elsewhere(self, flask_app, two_workers):
+        """Test that /qr serves games another worker owns and 404s codes nobody owns."""
+        w2, forwarded = two_workers
+        w2.claim('WXYZ')
+        client = flask_app.test_client()
+
+        assert client.get('/qr?game=WXYZ').status_code == 200
+        assert client.get('/qr?game=QQQQ').status_code == 404
+
+    def test_unknown_handler_ignored(self, flask_app):
+        """Test that a forwarded command for an unknown handler is dropped."""
+        from app import events
+
+        events.run_forwarded(flask_app, {'handler': 'nope', 'sid': 'x', 'rooms': [], 'args': []})
@@ -0,0 +1,114 @@
+"""
+Stress tests for concurrent buzzing and adjudication against one GameManager.
+"""
+import sys
+import threading
+from collections import Counter
+
+import pytest
+from app.game_logic import GameManager
+from app.models import Question, QuestionState
+
+TEAMS = 40
+PLAYERS_PER_TEAM = 50  # 2000 players
+
+
+@pytest.fixture(autouse=True)
+def fast_thread_switching():
+    """Switch threads as often as possible to shake out races."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.fixture
+def crowded_game():
+    """A game with 2000 players and a question open for buzzing."""
+    gm = GameManager()
+    players = []
+    for t in range(TEAMS):
+        team = gm.create_team(f'Team {t}')
+        players.extend(gm.add_player(f'P{t}-{i}', team.id, f's{t}-{i}') for i in range(PLAYERS_PER_TEAM))
+    q = Question(round=1, category='Cat', value=100, question='Q?', answer='A')
+    gm.state.questions = [q]
+    gm.state.current_question = q
+    gm.state.question_state = QuestionState.BUZZING_OPEN
+    return gm, players
+
+
+def run_concurrently(targets, workers=16):
+    """Run callables across `workers` threads released at the same moment."""
+    barrier = threading.Barrier(workers)
+    chunks = [targets[i::workers] for i in range(workers)]
+
+    def worker(chunk):
+        barrier.wait()
+        for target in chunk:
+            target()
+
+    threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def assert_queue_invariants(gm):
+    queue = list(gm.state.buzz_queue)
+    player_ids = [e.player_id for e in queue]
+    assert len(player_ids) == len(set(player_ids)), "player queued twice"
+    assert len(queue) == len(gm.state.buzz_queue)
+    assert all(e.team_id not in gm.state.teams_attempted for e in queue)
+    assert [e.timestamp for e in queue] == sorted(e.timestamp for e in queue), "queue order differs from admission order"
+
+
+class TestConcurrentBuzzing:
+    """Tests for buzz arbitration under concurrent handlers."""
+
+    def test_each_player_admitted_exactly_once(self, crowded_game):
+        """Test that thousands of racing duplicate buzzes admit each player once."""
+        gm, players = crowded_game
+        results = Counter()
+        lock = threading.Lock()
+
+        def buzz(player_id):
+            accepted = gm.buzz_in(player_id)
+            with lock:
+                results[player_id] += accepted
+
+        # Every player buzzes three times, all racing each other
+        run_concurrently([lambda pid=p.id: buzz(pid) for p in players * 3])
+
+        assert all(results[p.id] == 1 for p in players)
+        assert len(gm.state.buzz_queue) == len(players)
+        assert_queue_invariants(gm)
+
+    def test_buzzes_racing_adjudication(self, crowded_game):
+        """Test queue invariants while wrong answers prune teams concurrently."""
+        gm, players = crowded_game
+        wrong_answers = 10
+
+        targets = [lambda pid=p.id: gm.buzz_in(pid) for p in players]
+        targets += [lambda: gm.adjudicate_answer(correct=False)] * wrong_answers
+        run_concurrently(targets)
+
+        assert_queue_invariants(gm)
+        # Every team that was adjudicated wrong lost exactly 100
+        scores = Counter(team.score for team in gm.state.teams.values())
+        assert set(scores) <= {0, -100}
+        assert scores[-100] == len(gm.state.teams_attempted)
+
+    def test_summary_consistent_under_concurrent_reads(self, crowded_game):
+        """Test that summaries read during buzzing always match a real queue state."""
+        gm, players = crowded_game
+        summaries = []
+
+        targets = [lambda pid=p.id: gm.buzz_in(pid) for p in players[:500]]
+        targets += [lambda: summaries.append(gm.get_game_summary())] * 200
+        run_concurrently(targets)
+
+        for summary in summaries:
+            ids = [e['player_id'] for e in summary['buzz_queue']]
+            assert len(ids) == len(set(ids))
+        assert len(gm.get_game_summary()['buzz_queue']) == 500
@@ -0,0 +1,404 @@
+"""
+Tests for the Socket.IO event handlers in app/events.py.
+"""
+import pytest
+from conftest import received
+
+
+def only_game():
+    """The single game hosted by the test registry."""
+    from app import events
+    (game,) = list(events.games)
+    return game
+
+
+@pytest.fixture
+def trebek(socket_client):
+    """Connected and registered Trebek client."""
+    client = socket_client()
+    client.emit('register_trebek')
+    client.get_received()
+    return client
+
+
+class TestBoardUpdates:
+    """Tests for board_update payloads."""
+
+    def test_start_round_sends_versioned_board(self, trebek):
+        """Test that starting a round broadcasts the board with a version."""
+        trebek.emit('start_round', {'round': 1})
+
+        boards = received(trebek, 'board_update')
+        assert len(boards) == 1
+        assert boards[0]['round'] == 1
+        assert isinstance(boards[0]['version'], int)
+        assert set(boards[0]['board']) == {'Geography', 'Science'}
+
+    def test_display_reuses_payload_when_unchanged(self, trebek, socket_client):
+        """Test that displays registering mid-round get the same board version."""
+        trebek.emit('start_round', {'round': 1})
+        version = received(trebek, 'board_update')[0]['version']
+
+        display = socket_client()
+        display.emit('register_display')
+
+        assert received(display, 'board_update')[0]['version'] == version
+
+    def test_skip_bumps_board_version(self, trebek):
+        """Test that using a question sends a cell_used event for a newer board version."""
+        trebek.emit('start_round', {'round': 1})
+        version = received(trebek, 'board_update')[0]['version']
+
+        trebek.emit('select_question', {'category': 'Science', 'value': 100})
+        trebek.emit('skip_question')
+
+        messages = trebek.get_received()
+        assert [m['name'] for m in messages if m['name'] in ('board_update', 'cell_used')] == ['cell_used']
+        (cell,) = [m['args'][0] for m in messages if m['name'] == 'cell_used']
+        assert cell['base'] == version
+        assert cell['version'] > version
+        assert (cell['category'], cell['row'], cell['value'], cell['used']) == ('Science', 0, 100, True)
+
+
+class TestCellUpdates:
+    """Tests for cell_used events and board resyncs."""
+
+    def test_cell_used_reaches_both_board_roles(self, round_in_progress):
+        """Test that the host and the display get the same small cell_used event and no layout."""
+        trebek, player, display = round_in_progress
+
+        trebek.emit('skip_question')
+
+        host_cells = received(trebek, 'cell_used')
+        assert host_cells == received(display, 'cell_used')
+        assert set(host_cells[0]) == {'round', 'base', 'version', 'category', 'row', 'value', 'used'}
+
+    def test_cells_apply_in_order(self, trebek):
+        """Test that each cell_used event applies on top of the version the previous one produced."""
+        trebek.emit('start_round', {'round': 1})
+        board = received(trebek, 'board_update')[0]
+        for category, value in (('Science', 100), ('Geography', 200)):
+            trebek.emit('select_question', {'category': category, 'value': value})
+            trebek.emit('skip_question')
+
+        for cell in received(trebek, 'cell_used'):
+            assert cell['base'] == board['version']
+            board['board'][cell['category']][cell['row']]['used'] = cell['used']
+            board['version'] = cell['version']
+
+        assert board['board'] == only_game().manager.get_board_state(1)
+
+    def test_late_display_catches_up(self, round_in_progress, socket_client):
+        """Test that a display registering mid-round gets the layout its later cell_used events apply to."""
+        trebek, player, display = round_in_progress
+        trebek.emit('skip_question')
+        late = socket_client()
+        late.emit('register_display')
+        layout = received(late, 'board_update')[-1]
+
+        trebek.emit('select_question', {'category': 'Science', 'value': 100})
+        trebek.emit('skip_question')
+
+        assert received(late, 'cell_used')[0]['base'] == layout['version']
+
+    def test_rebuilt_board_sends_layout(self, round_in_progress):
+        """Test that a board whose changes are gone is sent whole instead of as cells."""
+        trebek, player, display = round_in_progress
+        only_game().board_versions[1] = -1
+
+        trebek.emit('skip_question')
+
+        assert received(display, 'board_update')[-1]['board']['Geography'][0]['used'] is True
+
+    def test_request_board_only_for_board_roles(self, round_in_progress):
+        """Test that players cannot ask for the board."""
+        trebek, player, display = round_in_progress
+
+        player.emit('request_board')
+
+        assert received(player, 'board_update') == []
+
+
+class TestStatePatches:
+    """Tests for game_patch broadcasts and snapshots."""
+
+    def test_connect_receives_snapshot_with_seq(self, trebek, socket_client):
+        """Test that a connecting client gets a full snapshot with a sequence number."""
+        client = socket_client()
+
+        client.emit('request_game_state')
+        snapshot = received(client, 'game_update')[0]
+
+        assert 'teams' in snapshot
+        assert snapshot['seq'] == only_game().channels.snapshot('spectator')['seq']
+
+    def test_create_team_broadcasts_patch(self, trebek, socket_client):
+        """Test that other clients receive a small patch when a team is created."""
+        watcher = socket_client()
+        watcher.emit('request_game_state')
+        seq = received(watcher, 'game_update')[0]['seq']
+
+        from app import events
+        trebek.emit('create_team', {'name': 'Alpha'})
+        events.timers.run_due(now=float('inf'))
+
+        patches = received(watcher, 'game_patch')
+        assert len(patches) == 1
+        assert patches[0]['seq'] == seq + 1
+        assert patches[0]['ops'][0][0] == 'team_add'
+        assert patches[0]['ops'][0][1]['name'] == 'Alpha'
+
+    def test_patches_rebuild_client_state(self, trebek, socket_client):
+        """Test that applying every patch reproduces the server state."""
+        from app.state_sync import apply_patch
+
+        watcher = socket_client()
+        watcher.emit('request_game_state')
+        state = received(watcher, 'game_update')[0]
+
+        trebek.emit('create_team', {'name': 'Alpha'})
+        trebek.emit('create_team', {'name': 'Beta'})
+        player = socket_client()
+        player.emit('join_game', {'name': 'Alice', 'team_id': 'team_1'})
+
+        for patch in received(watcher, 'game_patch'):
+            assert patch['seq'] == state['seq'] + 1
+            apply_patch(state, patch['ops'])
+            state['seq'] = patch['seq']
+
+        assert state == only_game().channels.snapshot('spectator')
+
+
+@pytest.fixture
+def round_in_progress(trebek, socket_client):
+    """Round 1 started with one team, a joined player, a display and a selected question."""
+    trebek.emit('create_team', {'name': 'Alpha'})
+    player = socket_client()
+    player.emit('join_game', {'name': 'Alice', 'team_id': 'team_1'})
+    display = socket_client()
+    display.emit('register_display')
+    trebek.emit('start_round', {'round': 1})
+    for client in (trebek, player, display):
+        client.get_received()
+
+    trebek.emit('select_question', {'category': 'Geography', 'value': 100})
+    return trebek, player, display
+
+
+class TestRoleProjections:
+    """Tests for role-scoped state and board payloads."""
+
+    def test_trebek_sees_answer(self, round_in_progress):
+        """Test that the host receives the answer text."""
+        trebek, player, display = round_in_progress
+
+        ops = [op for patch in received(trebek, 'game_patch') for op in patch['ops']]
+
+        question = next(op[2] for op in ops if op[:2] == ['set', 'current_question'])
+        assert question['answer'] == 'Paris'
+
+    def test_player_does_not_see_answer(self, round_in_progress):
+        """Test that players only get the category and value."""
+        trebek, player, display = round_in_progress
+
+        ops = [op for patch in received(player, 'game_patch') for op in patch['ops']]
+
+        question = next(op[2] for op in ops if op[:2] == ['set', 'current_question'])
+        assert question == {'category': 'Geography', 'value': 100}
+
+    def test_display_sees_question_not_answer(self, round_in_progress):
+        """Test that the display gets the question text but not the answer."""
+        trebek, player, display = round_in_progress
+
+        display.emit('request_game_state')
+        question = received(display, 'game_update')[-1]['current_question']
+
+        assert question['question'] == 'Capital of France?'
+        assert 'answer' not in question
+
+    def test_player_does_not_receive_board(self, round_in_progress):
+        """Test that board updates are not sent to players."""
+        trebek, player, display = round_in_progress
+
+        trebek.emit('skip_question')
+
+        assert [m for m in player.get_received() if m['name'] in ('board_update', 'cell_used')] == []
+
+    def test_display_board_has_no_text(self, round_in_progress):
+        """Test that the display board only carries values and used flags."""
+        trebek, player, display = round_in_progress
+
+        trebek.emit('skip_question')
+        display.emit('request_board')
+        trebek.emit('request_board')
+
+        board = received(display, 'board_update')[-1]['board']
+        assert board['Geography'][0] == {'value': 100, 'used': True}
+        assert 'answer' in received(trebek, 'board_update')[-1]['board']['Geography'][0]
+
+    def test_spectator_sees_teams_only(self, round_in_progress, socket_client):
+        """Test that clients that have not joined only get phase and teams."""
+        spectator = socket_client()
+
+        spectator.emit('request_game_state')
+        snapshot = received(spectator, 'game_update')[-1]
+
+        assert set(snapshot) == {'phase', 'teams', 'seq'}
+
+
+class TestBuzzDelay:
+    """Tests for the buzz delay timer in the select/skip handlers."""
+
+    def test_timer_opens_buzzing(self, trebek):
+        """Test that buzzing opens when the delay expires."""
+        from app import events
+        trebek.emit('start_round', {'round': 1})
+        trebek.emit('select_question', {'category': 'Geography', 'value': 100})
+
+        events.timers.run_due(now=float('inf'))
+
+        assert only_game().manager.state.question_state.value == 'buzzing_open'
+
+    def test_skip_cancels_timer(self, trebek):
+        """Test that skipping inside the delay window does not reopen buzzing."""
+        from app import events
+        trebek.emit('start_round', {'round': 1})
+        trebek.emit('select_question', {'category': 'Geography', 'value': 100})
+        trebek.emit('skip_question')
+
+        assert not events.timers.pending(only_game().timer_name('buzz_delay'))
+        events.timers.run_due(now=float('inf'))
+        assert only_game().manager.state.question_state.value == 'board_active'
+
+    def test_reselect_replaces_timer(self, trebek):
+        """Test that only the latest question's timer is pending."""
+        from app import events
+        trebek.emit('start_round', {'round': 1})
+        trebek.emit('select_question', {'category': 'Geography', 'value': 100})
+        trebek.emit('skip_question')
+        trebek.emit('select_question', {'category': 'Science', 'value': 100})
+
+        assert events.timers.run_due(now=float('inf')) == 1
+        assert only_game().manager.state.current_question.category == 'Science'
+        assert only_game().manager.state.question_state.value == 'buzzing_open'
+
+
+class TestBroadcastBatching:
+    """Tests for state broadcasts batched per tick."""
+
+    def test_join_burst_sends_one_patch(self, trebek, socket_client):
+        """Test that 30 players joining within a tick reach watchers as one patch."""
+        from app import events
+        trebek.emit('create_team', {'name': 'Alpha'})
+        events.timers.run_due(now=float('inf'))
+        watcher = socket_client()
+        watcher.get_received()
+
+        for i in range(30):
+            socket_client().emit('join_game', {'name': f'Player {i}', 'team_id': 'team_1'})
+        assert received(watcher, 'game_patch') == []
+        events.timers.run_due(now=float('inf'))
+
+        patches = received(watcher, 'game_patch')
+        assert len(patches) == 1
+        assert len(patches[0]['ops'][0][2]['players']) == 30
+
+    def test_joiner_snapshot_then_patch(self, trebek, socket_client):
+        """Test that a joining player's snapshot is followed by the patch that adds them."""
+        from app import events
+        from app.state_sync import apply_patch
+        trebek.emit('create_team', {'name': 'Alpha'})
+        player = socket_client()
+        player.emit('join_game', {'name': 'Alice', 'team_id': 'team_1'})
+        state = received(player, 'game_update')[-1]
+        events.timers.run_due(now=float('inf'))
+
+        (patch,) = received(player, 'game_patch')
+        assert patch['seq'] == state['seq'] + 1
+        apply_patch(state, patch['ops'])
+        assert [p['name'] for p in state['teams'][0]['players']] == ['Alice']
+
+    def test_first_buzz_bypasses_tick(self, trebek, socket_client):
+        """Test that the first buzz goes out at once and later buzzes wait for the tick."""
+        from app import events
+        trebek.emit('create_team', {'name': 'Alpha'})
+        trebek.emit('create_team', {'name': 'Beta'})
+        alice, bob = socket_client(), socket_client()
+        alice.emit('join_game', {'name': 'Alice', 'team_id': 'team_1'})
+        bob.emit('join_game', {'name': 'Bob', 'team_id': 'team_2'})
+        trebek.emit('start_round', {'round': 1})
+        trebek.emit('select_question', {'category': 'Geography', 'value': 100})
+        events.timers.run_due(now=float('inf'))
+        trebek.get_received()
+
+        alice.emit('buzz', {'player_id': 'player_1'})
+        assert received(trebek, 'game_patch')[-1]['ops'][-1] == ['append', 'buzz_queue', [
+            {'player_id': 'player_1', 'player_name': 'Alice', 'team_id': 'team_1', 'team_name': 'Alpha'}]]
+
+        bob.emit('buzz', {'player_id': 'player_2'})
+        assert received(trebek, 'game_patch') == []
+        events.timers.run_due(now=float('inf'))
+        assert len(received(trebek, 'game_patch')) == 1
+
+    def test_zero_tick_sends_immediately(self, trebek, socket_client, monkeypatch):
+        """Test that BROADCAST_TICK = 0 turns batching off."""
+        from config import Config
+        monkeypatch.setattr(Config, 'BROADCAST_TICK', 0)
+        watcher = socket_client()
+        watcher.get_received()
+
+        trebek.emit('create_team', {'name': 'Alpha'})
+
+        assert len(received(watcher, 'game_patch')) == 1
+
+
+class TestDisconnects:
+    """Tests for player disconnects."""
+
+    def test_disconnect_storm_coalesced(self, trebek, socket_client):
+        """Test that many players dropping at once produce a single game_patch."""
+        from app import events
+        trebek.emit('create_team', {'name': 'Alpha'})
+        players = []
+        for i in range(20):
+            client = socket_client()
+            client.emit('join_game', {'name': f'Player {i}', 'team_id': 'team_1'})
+            players.append(client)
+        trebek.get_received()
+
+        for client in players:
+            client.disconnect()
+        assert received(trebek, 'game_patch') == []
+        events.timers.run_due(now=float('inf'))
+
+        patches = received(trebek, 'game_patch')
+        assert len(patches) == 1
+        assert all(not p.connected for p in only_game().manager.state.players.values())
+
+    def test_player_role_from_session_index(self, trebek, socket_client):
+        """Test that a joined player's role comes from the game's session index."""
+        trebek.emit('create_team', {'name': 'Alpha'})
+        client = socket_client()
+        client.emit('join_game', {'name': 'Alice', 'team_id': 'team_1'})
+        sid = only_game().manager.state.players['player_1'].session_id
+
+        assert only_game().manager.session_role(sid) == 'player'
+
+
+class TestHostReconnect:
+    """Tests for the host registering again mid-game."""
+
+    def test_used_questions_survive_reconnect(self, trebek, socket_client):
+        """Test that a host rejoining the game does not reset the board."""
+        trebek.emit('start_round', {'round': 1})
+        trebek.emit('select_question', {'category': 'Science', 'value': 100})
+        trebek.emit('skip_question')
+        code = only_game().code
+        trebek.disconnect()
+
+        host = socket_client()
+        host.emit('register_trebek', {'game': code})
+
+        assert received(host, 'registration_success')[0]['game'] == code
+        assert only_game().manager.get_board_state(1)['Science'][0]['used'] is True
+        assert only_game().manager.question_index.remaining(1) == 3
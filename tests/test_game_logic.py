@@ -28,8 +28,7 @@ def test_adjudicate_correct_clears_question():
 
     # Simulate buzz from player 1
     gm.state.buzz_queue = [
-        BuzzEntry(player_id=p1.id, player_name=p1.name, team_id=p1.team_id, team_name=gm.state.teams[p1.team_id].name,
-                  timestamp=0)
+        BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)
     ]
 
     next_player, score_change = gm.adjudicate_answer(True)
@@ -48,8 +47,7 @@ def test_adjudicate_wrong_no_queued_buzzers_keeps_question_open():
 
     # Simulate buzz from player 1, but no other buzzers
     gm.state.buzz_queue = [
-        BuzzEntry(player_id=p1.id, player_name=p1.name, team_id=p1.team_id, team_name=gm.state.teams[p1.team_id].name,
-                  timestamp=0)
+        BuzzEntry(player_id=p1.id, team_id=p1.team_id, timestamp=0)
     ]
 
     # Ensure team list has at least two teams so remaining_teams will be non-empty
@@ -0,0 +1,169 @@
+"""
+Tests for the command journal and crash recovery (app/journal.py).
+"""
+import os
+
+from app.game_logic import GameManager
+from app.journal import Journal, read_journal, replay
+from app.registry import GameRegistry
+from conftest import comparable, play_some
+
+
+class TestJournal:
+    """Tests for Journal writes."""
+
+    def test_records_written_on_commit(self, tmp_path):
+        """Test that appended records reach the file with the next commit."""
+        path = str(tmp_path / 'ABCD.log')
+        journal = Journal(path)
+
+        journal.append({'seq': 1, 'op': 'create_team', 'args': ['Alpha']})
+        assert os.path.getsize(path) == 0
+
+        assert journal.commit() == 1
+        assert list(read_journal(path)) == [{'seq': 1, 'op': 'create_team', 'args': ['Alpha']}]
+        journal.close()
+
+    def test_group_commit_fsyncs_once(self, tmp_path, monkeypatch):
+        """Test that a burst of records costs a single fsync."""
+        fsyncs = []
+        monkeypatch.setattr(os, 'fsync', fsyncs.append)
+        journal = Journal(str(tmp_path / 'ABCD.log'))
+
+        for i in range(500):
+            journal.append({'seq': i + 1, 'op': 'buzz_in', 'args': [f'player_{i}']})
+        journal.commit()
+
+        assert len(fsyncs) == 1
+        journal.close()
+
+    def test_background_committer(self, tmp_path):
+        """Test that one background task commits and exits once idle."""
+        tasks = []
+        journal = Journal(str(tmp_path / 'ABCD.log'), start_background_task=tasks.append,
+                          sleep=lambda seconds: None)
+
+        journal.append({'seq': 1, 'op': 'skip_question', 'args': []})
+        journal.append({'seq': 2, 'op': 'skip_question', 'args': []})
+        assert len(tasks) == 1
+
+        tasks[0]()
+        assert len(list(read_journal(journal.path))) == 2
+
+        journal.append({'seq': 3, 'op': 'skip_question', 'args': []})
+        assert len(tasks) == 2
+        journal.close()
+
+    def test_partial_last_record_ignored(self, tmp_path):
+        """Test that a record cut short by a crash is skipped and overwritten."""
+        path = tmp_path / 'ABCD.log'
+        path.write_text('{"seq":1,"op":"create_team","args":["Alpha"]}\n{"seq":2,"op":"cre')
+
+        assert [r['seq'] for r in read_journal(str(path))] == [1]
+
+        journal = Journal(str(path))
+        journal.append({'seq': 2, 'op': 'create_team', 'args': ['Beta']})
+        journal.close()
+        assert [r['args'] for r in read_journal(str(path))] == [['Alpha'], ['Beta']]
+
+
+class TestGameManagerJournaling:
+    """Tests for commands recorded by GameManager."""
+
+    def test_only_applied_commands_recorded(self, tmp_path, mock_questions_file):
+        """Test that rejected commands are not journaled."""
+        gm = GameManager()
+        gm.journal = Journal(str(tmp_path / 'ABCD.log'))
+        team = gm.create_team('Alpha')
+        gm.add_player('Ghost', 'team_99', 's0')
+        gm.buzz_in('player_1')  # buzzing not open
+        gm.add_player('Alice', team.id, 's1')
+        gm.journal.close()
+
+        records = list(read_journal(gm.journal.path))
+        assert [r['op'] for r in records] == ['create_team', 'add_player']
+        assert [r['seq'] for r in records] == [1, 2]
+        assert gm.journal_seq == 2
+
+    def test_replay_rebuilds_state(self, tmp_path, mock_questions_file):
+        """Test that replaying the journal reproduces scores, roster, used questions and the buzz queue."""
+        gm = GameManager()
+        gm.journal = Journal(str(tmp_path / 'ABCD.log'))
+        play_some(gm)
+        gm.journal.close()
+
+        rebuilt = GameManager()
+        applied = replay(rebuilt, read_journal(gm.journal.path))
+
+        assert applied == gm.journal_seq
+        assert comparable(rebuilt) == comparable(gm)
+        assert rebuilt.journal_seq == gm.journal_seq
+
+    def test_replay_leaves_sessions_disconnected(self, tmp_path, mock_questions_file):
+        """Test that recovered players wait for their clients to reconnect."""
+        gm = GameManager()
+        gm.journal = Journal(str(tmp_path / 'ABCD.log'))
+        play_some(gm)
+        gm.set_trebek('host-sid')
+        gm.journal.close()
+
+        rebuilt = GameManager()
+        replay(rebuilt, read_journal(gm.journal.path))
+
+        assert all(not p.connected for p in rebuilt.state.players.values())
+        assert rebuilt.state.trebek_session_id is None
+        token = gm.state.players['player_1'].token
+        assert rebuilt.reconnect_player('player_1', 'team_1', 'new-sid', token) is not None
+
+    def test_replay_skips_records_already_applied(self, tmp_path, mock_questions_file):
+        """Test that records at or below journal_seq are not applied twice."""
+        gm = GameManager()
+        gm.journal = Journal(str(tmp_path / 'ABCD.log'))
+        gm.create_team('Alpha')
+        gm.create_team('Beta')
+        gm.journal.close()
+
+        rebuilt = GameManager()
+        rebuilt.create_team('Alpha')
+        rebuilt.journal_seq = 1
+
+        assert replay(rebuilt, read_journal(gm.journal.path)) == 1
+        assert [t.name for t in rebuilt.state.teams.values()] == ['Alpha', 'Beta']
+
+
+class TestRecovery:
+    """Tests for rebuilding hosted games on startup."""
+
+    def test_registry_recovers_games(self, tmp_path, mock_questions_file):
+        """Test that a new registry rebuilds every journaled game under its code."""
+        registry = GameRegistry(journal_dir=str(tmp_path))
+        first = registry.host()
+        second = registry.host()
+        play_some(first.manager)
+        second.manager.create_team('Solo')
+        registry.close()
+
+        restarted = GameRegistry(journal_dir=str(tmp_path))
+
+        assert restarted.recover() == 2
+        assert comparable(restarted.get(first.code).manager) == comparable(first.manager)
+        assert [t.name for t in restarted.get(second.code).manager.state.teams.values()] == ['Solo']
+
+    def test_recovered_game_keeps_journaling(self, tmp_path, mock_questions_file):
+        """Test that commands after recovery continue the same journal."""
+        registry = GameRegistry(journal_dir=str(tmp_path))
+        game = registry.host()
+        game.manager.create_team('Alpha')
+        registry.close()
+
+        restarted = GameRegistry(journal_dir=str(tmp_path))
+        restarted.recover()
+        restarted.get(game.code).manager.create_team('Beta')
+        restarted.close()
+
+        records = list(read_journal(registry.journal_path(game.code)))
+        assert [(r['seq'], r['args']) for r in records] == [(1, ['Alpha']), (2, ['Beta'])]
+
+    def test_recover_without_journal_dir(self):
+        """Test that recovery is a no-op when journaling is off."""
+        assert GameRegistry().recover() == 0
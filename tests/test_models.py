@@ -0,0 +1,135 @@
+"""
+Tests for the compact game models (app/models.py) and the used-flag bitset.
+"""
+import pytest
+
+from app.game_logic import GameManager
+from app.models import BuzzEntry, Player, Question, Team
+from app.question_index import QuestionIndex, bitmap_flags
+
+
+def make_questions(count=10):
+    return [Question(round=1, category=f'Category {i % 3}', value=100 * (1 + i // 3),
+                     question=f'Q{i}', answer=f'A{i}') for i in range(count)]
+
+
+class TestSlots:
+    """Tests for slotted models."""
+
+    @pytest.mark.parametrize('obj', [
+        Player('player_1', 'Alice', 'team_1', 's1'),
+        Team('team_1', 'Alpha'),
+        Question(1, 'Geography', 100, 'Q', 'A'),
+        BuzzEntry('player_1', 'team_1', 0),
+    ])
+    def test_no_instance_dict(self, obj):
+        """Test that model instances carry no per-object __dict__."""
+        assert not hasattr(obj, '__dict__')
+        with pytest.raises(AttributeError):
+            obj.unexpected = True
+
+    def test_categories_interned(self):
+        """Test that questions built from separate strings share one category string."""
+        a = Question(1, ''.join(['Geo', 'graphy']), 100, 'Q', 'A')
+        b = Question(1, ''.join(['Geog', 'raphy']), 200, 'Q', 'A')
+
+        assert a.category is b.category
+
+    def test_question_equality(self):
+        """Test that questions still compare by value, like the dataclass they replace."""
+        assert Question(1, 'Art', 100, 'Q', 'A') == Question(1, 'Art', 100, 'Q', 'A')
+        assert Question(1, 'Art', 100, 'Q', 'A') != Question(1, 'Art', 100, 'Q', 'A', used=True)
+
+
+class TestUsedBitset:
+    """Tests for used flags kept in the QuestionIndex bitset."""
+
+    def test_standalone_question_keeps_flag(self):
+        """Test that a question outside any index stores `used` itself."""
+        q = Question(1, 'Art', 100, 'Q', 'A')
+        q.used = True
+
+        assert q.used is True
+
+    def test_index_takes_over_flags(self):
+        """Test that binding to an index carries existing flags into the bitset."""
+        questions = make_questions()
+        questions[4].used = True
+        index = QuestionIndex(questions)
+
+        assert [q.used for q in questions] == [i == 4 for i in range(10)]
+        assert list(bitmap_flags(index.used_bitmap()))[:10] == [i == 4 for i in range(10)]
+
+    def test_setting_used_updates_remaining(self):
+        """Test that flipping a flag updates the index's remaining count once."""
+        questions = make_questions()
+        index = QuestionIndex(questions)
+        questions[0].used = True
+        questions[0].used = True
+
+        assert index.remaining(1) == 9
+        assert index.find(1, questions[0].category, questions[0].value) is None
+
+        questions[0].used = False
+        assert index.remaining(1) == 10
+
+    def test_load_used(self):
+        """Test that a saved bitmap restores every flag and the remaining count."""
+        source = make_questions()
+        source_index = QuestionIndex(source)
+        for q in source[::3]:
+            q.used = True
+        questions = make_questions()
+        index = QuestionIndex(questions)
+
+        index.load_used(source_index.used_bitmap())
+
+        assert [q.used for q in questions] == [q.used for q in source]
+        assert index.remaining(1) == 6
+
+    def test_load_used_wrong_length(self):
+        """Test that a bitmap for a different bank size is rejected."""
+        index = QuestionIndex(make_questions())
+
+        with pytest.raises(ValueError):
+            index.load_used(b'\x00' * 5)
+
+
+class TestBuzzEntry:
+    """Tests for ID-only buzz entries."""
+
+    def test_monotonic_integer_timestamp(self, simple_game):
+        """Test that buzzes are stamped with increasing integer nanoseconds."""
+        gm, t1, t2, p1, p2, q = simple_game
+        gm.buzz_in(p1.id)
+        gm.buzz_in(p2.id)
+
+        first, second = list(gm.state.buzz_queue)
+        assert isinstance(first.timestamp, int)
+        assert first.timestamp <= second.timestamp
+
+    def test_summary_resolves_names(self, simple_game):
+        """Test that the summary looks up player and team names for queued buzzes."""
+        gm, t1, t2, p1, p2, q = simple_game
+        gm.buzz_in(p1.id)
+        gm.buzz_in(p2.id)
+
+        queue = gm.get_game_summary()['buzz_queue']
+
+        assert [(e['player_name'], e['team_name']) for e in queue] == [('Alice', 'Alpha'), ('Bob', 'Beta')]
+
+    def test_summary_follows_renames(self, simple_game):
+        """Test that a team renamed after buzzing shows its new name."""
+        gm, t1, t2, p1, p2, q = simple_game
+        gm.buzz_in(p1.id)
+        t1.name = 'Omega'
+        gm.mark_dirty()
+
+        assert gm.get_game_summary()['buzz_queue'][0]['team_name'] == 'Omega'
+
+    def test_names_of_unknown_ids(self):
+        """Test that names of unknown players and teams are None."""
+        gm = GameManager()
+
+        assert gm.player_name('player_99') is None
+        assert gm.team_name('team_99') is None
@@ -0,0 +1,210 @@
+"""
+Byte budgets for the state payloads of a full game, the payload size
+histogram (app/serialization.py) and thresholded WebSocket compression
+(app/compression.py).
+
+The budgets are for a 12-team, 60-question game (30 per round) with five
+players per team, every team in the buzz queue and clue text as long as a
+real clue. If a change to the summary or board pushes a payload over its
+budget, trim the payload or raise the budget knowingly.
+"""
+import zlib
+
+import pytest
+from socketio import packet
+
+from app import serialization
+from app.game_logic import GameManager
+from app.models import Question
+from app.question_index import RoundBoard
+from app.serialization import MeasuredPacket, PayloadSizes, PreEncoded, wire_size
+from app.state_sync import project_summary
+from conftest import received
+
+GAME_UPDATE_BUDGET = 7 * 1024
+BOARD_UPDATE_BUDGET = 5 * 1024 + 512
+# What the host's snapshot costs on a permessage-deflate WebSocket
+GAME_UPDATE_DEFLATED_BUDGET = 1536
+
+ROLES = ('trebek', 'display', 'player', 'spectator')
+
+
+@pytest.fixture
+def full_game(flask_app):
+    """12 teams of 5, 60 questions, round 1 on a selected question with every team buzzed in.
+
+    Uses the app so packets are encoded with its serializer.
+    """
+    gm = GameManager()
+    for t in range(12):
+        team = gm.create_team(f'Team Number {t + 1}')
+        for p in range(5):
+            gm.add_player(f'Player {t + 1}-{p + 1}', team.id, f'sid-{t}-{p}')
+    gm.state.questions = [
+        Question(round_num, f'Category Number {c + 1}', value * round_num,
+                 f'This clue in category {c + 1} for ${value * round_num} is about as long as a real clue is?',
+                 f'What is the answer to {c + 1}-{value}?')
+        for round_num in (1, 2) for c in range(6) for value in (100, 200, 300, 400, 500)
+    ]
+    gm.start_round(1)
+    first = gm.state.questions[0]
+    gm.select_question(first.category, first.value)
+    gm.enable_buzzing(first)
+    for team in gm.state.teams.values():
+        gm.buzz_in(team.player_ids[0])
+    return gm
+
+
+def packet_bytes(event, payload):
+    """Size on the wire of the Socket.IO packet carrying `payload`."""
+    return wire_size(MeasuredPacket(packet.EVENT, data=[event, PreEncoded(payload)]).encode())
+
+
+def deflated_bytes(data: bytes) -> int:
+    """Size of `data` as one permessage-deflate message (raw deflate, sync flush, trailer dropped)."""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+
+
+class TestPayloadBudgets:
+    """Tests that full-game payloads stay within their byte budgets."""
+
+    def test_game_fixture_is_full_size(self, full_game):
+        """Test that the budget game really has 12 teams, 60 questions and a 12-deep buzz queue."""
+        assert len(full_game.state.teams) == 12
+        assert len(full_game.state.questions) == 60
+        assert len(full_game.state.buzz_queue) == 12
+
+    @pytest.mark.parametrize('role', ROLES)
+    def test_game_update_within_budget(self, full_game, role):
+        """Test that every role's game_update snapshot fits the budget."""
+        payload = dict(project_summary(full_game.get_game_summary(), role), seq=1)
+
+        assert packet_bytes('game_update', payload) <= GAME_UPDATE_BUDGET
+
+    @pytest.mark.parametrize('round_num', [1, 2])
+    @pytest.mark.parametrize('role', ['trebek', 'display'])
+    def test_board_update_within_budget(self, full_game, round_num, role):
+        """Test that each round's board_update fits the budget, with and without clue text."""
+        board = RoundBoard(round_num, full_game.question_index.round_view(round_num))
+
+        assert packet_bytes('board_update', board.payload(role).data) <= BOARD_UPDATE_BUDGET
+
+    def test_game_update_deflated_within_budget(self, full_game):
+        """Test that the host's snapshot compresses to within its WebSocket budget."""
+        payload = PreEncoded(dict(project_summary(full_game.get_game_summary(), 'trebek'), seq=1))
+
+        assert deflated_bytes(payload.text.encode('utf-8')) <= GAME_UPDATE_DEFLATED_BUDGET
+
+
+class TestPayloadHistogram:
+    """Tests for the per-event payload size histogram."""
+
+    def test_buckets_by_power_of_two(self):
+        """Test that sizes are counted in power-of-two buckets, with a 64-byte floor."""
+        sizes = PayloadSizes()
+        for size in (10, 64, 65, 1000, 1024, 1025):
+            sizes.record('game_update', size)
+
+        stats = sizes.snapshot()['game_update']
+        assert stats['count'] == 6
+        assert stats['bytes'] == 10 + 64 + 65 + 1000 + 1024 + 1025
+        assert stats['max'] == 1025
+        assert stats['buckets'] == {'<=64': 2, '<=128': 1, '<=1024': 2, '<=2048': 1}
+
+    def test_emits_are_recorded(self, socket_client, monkeypatch):
+        """Test that events sent through the server land in the histogram under their names."""
+        sizes = PayloadSizes()
+        monkeypatch.setattr(serialization, 'payload_sizes', sizes)
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        code = received(trebek, 'registration_success')[0]['game']
+        trebek.emit('start_round', {'round': 1})
+
+        stats = sizes.snapshot()
+        assert {'registration_success', 'game_update', 'board_update'} <= set(stats)
+        assert stats['board_update']['max'] > len(code)
+
+    def test_metrics_route(self, flask_app, monkeypatch):
+        """Test that /metrics/payloads serves the histogram as JSON."""
+        sizes = PayloadSizes()
+        sizes.record('buzz_result', 40)
+        monkeypatch.setattr(serialization, 'payload_sizes', sizes)
+
+        response = flask_app.test_client().get('/metrics/payloads')
+
+        assert response.get_json() == {'buzz_result': {'count': 1, 'bytes': 40, 'max': 40,
+                                                       'buckets': {'<=64': 1}}}
+
+
+class TestWebSocketCompression:
+    """Tests for permessage-deflate with a size threshold."""
+
+    @pytest.fixture
+    def compression(self):
+        pytest.importorskip('eventlet')
+        from app import compression
+        return compression
+
+    def test_small_messages_sent_plain(self, compression):
+        """Test that messages under the threshold are sent without the compressed bit."""
+        ws = compression.ThresholdWebSocket(None, {}, 13, extensions={'permessage-deflate': {}})
+        ws.threshold = 100
+
+        small = ws._pack_message('42["buzz_result",{}]')
+        large = ws._pack_message('42["game_update",' + '{"a":1},' * 50 + '{}]')
+
+        assert small[0] & 0x40 == 0
+        assert large[0] & 0x40 == 0x40
+
+    def test_threshold_counts_utf8_bytes(self, compression):
+        """Test that the threshold compares the encoded size, not the number of characters."""
+        ws = compression.ThresholdWebSocket(None, {}, 13, extensions={'permessage-deflate': {}})
+        ws.threshold = 100
+
+        message = '42["buzz_result",{"team":"' + 'é' * 60 + '"}]'
+
+        assert len(message) < 100 <= len(message.encode('utf-8'))
+        assert ws._pack_message(message)[0] & 0x40 == 0x40
+
+    @pytest.mark.parametrize('cls,method,params', [
+        ('RFC6455WebSocket', '_pack_message', ['self', 'message', 'masked', 'continuation', 'final', 'control_code']),
+        ('RFC6455WebSocket', '_get_permessage_deflate_enc', ['self']),
+        ('WebSocketWSGI', '_negotiate_permessage_deflate', ['self', 'extensions']),
+        ('WebSocketWSGI', '_handle_hybi_request', ['self', 'environ']),
+    ])
+    def test_overridden_eventlet_methods_exist(self, compression, cls, method, params):
+        """Test that the private eventlet methods the compression classes override still exist with the same parameters."""
+        import inspect
+        base = getattr(compression, cls)
+
+        assert hasattr(base, method)
+        assert list(inspect.signature(getattr(base, method)).parameters) == params
+
+    def test_install_sets_threshold(self, compression):
+        """Test that installing on an eventlet server negotiates deflate and carries the threshold."""
+        import socketio
+        server = socketio.Server(async_mode='eventlet')
+
+        assert compression.install(server, True, 512) is True
+        handler = server.eio._async['websocket'](lambda ws: None, server.eio)
+        assert handler.threshold == 512
+        assert handler._negotiate_permessage_deflate({'permessage-deflate': [{}]}) is not None
+
+    def test_install_disabled(self, compression):
+        """Test that with compression off the server declines permessage-deflate."""
+        import socketio
+        server = socketio.Server(async_mode='eventlet')
+
+        compression.install(server, False, 512)
+        handler = server.eio._async['websocket'](lambda ws: None, server.eio)
+        assert handler._negotiate_permessage_deflate({'permessage-deflate': [{}]}) is None
+
+    def test_install_needs_eventlet(self, compression):
+        """Test that other async modes are left alone."""
+        import socketio
+        server = socketio.Server(async_mode='threading')
+        original = server.eio._async['websocket']
+
+        assert compression.install(server, True, 512) is False
+        assert server.eio._async['websocket'] is original
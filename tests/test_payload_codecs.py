@@ -0,0 +1,134 @@
+"""
+Tests for MessagePack state payloads and their JSON fallback (app/serialization.py, app/events.py).
+"""
+import pytest
+
+from app import serialization
+from app.serialization import PreEncoded
+from conftest import received
+
+
+@pytest.fixture
+def msgpack_codec(monkeypatch):
+    """Server configured for MessagePack payloads (skips without the msgpack package)."""
+    msgpack = pytest.importorskip('msgpack')
+    from config import Config
+    monkeypatch.setattr(Config, 'SOCKETIO_CODEC', 'msgpack')
+    return msgpack
+
+
+def host_round(socket_client):
+    """A host with one team and round 1 started; returns the host client and the game code."""
+    trebek = socket_client()
+    trebek.emit('register_trebek')
+    code = received(trebek, 'registration_success')[0]['game']
+    trebek.emit('create_team', {'name': 'Alpha'})
+    trebek.emit('start_round', {'round': 1})
+    return trebek, code
+
+
+class TestJsonFallback:
+    """Tests for clients that get JSON."""
+
+    def test_json_by_default(self, socket_client):
+        """Test that asking for MessagePack without the server offering it gets JSON."""
+        trebek, code = host_round(socket_client)
+        display = socket_client(query_string=f'game={code}&codec=msgpack')
+        display.emit('register_display', {'game': code})
+
+        messages = display.get_received()
+        assert all(not isinstance(m['args'][0], bytes) for m in messages if m['args'])
+        assert [m['args'][0]['round'] for m in messages if m['name'] == 'board_update'] == [1]
+
+    def test_json_without_msgpack_package(self, socket_client, monkeypatch):
+        """Test that SOCKETIO_CODEC=msgpack falls back to JSON when msgpack is not installed."""
+        from config import Config
+        monkeypatch.setattr(Config, 'SOCKETIO_CODEC', 'msgpack')
+        monkeypatch.setattr(serialization, 'msgpack', None)
+
+        assert serialization.msgpack_enabled() is False
+        trebek, code = host_round(socket_client)
+        assert isinstance(received(trebek, 'board_update')[0], dict)
+
+    def test_pages_offer_json(self, flask_app):
+        """Test that pages do not load the MessagePack decoder unless the server offers it."""
+        page = flask_app.test_client().get('/display').get_data(as_text=True)
+
+        assert 'msgpack.min.js' not in page
+        assert 'data-codec="json"' in page
+
+
+class TestMsgpackPayloads:
+    """Tests for clients that opt in to MessagePack."""
+
+    def test_pages_offer_msgpack(self, flask_app, monkeypatch):
+        """Test that pages load the decoder when the server offers MessagePack."""
+        monkeypatch.setattr(serialization, 'msgpack_enabled', lambda: True)
+
+        for path in ('/', '/join', '/display'):
+            page = flask_app.test_client().get(path).get_data(as_text=True)
+            assert 'msgpack.min.js' in page
+            assert 'data-codec="msgpack"' in page
+
+    def test_opted_in_client_gets_binary(self, msgpack_codec, socket_client):
+        """Test that a client connected with ?codec=msgpack gets the same state as MessagePack."""
+        trebek, code = host_round(socket_client)
+        json_display = socket_client(query_string=f'game={code}')
+        json_display.emit('register_display', {'game': code})
+        packed_display = socket_client(query_string=f'game={code}&codec=msgpack')
+        packed_display.emit('register_display', {'game': code})
+
+        json_state = received(json_display, 'game_update')[-1]
+        packed_state = received(packed_display, 'game_update')[-1]
+        assert isinstance(packed_state, bytes)
+        assert msgpack_codec.unpackb(packed_state) == json_state
+
+    def test_broadcasts_reach_both_encodings(self, msgpack_codec, socket_client):
+        """Test that a patch goes out once per encoding, each to its own clients."""
+        from app import events
+        trebek, code = host_round(socket_client)
+        json_display = socket_client(query_string=f'game={code}')
+        json_display.emit('register_display', {'game': code})
+        packed_display = socket_client(query_string=f'game={code}&codec=msgpack')
+        packed_display.emit('register_display', {'game': code})
+        json_display.get_received()
+        packed_display.get_received()
+
+        trebek.emit('select_question', {'category': 'Science', 'value': 100})
+        events.timers.run_due(now=float('inf'))
+
+        json_patches = received(json_display, 'game_patch')
+        packed_patches = [msgpack_codec.unpackb(p) for p in received(packed_display, 'game_patch')]
+        assert packed_patches == json_patches
+        assert len(json_patches) == 2
+
+    def test_score_update_reaches_both_encodings(self, msgpack_codec, socket_client):
+        """Test that score updates reach MessagePack displays as well as JSON ones."""
+        from app import events
+        trebek, code = host_round(socket_client)
+        json_display = socket_client(query_string=f'game={code}')
+        json_display.emit('register_display', {'game': code})
+        packed_display = socket_client(query_string=f'game={code}&codec=msgpack')
+        packed_display.emit('register_display', {'game': code})
+        player = socket_client(query_string=f'game={code}')
+        player.emit('join_game', {'name': 'Alice', 'team_id': 'team_1', 'game': code})
+        player_id = received(player, 'registration_success')[0]['player_id']
+        trebek.emit('select_question', {'category': 'Science', 'value': 100})
+        events.timers.run_due(now=float('inf'))
+        player.emit('buzz', {'player_id': player_id})
+        json_display.get_received()
+        packed_display.get_received()
+
+        trebek.emit('adjudicate', {'correct': True})
+
+        json_update = received(json_display, 'score_update')
+        packed_update = [msgpack_codec.unpackb(u) for u in received(packed_display, 'score_update')]
+        assert json_update == packed_update
+        assert json_update[0]['new_score'] == 100
+
+    def test_packed_payload_cached(self, msgpack_codec):
+        """Test that a PreEncoded payload is MessagePack-encoded once."""
+        payload = PreEncoded({'round': 1, 'board': {'Science': [{'value': 100, 'used': False}]}})
+
+        assert serialization.packb(payload) is serialization.packb(payload)
+        assert msgpack_codec.unpackb(payload.packed()) == payload.data
@@ -222,3 +222,107 @@ class TestPlayerRetrievalFromState:
         assert p1 in retrieved_players
         assert p2 in retrieved_players
 
+
+
+class TestPlayerSessions:
+    """Tests for player reconnection and disconnection."""
+
+    def test_reconnect_updates_session(self, game_manager):
+        """Test that reconnecting moves the player to the new session."""
+        team = game_manager.create_team('Alpha')
+        player = game_manager.add_player('Alice', team.id, 'old_sid')
+        player.connected = False
+
+        result = game_manager.reconnect_player(player.id, team.id, 'new_sid', player.token)
+
+        assert result is player
+        assert player.session_id == 'new_sid'
+        assert player.connected is True
+
+    def test_reconnect_wrong_team_fails(self, game_manager):
+        """Test that a team mismatch is rejected."""
+        team = game_manager.create_team('Alpha')
+        other = game_manager.create_team('Beta')
+        player = game_manager.add_player('Alice', team.id, 'old_sid')
+
+        assert game_manager.reconnect_player(player.id, other.id, 'new_sid', player.token) is None
+        assert player.session_id == 'old_sid'
+
+    def test_reconnect_unknown_player_fails(self, game_manager):
+        """Test that unknown player IDs are rejected."""
+        team = game_manager.create_team('Alpha')
+
+        assert game_manager.reconnect_player('player_99', team.id, 'sid', 'token') is None
+
+    def test_reconnect_wrong_token_fails(self, game_manager):
+        """Test that a player id without its token cannot take over the player."""
+        team = game_manager.create_team('Alpha')
+        player = game_manager.add_player('Alice', team.id, 'old_sid')
+
+        assert game_manager.reconnect_player(player.id, team.id, 'new_sid', 'guess') is None
+        assert game_manager.reconnect_player(player.id, team.id, 'new_sid', None) is None
+        assert player.session_id == 'old_sid'
+
+    def test_disconnect_session_marks_player(self, game_manager):
+        """Test that disconnecting a session marks its player disconnected."""
+        team = game_manager.create_team('Alpha')
+        player = game_manager.add_player('Alice', team.id, 'sid_1')
+
+        assert game_manager.disconnect_session('sid_1') is player
+        assert player.connected is False
+
+    def test_disconnect_unknown_session(self, game_manager):
+        """Test that sessions without a player are ignored."""
+        assert game_manager.disconnect_session('nobody') is None
+
+    def test_session_index_follows_reconnect(self, game_manager):
+        """Test that the session index moves to the new session on reconnect."""
+        team = game_manager.create_team('Alpha')
+        player = game_manager.add_player('Alice', team.id, 'old_sid')
+        game_manager.reconnect_player(player.id, team.id, 'new_sid', player.token)
+
+        assert game_manager.session_player('new_sid') is player
+        assert game_manager.session_player('old_sid') is None
+        assert game_manager.session_role('new_sid') == 'player'
+        assert game_manager.disconnect_session('old_sid') is None
+        assert player.connected is True
+
+    def test_disconnect_forgets_session(self, game_manager):
+        """Test that a disconnected session is dropped from the index."""
+        team = game_manager.create_team('Alpha')
+        game_manager.add_player('Alice', team.id, 'sid_1')
+        game_manager.set_session_role('sid_2', 'display')
+
+        game_manager.disconnect_session('sid_1')
+        game_manager.disconnect_session('sid_2')
+
+        assert game_manager.session_player('sid_1') is None
+        assert game_manager.session_role('sid_1') is None
+        assert game_manager.session_role('sid_2') is None
+
+    def test_trebek_role_moves_with_host(self, game_manager):
+        """Test that registering a new Trebek session drops the old one's role."""
+        game_manager.set_trebek('host_1')
+        game_manager.set_trebek('host_2')
+
+        assert game_manager.session_role('host_1') is None
+        assert game_manager.session_role('host_2') == 'trebek'
+
+    def test_disconnect_does_not_scan_players(self, game_manager):
+        """Test that disconnecting looks the session up instead of scanning every player."""
+        team = game_manager.create_team('Alpha')
+        for i in range(1000):
+            game_manager.add_player(f'Player {i}', team.id, f'sid_{i}')
+        game_manager.state.players = ScanCountingDict(game_manager.state.players)
+
+        assert game_manager.disconnect_session('sid_999').name == 'Player 999'
+        assert game_manager.state.players.scans == 0
+
+
+class ScanCountingDict(dict):
+    """Dict that counts iterations over its values."""
+    scans = 0
+
+    def values(self):
+        self.scans += 1
+        return super().values()
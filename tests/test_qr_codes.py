@@ -0,0 +1,187 @@
+"""
+Tests for cached join QR codes (app/qr.py) and the /qr, /qr.png and /qr.svg routes.
+"""
+import base64
+
+import pytest
+
+from app.qr import QRCodes
+from app.registry import GameRegistry
+from conftest import received
+
+
+class CountingOffload:
+    """Offload function that runs the call inline and records what was offloaded."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, fn, *args):
+        self.calls.append(getattr(fn, '__name__', repr(fn)))
+        return fn(*args)
+
+
+@pytest.fixture
+def qr_codes(flask_app, monkeypatch):
+    """A fresh QR cache for address 192.168.1.20 installed in the app, counting offloaded work.
+
+    Games ABCD and WXYZ are hosted.
+    """
+    from app import events
+    addresses = ['192.168.1.20']
+    codes = QRCodes('9001', detect_address=lambda: addresses[-1], offload=CountingOffload())
+    codes.addresses = addresses
+    monkeypatch.setattr(events, 'qr_codes', codes)
+    monkeypatch.setattr(events, 'games', GameRegistry())
+    events.games.host('ABCD')
+    events.games.host('WXYZ')
+    return codes
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
+
+
+class TestQRRoutes:
+    """Tests for the QR code routes."""
+
+    def test_json_has_url_and_png(self, client, qr_codes):
+        """Test that /qr returns the join URL and a PNG data URI."""
+        data = client.get('/qr?game=abcd', headers={'Host': 'localhost:9001'}).get_json()
+
+        assert data['url'] == 'http://192.168.1.20:9001/join?game=ABCD'
+        assert base64.b64decode(data['qr_code'].split(',', 1)[1]).startswith(b'\x89PNG')
+
+    def test_svg_variant(self, client, qr_codes):
+        """Test that /qr.svg serves the same code as SVG, gzipped for clients that accept it."""
+        response = client.get('/qr.svg?game=ABCD', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.content_type == 'image/svg+xml'
+        assert response.headers['Content-Encoding'] == 'gzip'
+
+    def test_png_variant(self, client, qr_codes):
+        """Test that /qr.png serves the PNG."""
+        response = client.get('/qr.png?game=ABCD')
+
+        assert response.content_type == 'image/png'
+        assert response.get_data().startswith(b'\x89PNG')
+
+    @pytest.mark.parametrize('path', ['/qr?game=ABCD', '/qr.svg?game=ABCD', '/qr.png?game=ABCD'])
+    def test_not_modified(self, client, qr_codes, path):
+        """Test that a repeat request with the ETag gets an empty 304."""
+        etag = client.get(path).headers['ETag']
+        response = client.get(path, headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.get_data() == b''
+
+    def test_generated_once(self, client, qr_codes):
+        """Test that the address is detected and each code generated once, however often it is requested."""
+        for path in ('/qr?game=ABCD', '/qr.svg?game=ABCD', '/qr.png?game=ABCD', '/qr?game=ABCD'):
+            client.get(path)
+        client.get('/qr?game=WXYZ')
+
+        assert qr_codes.offload.calls.count('<lambda>') == 1
+        assert qr_codes.offload.calls.count('QRImage') == 2
+
+    def test_loopback_host_uses_lan_address(self, client, qr_codes):
+        """Test that a page loaded from localhost gets the LAN address with the port it was loaded on."""
+        data = client.get('/qr?game=ABCD', headers={'Host': 'localhost:9002'}).get_json()
+
+        assert data['url'] == 'http://192.168.1.20:9002/join?game=ABCD'
+
+    def test_request_host_used(self, client, qr_codes):
+        """Test that a page loaded through a reachable name gets join URLs on that name."""
+        data = client.get('/qr?game=ABCD', headers={'Host': 'quiz.lan:8080'}).get_json()
+
+        assert data['url'] == 'http://quiz.lan:8080/join?game=ABCD'
+
+    def test_cached_per_base_url(self, client, qr_codes):
+        """Test that the same game reached through two names gets a code for each."""
+        first = client.get('/qr?game=ABCD', headers={'Host': 'quiz.lan:8080'}).get_json()['url']
+        second = client.get('/qr?game=ABCD', headers={'Host': '10.1.1.5:8080'}).get_json()['url']
+
+        assert (first, second) == ('http://quiz.lan:8080/join?game=ABCD', 'http://10.1.1.5:8080/join?game=ABCD')
+        assert qr_codes.offload.calls.count('QRImage') == 2
+
+    def test_public_url(self, client, qr_codes):
+        """Test that a configured PUBLIC_URL is used whatever Host the request names."""
+        qr_codes.public_url = 'https://quiz.example.com'
+        data = client.get('/qr?game=ABCD', headers={'Host': 'localhost:9001'}).get_json()
+
+        assert data['url'] == 'https://quiz.example.com/join?game=ABCD'
+
+    @pytest.mark.parametrize('path', ['/qr?game=AB', '/qr.svg?game=AB!D', '/qr.png?game=ABCDE'])
+    def test_malformed_code(self, client, qr_codes, path):
+        """Test that a malformed ?game= gets a 400 rather than the bare join code."""
+        response = client.get(path)
+
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Invalid game code'}
+        assert qr_codes.offload.calls.count('QRImage') == 0
+
+    @pytest.mark.parametrize('path', ['/qr?game=QQQQ', '/qr.svg?game=QQQQ', '/qr.png?game=QQQQ'])
+    def test_unknown_game(self, client, qr_codes, path):
+        """Test that codes of games nobody hosts get a 404 and nothing is generated or cached."""
+        response = client.get(path)
+
+        assert response.status_code == 404
+        assert response.get_json() == {'error': 'Game not found'}
+        assert qr_codes.offload.calls.count('QRImage') == 0
+        assert qr_codes._images == {}
+
+
+class TestQRCache:
+    """Tests for generation ahead of requests and address changes."""
+
+    def test_generated_when_game_created(self, socket_client, monkeypatch):
+        """Test that hosting a game generates its QR code before the first request."""
+        from app import events
+        codes = QRCodes(detect_address=lambda: '192.168.1.20', start_background_task=lambda fn, *a: fn(*a))
+        monkeypatch.setattr(events, 'qr_codes', codes)
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        code = received(trebek, 'registration_success')[0]['game']
+
+        assert [key[1] for key in codes._images] == [code]
+
+    def test_ended_game_discarded(self, socket_client, monkeypatch):
+        """Test that ending a game drops its cached QR code."""
+        from app import events
+        codes = QRCodes('9001', detect_address=lambda: '192.168.1.20', start_background_task=lambda fn, *a: fn(*a))
+        monkeypatch.setattr(events, 'qr_codes', codes)
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        trebek.emit('end_game')
+
+        assert codes._images == {}
+
+    def test_refresh_same_address(self, qr_codes):
+        """Test that an unchanged address regenerates nothing."""
+        image = qr_codes.get('ABCD')
+
+        assert qr_codes.refresh_address() is False
+        assert qr_codes.get('ABCD') is image
+
+    def test_refresh_new_address(self, qr_codes):
+        """Test that a changed address regenerates the cached codes for it."""
+        qr_codes.get('ABCD')
+        qr_codes.get(None)
+        qr_codes.addresses.append('10.0.0.7')
+
+        assert qr_codes.refresh_address() is True
+        generated = qr_codes.offload.calls.count('QRImage')
+        assert qr_codes.get('ABCD').url == 'http://10.0.0.7:9001/join?game=ABCD'
+        assert qr_codes.get(None).url == 'http://10.0.0.7:9001/join'
+        assert qr_codes.offload.calls.count('QRImage') == generated == 4
+
+    def test_cache_bounded(self, qr_codes):
+        """Test that codes for many request Hosts evict the least recently used."""
+        qr_codes.max_images = 2
+        first = qr_codes.get('ABCD', 'a.lan')
+        qr_codes.get('ABCD', 'b.lan')
+        assert qr_codes.get('ABCD', 'a.lan') is first
+        qr_codes.get('ABCD', 'c.lan')
+
+        assert [key[0] for key in qr_codes._images] == ['http://a.lan', 'http://c.lan']
@@ -0,0 +1,143 @@
+"""
+Tests for compiled question banks and lazily loaded question text (app/question_bank.py).
+"""
+import csv
+import os
+
+import pytest
+
+from app import question_bank
+from app.game_logic import GameManager
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    """Start every test without banks cached in memory."""
+    monkeypatch.setattr(question_bank, '_cache', {})
+
+
+class TestCompiledBank:
+    """Tests for compiling and reading question banks."""
+
+    def test_first_load_compiles(self, sample_questions_csv):
+        """Test that loading a CSV writes its compiled bank next to it."""
+        bank = question_bank.load_bank(sample_questions_csv)
+
+        assert os.path.exists(question_bank.compiled_path(sample_questions_csv))
+        assert bank.rows()[0] == (1, 'Geography', 100, 'Capital of France?', 'Paris')
+        assert bank.key == question_bank.bank_key(sample_questions_csv)
+
+    def test_compiled_matches_csv(self, sample_questions_csv, monkeypatch):
+        """Test that a new process maps the compiled bank, with the same rows, instead of parsing the CSV."""
+        rows = question_bank.load_bank(sample_questions_csv).rows()
+        monkeypatch.setattr(question_bank, '_cache', {})
+        monkeypatch.setattr(question_bank, 'parse_csv', lambda path: pytest.fail('CSV parsed again'))
+
+        assert question_bank.load_bank(sample_questions_csv).rows() == rows
+
+    def test_memory_cache(self, sample_questions_csv):
+        """Test that repeated loads in one process return the same bank without re-reading."""
+        first = question_bank.load_bank(sample_questions_csv)
+        os.remove(question_bank.compiled_path(sample_questions_csv))
+
+        assert question_bank.load_bank(sample_questions_csv) is first
+
+    def test_changed_source_recompiled(self, sample_questions_csv):
+        """Test that editing the CSV invalidates both caches."""
+        question_bank.load_bank(sample_questions_csv)
+        with open(sample_questions_csv, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(['2', 'Art', '100', 'Painter of the Mona Lisa?', 'Da Vinci'])
+
+        rows = question_bank.load_bank(sample_questions_csv).rows()
+
+        assert rows[-1] == (2, 'Art', 100, 'Painter of the Mona Lisa?', 'Da Vinci')
+
+    def test_unicode_and_empty_text(self, tmp_path):
+        """Test that non-ASCII and empty fields round-trip through the compiled format."""
+        path = str(tmp_path / 'questions.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Round', 'Category', 'Value', 'Question', 'Answer'])
+            writer.writerow(['1', 'Café', '100', 'Größte Stadt? 東京', ''])
+            writer.writerow(['1', 'Café', '200', 'Nul\x00byte', 'Ø'])
+        rows = question_bank.load_bank(path).rows()
+        question_bank._cache.clear()
+
+        assert question_bank.load_bank(path).rows() == rows
+        assert rows[1][3] == 'Nul\x00byte'
+
+    def test_corrupt_compiled_bank_ignored(self, sample_questions_csv, monkeypatch):
+        """Test that a damaged compiled bank falls back to parsing the CSV."""
+        rows = question_bank.load_bank(sample_questions_csv).rows()
+        with open(question_bank.compiled_path(sample_questions_csv), 'r+b') as f:
+            f.truncate(60)
+        monkeypatch.setattr(question_bank, '_cache', {})
+
+        assert question_bank.load_bank(sample_questions_csv).rows() == rows
+
+    def test_unwritable_directory(self, sample_questions_csv, monkeypatch):
+        """Test that the bank is kept in memory when its compiled file cannot be written."""
+        def fail(path, data):
+            raise PermissionError(path)
+        monkeypatch.setattr(question_bank, 'write_compiled', fail)
+
+        bank = question_bank.load_bank(sample_questions_csv)
+
+        assert len(bank) == 6
+        assert bank.rows()[-1][4] == 'George Washington'
+
+    def test_missing_source(self, tmp_path):
+        """Test that a missing CSV raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            question_bank.load_bank(str(tmp_path / 'missing.csv'))
+
+
+class TestLazyText:
+    """Tests for question text decoded only when it is read."""
+
+    @pytest.fixture
+    def decoded(self, monkeypatch):
+        """Record the bank position of every question or answer text decoded."""
+        positions = []
+        text = question_bank.CompiledBank.text
+
+        def recording_text(bank, i):
+            positions.append(i)
+            return text(bank, i)
+        monkeypatch.setattr(question_bank.CompiledBank, 'text', recording_text)
+        return positions
+
+    def test_loading_decodes_no_text(self, mock_questions_file, decoded):
+        """Test that loading a bank into a game decodes only category names."""
+        gm = GameManager()
+        gm.load_questions()
+        decoded.clear()
+        gm.start_round(1)
+        gm.get_board_payload(1, 'display')
+
+        assert decoded == []
+
+    def test_reveal_decodes_one_question(self, mock_questions_file, decoded):
+        """Test that selecting a question decodes just that question's text."""
+        gm = GameManager()
+        gm.load_questions()
+        gm.start_round(1)
+        decoded.clear()
+
+        q = gm.select_question('Science', 200)
+        summary = gm.get_game_summary()
+
+        assert summary['current_question']['question'] == 'What is Fe?'
+        assert q.answer == 'Iron'
+        assert len(set(decoded)) == 2
+
+    def test_host_board_decodes_its_round(self, mock_questions_file, decoded):
+        """Test that the host's board decodes the text of its own round only."""
+        gm = GameManager()
+        gm.load_questions()
+        decoded.clear()
+
+        board = gm.get_board_state(1)
+
+        assert board['Geography'][1]['answer'] == 'Berlin'
+        assert len(decoded) == 2 * 4
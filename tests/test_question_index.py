@@ -0,0 +1,264 @@
+"""
+Tests for the indexed question store used by selection, board building and round completion.
+"""
+import json
+
+import pytest
+from app.models import GamePhase, Question, QuestionState
+from app.question_index import QuestionIndex
+
+
+def make_bank(rounds=2, categories=6, values=(100, 200, 300, 400, 500)):
+    """Build a bank of questions covering every (round, category, value)."""
+    return [
+        Question(round=r, category=f'Cat {c}', value=v * r,
+                 question=f'Q r{r} c{c} v{v}', answer=f'A r{r} c{c} v{v}')
+        for r in range(1, rounds + 1)
+        for c in range(categories)
+        for v in values
+    ]
+
+
+class TestQuestionIndex:
+    """Tests for QuestionIndex lookups and views."""
+
+    def test_find_by_key(self):
+        """Test that questions are found by (round, category, value)."""
+        bank = make_bank()
+        index = QuestionIndex(bank)
+
+        q = index.find(2, 'Cat 3', 800)
+
+        assert q is not None
+        assert (q.round, q.category, q.value) == (2, 'Cat 3', 800)
+
+    def test_find_missing_key(self):
+        """Test that unknown keys return None."""
+        index = QuestionIndex(make_bank())
+
+        assert index.find(1, 'Nope', 100) is None
+        assert index.find(3, 'Cat 0', 100) is None
+
+    def test_find_skips_used_questions(self):
+        """Test that used questions are not returned."""
+        bank = make_bank()
+        index = QuestionIndex(bank)
+
+        index.find(1, 'Cat 0', 100).used = True
+
+        assert index.find(1, 'Cat 0', 100) is None
+
+    def test_find_returns_first_unused_duplicate(self):
+        """Test that duplicate keys fall through to the next unused question."""
+        bank = [
+            Question(round=1, category='Dup', value=100, question='First', answer='A1'),
+            Question(round=1, category='Dup', value=100, question='Second', answer='A2'),
+        ]
+        index = QuestionIndex(bank)
+
+        assert index.find(1, 'Dup', 100).question == 'First'
+        bank[0].used = True
+        assert index.find(1, 'Dup', 100).question == 'Second'
+
+    def test_category_view_sorted_by_value(self):
+        """Test that category views are sorted by value."""
+        bank = [
+            Question(round=1, category='Geo', value=300, question='Q3', answer='A3'),
+            Question(round=1, category='Geo', value=100, question='Q1', answer='A1'),
+            Question(round=1, category='Geo', value=200, question='Q2', answer='A2'),
+        ]
+        index = QuestionIndex(bank)
+
+        assert [q.value for q in index.category_view(1, 'Geo')] == [100, 200, 300]
+
+    def test_round_view_preserves_category_order(self):
+        """Test that categories keep their order of first appearance."""
+        index = QuestionIndex(make_bank(categories=4))
+
+        assert list(index.round_view(1)) == ['Cat 0', 'Cat 1', 'Cat 2', 'Cat 3']
+        assert index.round_view(5) == {}
+
+    def test_remaining_tracks_used_flag(self):
+        """Test that flipping Question.used keeps remaining counts current."""
+        bank = make_bank(rounds=1, categories=2, values=(100, 200))
+        index = QuestionIndex(bank)
+
+        assert index.remaining(1) == 4
+        bank[0].used = True
+        bank[0].used = True  # no double counting
+        assert index.remaining(1) == 3
+        bank[0].used = False
+        assert index.remaining(1) == 4
+
+    def test_round_complete(self):
+        """Test round completion once every question is used."""
+        bank = make_bank(rounds=1, categories=1, values=(100, 200))
+        index = QuestionIndex(bank)
+
+        assert index.is_round_complete(1) is False
+        for q in bank:
+            q.used = True
+        assert index.is_round_complete(1) is True
+
+    def test_prior_used_flags_counted(self):
+        """Test that questions already used before indexing are respected."""
+        bank = make_bank(rounds=1, categories=1, values=(100, 200))
+        bank[0].used = True
+        index = QuestionIndex(bank)
+
+        assert index.remaining(1) == 1
+
+
+class TestRoundBoard:
+    """Tests for the incrementally maintained round board."""
+
+    def test_board_matches_board_state_shape(self, game_manager, full_round_questions):
+        """Test that the board holds the same cells as get_board_state."""
+        game_manager.state.questions = full_round_questions
+
+        board = game_manager.get_board(1)
+
+        assert board.round == 1
+        assert board.categories == game_manager.get_board_state(1)
+        assert [c['value'] for c in board.categories['Geography']] == [100, 200]
+
+    def test_board_built_once(self, game_manager, full_round_questions):
+        """Test that the same board object is reused for a round."""
+        game_manager.state.questions = full_round_questions
+        game_manager.start_round(1)
+
+        assert game_manager.get_board(1) is game_manager.get_board(1)
+
+    def test_board_updated_in_place_on_use(self, game_manager, full_round_questions):
+        """Test that selecting a question flips its cell and bumps the version."""
+        game_manager.state.questions = full_round_questions
+        game_manager.start_round(1)
+        board = game_manager.get_board(1)
+        version = board.version
+
+        game_manager.select_question('Science', 100)
+
+        assert board.categories['Science'][0]['used'] is True
+        assert board.version > version
+
+    def test_payload_cached_until_change(self, game_manager, full_round_questions):
+        """Test that the encoded payload is reused until the board changes."""
+        game_manager.state.questions = full_round_questions
+        game_manager.start_round(1)
+
+        first = game_manager.get_board_payload(1)
+        assert game_manager.get_board_payload(1) is first
+        assert first.data['version'] == game_manager.get_board(1).version
+
+        game_manager.select_question('Geography', 200)
+
+        second = game_manager.get_board_payload(1)
+        assert second is not first
+        assert json.loads(second.text)['board']['Geography'][1]['used'] is True
+
+    def test_rebuilt_board_has_newer_version(self, game_manager, full_round_questions):
+        """Test that versions keep increasing when the index is rebuilt."""
+        game_manager.state.questions = full_round_questions
+        version = game_manager.get_board(1).version
+
+        game_manager.state.questions = list(full_round_questions)
+
+        assert game_manager.get_board(1).version > version
+
+    def test_changes_since(self, game_manager, full_round_questions):
+        """Test that changes_since chains cell_used messages from an older version."""
+        game_manager.state.questions = full_round_questions
+        game_manager.start_round(1)
+        board = game_manager.get_board(1)
+        start = board.version
+
+        game_manager.select_question('Science', 100)
+        middle = board.version
+        game_manager.select_question('Geography', 200)
+
+        changes = [c.data for c in board.changes_since(start)]
+        assert [(c['category'], c['row'], c['used']) for c in changes] == [('Science', 0, True), ('Geography', 1, True)]
+        assert [c['base'] for c in changes] == [start, middle]
+        assert [c.data for c in board.changes_since(middle)] == changes[1:]
+        assert board.changes_since(board.version) == []
+        assert board.changes_since(-1) is None
+
+    def test_changes_bounded(self, game_manager):
+        """Test that only the most recent changes are kept."""
+        from app import question_index
+        game_manager.state.questions = make_bank(rounds=1, categories=20)
+        board = game_manager.get_board(1)
+        start = board.version
+
+        for q in game_manager.state.questions:
+            q.used = True
+
+        assert board.changes_since(start) is None
+        assert len(board.changes_since(board._changes[0].data['base'])) == question_index.MAX_CHANGES
+
+
+class TestGameManagerIndexing:
+    """Tests for GameManager using the question index."""
+
+    def test_load_questions_builds_index(self, game_manager, mock_questions_file):
+        """Test that loading questions builds the index."""
+        game_manager.load_questions()
+
+        index = game_manager.question_index
+        assert index.questions is game_manager.state.questions
+        assert index.find(1, 'Geography', 200).answer == 'Berlin'
+
+    def test_index_rebuilt_when_questions_replaced(self, game_manager, full_round_questions):
+        """Test that assigning a new question list is picked up."""
+        game_manager.state.questions = full_round_questions
+        first = game_manager.question_index
+
+        game_manager.state.questions = list(full_round_questions)
+
+        assert game_manager.question_index is not first
+
+    def test_select_question_marks_used(self, game_manager, full_round_questions):
+        """Test selecting a question through the index."""
+        game_manager.state.questions = full_round_questions
+        game_manager.start_round(1)
+
+        q = game_manager.select_question('Science', 200)
+
+        assert q is full_round_questions[3]
+        assert q.used is True
+        assert game_manager.state.current_question is q
+        assert game_manager.state.question_state == QuestionState.QUESTION_REVEALED
+        assert game_manager.question_index.remaining(1) == 3
+
+    def test_select_question_twice_fails(self, game_manager, full_round_questions):
+        """Test that a used question cannot be selected again."""
+        game_manager.state.questions = full_round_questions
+        game_manager.start_round(1)
+
+        assert game_manager.select_question('Geography', 100) is not None
+        assert game_manager.select_question('Geography', 100) is None
+
+    def test_select_question_uses_current_round(self, game_manager):
+        """Test that selection is scoped to the active round."""
+        game_manager.state.questions = make_bank()
+        game_manager.start_round(2)
+
+        assert game_manager.state.phase == GamePhase.ROUND_2
+        assert game_manager.select_question('Cat 0', 100) is None
+        assert game_manager.select_question('Cat 0', 200).round == 2
+
+    def test_is_round_complete_after_all_selected(self, game_manager, full_round_questions):
+        """Test round completion through GameManager."""
+        game_manager.state.questions = full_round_questions
+        game_manager.start_round(1)
+
+        for q in list(full_round_questions):
+            assert game_manager.is_round_complete(1) is False
+            game_manager.select_question(q.category, q.value)
+
+        assert game_manager.is_round_complete(1) is True
+
+    @pytest.mark.parametrize("round_num", [1, 2])
+    def test_is_round_complete_empty_round(self, game_manager, round_num):
+        """Test that a round with no questions counts as complete."""
+        assert game_manager.is_round_complete(round_num) is True
@@ -0,0 +1,211 @@
+"""
+Tests for the SQLite question library and sampled boards (app/question_library.py).
+"""
+import csv
+import random
+
+import pytest
+
+from app.game_logic import GameManager
+from app.journal import Journal, read_journal, replay
+from app.question_library import QuestionLibrary
+from app.snapshot import encode_state, restore_state
+from conftest import received
+
+VALUES = [100, 200, 300, 400, 500]
+
+
+def archive_rows(categories=8, per_cell=3):
+    """Round 1 and 2 questions: `per_cell` questions per (category, value); odd categories tagged 'science'."""
+    for round_num in (1, 2):
+        for c in range(categories):
+            for value in VALUES:
+                for i in range(per_cell):
+                    yield (round_num, f'R{round_num} Category {c}', value * round_num,
+                           f'Q {round_num}/{c}/{value}/{i}', f'A {i}', ['science'] if c % 2 else [])
+
+
+@pytest.fixture
+def library(tmp_path):
+    """A library holding the `archive_rows` questions plus one category missing its $500 question."""
+    library = QuestionLibrary(str(tmp_path / 'library.db'))
+    library.import_rows(archive_rows())
+    library.import_rows((1, 'Incomplete', value, f'Q {value}', 'A', []) for value in VALUES[:-1])
+    yield library
+    library.close()
+
+
+@pytest.fixture
+def library_config(library, monkeypatch):
+    """Point Config.QUESTION_LIBRARY at the test library."""
+    from config import Config
+    monkeypatch.setattr(Config, 'QUESTION_LIBRARY', library.path)
+    monkeypatch.setattr(Config, 'BOARD_CATEGORIES', 3)
+    monkeypatch.setattr(Config, 'BOARD_VALUES', {1: VALUES, 2: [v * 2 for v in VALUES]})
+    return library
+
+
+class TestImport:
+    """Tests for bulk importing questions."""
+
+    def test_import_rows(self, library):
+        """Test that every imported row is stored."""
+        assert library.count() == 2 * 8 * 5 * 3 + 4
+
+    def test_import_csv_with_tags(self, tmp_path):
+        """Test that CSV imports keep the Tags column and add the tags given to the importer."""
+        path = tmp_path / 'archive.csv'
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Round', 'Category', 'Value', 'Question', 'Answer', 'Tags'])
+            for value in VALUES:
+                writer.writerow(['1', 'Rivers', str(value), f'River {value}?', 'Nile', 'geo; water'])
+        library = QuestionLibrary(str(tmp_path / 'library.db'))
+
+        assert library.import_csv(str(path), ['imported']) == 5
+        assert library.categories(1, VALUES, tag='water') == ['Rivers']
+        assert library.categories(1, VALUES, tag='imported') == ['Rivers']
+        assert library.categories(1, VALUES, tag='history') == []
+        library.close()
+
+
+class TestBoardAssembly:
+    """Tests for sampling boards."""
+
+    def test_categories_must_be_complete(self, library):
+        """Test that only categories with a question at every value can be sampled."""
+        categories = library.categories(1, VALUES)
+
+        assert len(categories) == 8
+        assert 'Incomplete' not in categories
+
+    def test_sample_board_shape(self, library):
+        """Test that a board is N distinct categories x one question per value, in value order."""
+        questions = library.fetch(library.sample_board(1, 4, VALUES, rng=random.Random(7)))
+
+        assert len(questions) == 20
+        assert len({q.category for q in questions}) == 4
+        assert [q.value for q in questions] == VALUES * 4
+        assert all(q.round == 1 and not q.used for q in questions)
+
+    def test_sample_is_seeded(self, library):
+        """Test that the same seed samples the same board, and boards vary between seeds."""
+        boards = [tuple(library.sample_board(1, 4, VALUES, rng=random.Random(seed))) for seed in (1, 1, 2, 3)]
+
+        assert boards[0] == boards[1]
+        assert len(set(boards)) > 1
+
+    def test_sample_by_tag(self, library):
+        """Test that a tag restricts the board to tagged questions."""
+        questions = library.fetch(library.sample_board(1, 4, VALUES, tag='science'))
+
+        assert {q.category for q in questions} == {f'R1 Category {c}' for c in (1, 3, 5, 7)}
+
+    def test_too_few_categories(self, library):
+        """Test that asking for more categories than the round has raises ValueError."""
+        with pytest.raises(ValueError):
+            library.sample_board(1, 9, VALUES)
+
+    def test_fetch_keeps_order(self, library):
+        """Test that questions come back in the order their ids were given."""
+        ids = library.sample_board(1, 2, VALUES)
+
+        assert [q.question for q in library.fetch(ids[::-1])] == [q.question for q in library.fetch(ids)][::-1]
+
+
+class TestGameManagerBoards:
+    """Tests for GameManager playing from library boards."""
+
+    def test_manager_holds_only_the_board(self, library_config):
+        """Test that loading a board keeps just its questions in the game."""
+        gm = GameManager()
+
+        assert gm.load_board(1) is True
+
+        assert len(gm.state.questions) == 15
+        assert set(gm.get_board_state(1)) == {q.category for q in gm.state.questions}
+        assert gm.board_source[0] == 1
+
+    def test_next_round_replaces_board(self, library_config):
+        """Test that the round 2 board replaces the round 1 questions."""
+        gm = GameManager()
+        gm.load_board(1)
+        gm.load_board(2)
+
+        assert {q.round for q in gm.state.questions} == {2}
+        assert [q.value for q in gm.state.questions[:5]] == [200, 400, 600, 800, 1000]
+
+    def test_replay_loads_same_board(self, library_config, tmp_path):
+        """Test that a journaled board is reloaded with the same questions, not resampled."""
+        gm = GameManager()
+        gm.journal = Journal(str(tmp_path / 'ABCD.log'))
+        gm.load_board(1)
+        gm.start_round(1)
+        first = gm.state.questions[0]
+        gm.select_question(first.category, first.value)
+        gm.journal.close()
+
+        rebuilt = GameManager()
+        replay(rebuilt, read_journal(gm.journal.path))
+
+        assert [q.question for q in rebuilt.state.questions] == [q.question for q in gm.state.questions]
+        assert rebuilt.state.current_question.question == first.question
+
+    def test_snapshot_round_trip(self, library_config):
+        """Test that a snapshot restores a library board and its used flags."""
+        gm = GameManager()
+        gm.load_board(1)
+        gm.start_round(1)
+        first = gm.state.questions[0]
+        gm.select_question(first.category, first.value)
+        gm.skip_question()
+
+        restored = GameManager()
+        restore_state(restored, encode_state(gm))
+
+        assert restored.board_source == gm.board_source
+        assert [q.used for q in restored.state.questions] == [q.used for q in gm.state.questions]
+
+    def test_missing_library(self, tmp_path, monkeypatch):
+        """Test that a board cannot be loaded without the round in the library."""
+        from config import Config
+        monkeypatch.setattr(Config, 'QUESTION_LIBRARY', str(tmp_path / 'empty.db'))
+
+        assert GameManager().load_board(1) is False
+
+
+class TestLibraryGames:
+    """Tests for the Socket.IO handlers with a question library configured."""
+
+    def test_start_round_samples_board(self, socket_client, library_config):
+        """Test that starting a round puts a sampled board in front of the host."""
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        trebek.emit('start_round', {'round': 1})
+
+        board = received(trebek, 'board_update')[-1]['board']
+        assert len(board) == 3
+        assert all([cell['value'] for cell in cells] == VALUES for cells in board.values())
+
+    def test_restarting_round_keeps_board(self, socket_client, library_config):
+        """Test that starting the same round again does not resample its board."""
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        trebek.emit('start_round', {'round': 1})
+        first = received(trebek, 'board_update')[-1]['board']
+        trebek.emit('start_round', {'round': 1})
+
+        assert received(trebek, 'board_update')[-1]['board'] == first
+
+    def test_round_not_started_without_board(self, socket_client, library_config, tmp_path, monkeypatch):
+        """Test that a round whose board cannot be loaded is refused with an error and not started."""
+        from config import Config
+        trebek = socket_client()
+        trebek.emit('register_trebek')
+        trebek.get_received()
+        monkeypatch.setattr(Config, 'QUESTION_LIBRARY', str(tmp_path / 'empty.db'))
+        trebek.emit('start_round', {'round': 1})
+
+        messages = trebek.get_received()
+        assert [m['name'] for m in messages] == ['error']
+        assert messages[0]['args'][0] == {'message': 'Could not load the board for round 1'}
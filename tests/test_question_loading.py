@@ -266,3 +266,33 @@ class TestQuestionCategories:
         assert board['Geography'][1]['value'] == 200
         assert board['Geography'][2]['value'] == 300
 
+
+
+class TestQuestionReloading:
+    """Tests for loading questions again while a game is running."""
+
+    def test_reload_keeps_used_flags(self, game_manager, mock_questions_file):
+        """Test that reloading an unchanged file keeps the loaded questions and their used flags."""
+        game_manager.load_questions()
+        questions = game_manager.state.questions
+        questions[0].used = True
+        version = game_manager.version
+
+        assert game_manager.load_questions() is True
+
+        assert game_manager.state.questions is questions
+        assert game_manager.state.questions[0].used is True
+        assert game_manager.version == version
+
+    def test_changed_file_reloaded(self, game_manager, mock_questions_file):
+        """Test that an edited file is reloaded, keeping used flags of questions still in it."""
+        game_manager.load_questions()
+        game_manager.state.questions[0].used = True
+
+        with open(mock_questions_file, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(['2', 'History', '600', 'Who wrote Hamlet?', 'Shakespeare'])
+        game_manager.load_questions()
+
+        assert len(game_manager.state.questions) == 7
+        assert [q.used for q in game_manager.state.questions] == [True] + [False] * 6
+        assert game_manager.question_index.remaining(1) == 3
@@ -0,0 +1,309 @@
+"""
+Tests for hosting several games in one process (app/registry.py).
+"""
+import pytest
+from app.journal import read_journal
+from app.registry import CODE_LENGTH, GameRegistry, normalize_code
+from conftest import received
+
+
+class TestGameRegistry:
+    """Tests for GameRegistry bookkeeping."""
+
+    def test_host_creates_game_with_code(self):
+        """Test that hosting without a code picks a fresh, well-formed code."""
+        registry = GameRegistry()
+
+        game = registry.host()
+
+        assert len(game.code) == CODE_LENGTH
+        assert normalize_code(game.code) == game.code
+        assert registry.get(game.code) is game
+
+    def test_games_are_independent(self):
+        """Test that each game gets its own GameManager and channels."""
+        registry = GameRegistry()
+
+        a = registry.host()
+        b = registry.host()
+
+        assert a.code != b.code
+        assert a.manager is not b.manager
+        assert a.channels is not b.channels
+
+    def test_host_existing_code_returns_same_game(self):
+        """Test that hosting a known code rejoins that game."""
+        registry = GameRegistry()
+        game = registry.host('ABCD')
+
+        assert registry.host('abcd') is game
+        assert len(registry) == 1
+
+    @pytest.mark.parametrize("code", ['', 'AB', 'ABCDE', 'AB1D', 'ABIO', None, 42])
+    def test_malformed_codes_rejected(self, code):
+        """Test that malformed codes never match a game."""
+        registry = GameRegistry()
+        registry.host()
+
+        assert normalize_code(code) is None
+        assert registry.get(code) is None
+
+    def test_host_skips_codes_claim_refuses(self):
+        """Test that fresh codes are drawn until `claim` accepts one, and a refused requested code hosts nothing."""
+        registry = GameRegistry()
+        asked = []
+
+        def claim(code):
+            asked.append(code)
+            return len(asked) > 2
+
+        game = registry.host(claim=claim)
+
+        assert game.code == asked[-1] and len(asked) == 3
+        assert list(registry) == [game]
+        assert registry.host('WXYZ', claim=lambda code: False) is None
+        assert 'WXYZ' not in registry
+
+    def test_resolve_without_code(self):
+        """Test that a missing code resolves only while exactly one game is hosted."""
+        registry = GameRegistry()
+        assert registry.resolve() is None
+
+        first = registry.host()
+        assert registry.resolve() is first
+
+        registry.host()
+        assert registry.resolve() is None
+        assert registry.resolve(first.code) is first
+
+    def test_find_in_rooms(self):
+        """Test resolving a game from the rooms a socket has joined."""
+        registry = GameRegistry()
+        game = registry.host()
+
+        assert registry.find_in(['sid123', f'{game.code}:players', game.code]) is game
+        assert registry.find_in(['sid123', 'lobby']) is None
+
+    def test_rooms_are_prefixed_with_code(self):
+        """Test that every room name is scoped to the game."""
+        game = GameRegistry().host('WXYZ')
+
+        assert game.room == 'WXYZ'
+        assert game.role_room('player') == 'WXYZ:players'
+        assert game.team_room('team_1') == 'WXYZ:team_1'
+        assert game.timer_name('buzz_delay') == 'WXYZ:buzz_delay'
+
+    def test_remove(self):
+        """Test removing a game."""
+        registry = GameRegistry()
+        game = registry.host()
+
+        assert registry.remove(game.code) is True
+        assert registry.remove(game.code) is False
+        assert game.code not in registry
+
+    def test_drop_keeps_saved_state(self, tmp_path):
+        """Test that dropping a game taken over elsewhere leaves its journal as the new owner sees it."""
+        registry = GameRegistry(journal_dir=str(tmp_path))
+        game = registry.host()
+        game.manager.create_team('Alpha')
+        game.manager.journal.commit()
+        game.manager.create_team('Beta')
+
+        assert registry.drop(game.code) is True
+        assert game.code not in registry
+        assert [r['args'] for r in read_journal(registry.journal_path(game.code))] == [['Alpha']]
+
+
+@pytest.fixture
+def two_games(socket_client):
+    """Two Trebek clients, each hosting its own game."""
+    hosts = []
+    for _ in range(2):
+        client = socket_client()
+        client.emit('register_trebek')
+        code = received(client, 'registration_success')[0]['game']
+        hosts.append((client, code))
+    return hosts
+
+
+class TestMultiGameEvents:
+    """Tests for Socket.IO handlers with several games hosted."""
+
+    def test_each_trebek_hosts_own_game(self, two_games):
+        """Test that two hosts get two different games."""
+        from app import events
+        (_, code_a), (_, code_b) = two_games
+
+        assert code_a != code_b
+        assert {g.code for g in events.games} == {code_a, code_b}
+
+    def test_trebek_rejoins_game_by_code(self, two_games, socket_client):
+        """Test that a reconnecting host takes back its game instead of creating one."""
+        from app import events
+        (old_host, code), _ = two_games
+        old_host.disconnect()
+
+        host = socket_client()
+        host.emit('register_trebek', {'game': code})
+
+        assert received(host, 'registration_success')[0]['game'] == code
+        assert events.games.get(code).manager.state.trebek_session_id is not None
+        assert len(events.games) == 2
+
+    def test_updates_stay_in_their_game(self, two_games, socket_client):
+        """Test that clients of one game never receive another game's patches."""
+        from app import events
+        (host_a, code_a), (host_b, code_b) = two_games
+        watcher_a = socket_client(query_string=f'game={code_a}')
+        watcher_b = socket_client(query_string=f'game={code_b}')
+
+        host_a.emit('create_team', {'name': 'Alpha'})
+        events.timers.run_due(now=float('inf'))
+
+        assert [p['ops'][0][1]['name'] for p in received(watcher_a, 'game_patch')] == ['Alpha']
+        assert received(watcher_b, 'game_patch') == []
+        assert received(host_b, 'game_patch') == []
+
+    def test_player_joins_game_from_connection_query(self, two_games, socket_client):
+        """Test that a player connecting with ?game=CODE joins that game's team."""
+        from app import events
+        (host_a, code_a), (host_b, code_b) = two_games
+        host_b.emit('create_team', {'name': 'Beta'})
+
+        player = socket_client(query_string=f'game={code_b}')
+        player.emit('join_game', {'name': 'Bob', 'team_id': 'team_1'})
+
+        success = received(player, 'registration_success')[0]
+        assert success['game'] == code_b
+        assert [p.name for p in events.games.get(code_b).manager.state.players.values()] == ['Bob']
+        assert events.games.get(code_a).manager.state.players == {}
+
+    def test_player_joins_game_by_code_in_event(self, two_games, socket_client):
+        """Test that join_game can name its game explicitly."""
+        from app import events
+        _, (host_b, code_b) = two_games
+        host_b.emit('create_team', {'name': 'Beta'})
+
+        player = socket_client()
+        player.emit('join_game', {'name': 'Bob', 'team_id': 'team_1', 'game': code_b})
+
+        assert received(player, 'registration_success')[0]['game'] == code_b
+        assert len(events.games.get(code_b).manager.state.players) == 1
+
+    def test_unknown_game_reports_error(self, two_games, socket_client):
+        """Test that ambiguous or unknown games are rejected."""
+        client = socket_client()
+
+        client.emit('request_game_state')
+        client.emit('request_game_state', {'game': 'ZZZZ'})
+
+        assert received(client, 'error') == [{'message': 'Game not found'}] * 2
+
+    def test_trebek_cannot_control_other_game(self, two_games, socket_client):
+        """Test that commands only ever apply to the sender's own game."""
+        from app import events
+        (host_a, code_a), (host_b, code_b) = two_games
+
+        host_a.emit('start_round', {'round': 1})
+
+        assert events.games.get(code_a).manager.state.phase.value == 'round_1'
+        assert events.games.get(code_b).manager.state.phase.value == 'lobby'
+
+    def test_buzz_timers_are_per_game(self, two_games):
+        """Test that skipping in one game does not cancel another game's buzz delay."""
+        from app import events
+        (host_a, code_a), (host_b, code_b) = two_games
+        for host in (host_a, host_b):
+            host.emit('start_round', {'round': 1})
+            host.emit('select_question', {'category': 'Geography', 'value': 100})
+
+        host_a.emit('skip_question')
+        events.timers.run_due(now=float('inf'))
+
+        assert events.games.get(code_a).manager.state.question_state.value == 'board_active'
+        assert events.games.get(code_b).manager.state.question_state.value == 'buzzing_open'
+
+    def test_player_cannot_reconnect_into_other_game(self, two_games, socket_client):
+        """Test that a player's stored ids from one game do not take over the same ids in another."""
+        (host_a, code_a), (host_b, code_b) = two_games
+        for host in (host_a, host_b):
+            host.emit('create_team', {'name': 'Alpha'})
+        phone = socket_client()
+        phone.emit('join_game', {'name': 'Alice', 'team_id': 'team_1', 'game': code_a})
+        joined = received(phone, 'registration_success')[0]
+        socket_client().emit('join_game', {'name': 'Bob', 'team_id': 'team_1', 'game': code_b})
+
+        phone.emit('reconnect_player', {'player_id': joined['player_id'], 'team_id': 'team_1',
+                                        'token': joined['token'], 'game': code_b})
+        replies = [msg['name'] for msg in phone.get_received()]
+        assert 'reconnect_failed' in replies and 'registration_success' not in replies
+
+        phone.emit('reconnect_player', {'player_id': joined['player_id'], 'team_id': 'team_1',
+                                        'token': joined['token'], 'game': code_a})
+        assert received(phone, 'registration_success')[0]['game'] == code_a
+
+    def test_qr_code_links_to_game(self, flask_app, two_games):
+        """Test that the join QR code carries the game code."""
+        code = two_games[1][1]
+        response = flask_app.test_client().get(f'/qr?game={code.lower()}')
+
+        assert response.get_json()['url'].endswith(f'/join?game={code}')
+
+
+class TestEndGame:
+    """Tests for ending a game and hosting a new one."""
+
+    def test_end_game_stops_hosting(self, two_games, socket_client):
+        """Test that ending a game tells its clients, removes it and leaves the other game alone."""
+        from app import events
+        (host_a, code_a), (host_b, code_b) = two_games
+        watcher_a = socket_client(query_string=f'game={code_a}')
+        watcher_b = socket_client(query_string=f'game={code_b}')
+        host_a.emit('start_round', {'round': 1})
+        host_a.emit('select_question', {'category': 'Geography', 'value': 100})
+        host_a.emit('end_game')
+
+        assert received(host_a, 'game_ended') == [{'game': code_a}]
+        assert received(watcher_a, 'game_ended') == [{'game': code_a}]
+        assert received(watcher_b, 'game_ended') == []
+        assert code_a not in events.games
+        assert not events.timers.pending(f'{code_a}:buzz_delay')
+        assert list(events.games) == [events.games.get(code_b)]
+
+    def test_only_trebek_ends_game(self, two_games, socket_client):
+        """Test that a spectator cannot end the game."""
+        from app import events
+        (_, code), _ = two_games
+        watcher = socket_client(query_string=f'game={code}')
+        watcher.emit('end_game')
+
+        assert received(watcher, 'error')[0]['message'] == 'Unauthorized'
+        assert code in events.games
+
+    def test_new_game_after_end(self, two_games):
+        """Test that the host registers again without a code and gets a fresh game."""
+        from app import events
+        (host, code), _ = two_games
+        host.emit('end_game')
+        host.emit('register_trebek', {})
+
+        new_code = received(host, 'registration_success')[-1]['game']
+        assert new_code != code
+        assert events.games.get(new_code).manager.state.trebek_session_id is not None
+        assert len(events.games) == 2
+
+    def test_ended_game_files_deleted(self, tmp_path, socket_client, monkeypatch):
+        """Test that ending a journaled game deletes its journal."""
+        from app import events
+        journal_dir = tmp_path / 'journals'
+        journal_dir.mkdir()
+        monkeypatch.setattr(events, 'games', GameRegistry(journal_dir=str(journal_dir)))
+        host = socket_client()
+        host.emit('register_trebek')
+        code = received(host, 'registration_success')[0]['game']
+        host.emit('create_team', {'name': 'Alpha'})
+        host.emit('end_game')
+
+        assert code not in events.games
+        assert list(journal_dir.iterdir()) == []
@@ -0,0 +1,172 @@
+"""
+Tests for production serving settings (config.py, app/__init__.py) and the connection limit (app/events.py).
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from config import env_flag
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def config_in_subprocess(expression, unset=(), **env):
+    """Print `expression` in a fresh interpreter with `env` set and `unset` removed; returns (returncode, output)."""
+    environ = {k: v for k, v in os.environ.items() if k not in unset}
+    result = subprocess.run([sys.executable, '-c', f"from config import Config; print({expression})"],
+                            cwd=ROOT, env=dict(environ, **env), capture_output=True, text=True)
+    return result.returncode, result.stdout + result.stderr
+
+
+class TestConfig:
+    """Tests for environment-driven settings."""
+
+    @pytest.mark.parametrize('value,expected', [('1', True), ('true', True), ('yes', True),
+                                                ('0', False), ('False', False), ('off', False), ('', False)])
+    def test_env_flag(self, monkeypatch, value, expected):
+        """Test that boolean variables accept the usual spellings."""
+        monkeypatch.setenv('JEOPARDY_TEST_FLAG', value)
+
+        assert env_flag('JEOPARDY_TEST_FLAG', not expected) is expected
+
+    def test_env_flag_default(self, monkeypatch):
+        """Test that an unset variable takes the default."""
+        monkeypatch.delenv('JEOPARDY_TEST_FLAG', raising=False)
+
+        assert env_flag('JEOPARDY_TEST_FLAG', True) is True
+
+    def test_development_defaults(self):
+        """Test that development keeps debug on and leaves the async mode to Flask-SocketIO."""
+        code, out = config_in_subprocess("Config.DEBUG, Config.ASYNC_MODE, Config.SOCKETIO_TRANSPORTS",
+                                         unset=('DEBUG', 'ASYNC_MODE', 'SOCKETIO_TRANSPORTS'), APP_ENV='development')
+
+        assert code == 0
+        assert out.strip() == "True None ['polling', 'websocket']"
+
+    def test_production_defaults(self):
+        """Test that production turns debug off and runs on eventlet."""
+        code, out = config_in_subprocess("Config.DEBUG, Config.ASYNC_MODE", unset=('DEBUG', 'ASYNC_MODE'),
+                                         APP_ENV='production')
+
+        assert code == 0
+        assert out.strip() == 'False eventlet'
+
+    def test_persistence_off_by_default(self):
+        """Test that games are kept in memory only unless journal and snapshot directories are configured."""
+        code, out = config_in_subprocess("repr(Config.JOURNAL_DIR), repr(Config.SNAPSHOT_DIR)",
+                                         unset=('JOURNAL_DIR', 'SNAPSHOT_DIR'))
+
+        assert code == 0
+        assert out.strip() == "'' ''"
+
+    def test_serving_options(self):
+        """Test that transports, ping timing and the connection limit come from the environment."""
+        code, out = config_in_subprocess(
+            "Config.SOCKETIO_TRANSPORTS, Config.PING_INTERVAL, Config.PING_TIMEOUT, Config.MAX_CONNECTIONS",
+            SOCKETIO_TRANSPORTS='websocket', PING_INTERVAL='10', PING_TIMEOUT='5', MAX_CONNECTIONS='500')
+
+        assert out.strip() == "['websocket'] 10.0 5.0 500"
+
+    def test_asyncio_mode_rejected(self):
+        """Test that an async mode Flask-SocketIO cannot serve with stops create_app with a clear error."""
+        result = subprocess.run([sys.executable, '-c', "from app import create_app; create_app()"],
+                                cwd=ROOT, env=dict(os.environ, ASYNC_MODE='asyncio', JOURNAL_DIR='', SNAPSHOT_DIR=''),
+                                capture_output=True, text=True)
+
+        assert result.returncode != 0
+        assert "ASYNC_MODE='asyncio' is not supported" in result.stderr
+
+    def test_production_requires_monkey_patch(self):
+        """Test that production refuses to serve on an unpatched eventlet."""
+        pytest.importorskip('eventlet')
+        result = subprocess.run([sys.executable, '-c', "from app import create_app; create_app()"],
+                                cwd=ROOT, env=dict(os.environ, APP_ENV='production', ASYNC_MODE='eventlet',
+                                                   JOURNAL_DIR='', SNAPSHOT_DIR=''),
+                                capture_output=True, text=True)
+
+        assert result.returncode != 0
+        assert 'eventlet is not monkey-patched' in result.stderr
+
+    def test_app_py_monkey_patches(self):
+        """Test that starting through app.py patches sockets and threads for eventlet."""
+        pytest.importorskip('eventlet')
+        result = subprocess.run([sys.executable, '-c', "import runpy; runpy.run_path('app.py'); "
+                                 "from eventlet import patcher; "
+                                 "print(patcher.is_monkey_patched('socket'), patcher.is_monkey_patched('thread'))"],
+                                cwd=ROOT, env=dict(os.environ, APP_ENV='production', ASYNC_MODE='eventlet',
+                                                   JOURNAL_DIR='', SNAPSHOT_DIR='', QR_ADDRESS_CHECK_INTERVAL='0'),
+                                capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().endswith('True True')
+
+    @pytest.mark.parametrize('signum', [signal.SIGTERM, signal.SIGINT])
+    def test_stop_signal_saves_games(self, tmp_path, signum):
+        """Test that app.py snapshots its games and exits cleanly on SIGTERM and SIGINT."""
+        pytest.importorskip('eventlet')
+        journal_dir, snapshot_dir = tmp_path / 'journal', tmp_path / 'snapshots'
+        journal_dir.mkdir()
+        (journal_dir / 'ABCD.log').write_text('{"seq":1,"op":"create_team","args":["Alpha"]}\n')
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        log = tmp_path / 'server.log'
+        with open(log, 'w') as out:
+            proc = subprocess.Popen([sys.executable, 'app.py'], cwd=ROOT, stdout=out, stderr=subprocess.STDOUT,
+                                    env=dict(os.environ, APP_ENV='production', HOST='127.0.0.1', PORT=str(port),
+                                             JOURNAL_DIR=str(journal_dir), SNAPSHOT_DIR=str(snapshot_dir),
+                                             SNAPSHOT_INTERVAL='0', QR_ADDRESS_CHECK_INTERVAL='0'))
+            try:
+                deadline = time.monotonic() + 20
+                while 'Serving with' not in log.read_text() and time.monotonic() < deadline:
+                    time.sleep(0.1)
+                proc.send_signal(signum)
+                assert proc.wait(timeout=20) == 0, log.read_text()
+            finally:
+                proc.kill()
+
+        assert (snapshot_dir / 'ABCD.snap').exists()
+
+
+class TestConnectionLimit:
+    """Tests for MAX_CONNECTIONS."""
+
+    def test_refuses_over_limit(self, flask_app, socket_client, monkeypatch):
+        """Test that connections beyond the limit are refused and a freed slot is reused."""
+        from app import socketio
+        from config import Config
+        monkeypatch.setattr(Config, 'MAX_CONNECTIONS', 2)
+        first = socket_client()
+        second = socket_client()
+        third = socketio.test_client(flask_app)
+
+        assert first.is_connected() and second.is_connected()
+        assert not third.is_connected()
+
+        first.disconnect()
+        assert socket_client().is_connected()
+
+    def test_unlimited_by_default(self, socket_client):
+        """Test that MAX_CONNECTIONS=0 accepts every connection."""
+        clients = [socket_client() for _ in range(5)]
+
+        assert all(c.is_connected() for c in clients)
+
+
+class TestTransports:
+    """Tests for the transports offered to pages."""
+
+    def test_pages_use_server_transports(self, flask_app, monkeypatch):
+        """Test that pages tell the Socket.IO client which transports the server accepts."""
+        from config import Config
+        default = flask_app.test_client().get('/join').get_data(as_text=True)
+        monkeypatch.setattr(Config, 'SOCKETIO_TRANSPORTS', ['websocket'])
+        websocket_only = flask_app.test_client().get('/join').get_data(as_text=True)
+
+        assert 'data-transports="polling,websocket"' in default
+        assert 'data-transports="websocket"' in websocket_only
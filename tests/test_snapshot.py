@@ -0,0 +1,252 @@
+"""
+Tests for binary game snapshots and restoring games from them (app/snapshot.py).
+"""
+import json
+import os
+import time
+
+import pytest
+
+from app.game_logic import GameManager
+from app.journal import read_journal
+from app.models import Question
+from app.registry import GameRegistry
+from app.snapshot import SnapshotError, encode_state, restore_state, write_snapshot
+from conftest import comparable, play_some
+
+
+class TestEncoding:
+    """Tests for encoding and decoding snapshots."""
+
+    def test_round_trip(self, mock_questions_file):
+        """Test that a restored game matches the original, mid-question with a buzz queued."""
+        gm = GameManager()
+        play_some(gm)
+
+        restored = GameManager()
+        restore_state(restored, encode_state(gm))
+
+        assert comparable(restored) == comparable(gm)
+        assert any(q is restored.state.current_question for q in restored.state.questions)
+        assert [e.timestamp for e in restored.state.buzz_queue] == [e.timestamp for e in gm.state.buzz_queue]
+        assert restored.question_index.remaining(1) == gm.question_index.remaining(1)
+        assert restored.get_board_state(1) == gm.get_board_state(1)
+
+    def test_restored_players_disconnected(self, mock_questions_file):
+        """Test that restored players wait for their clients to reconnect."""
+        gm = GameManager()
+        play_some(gm)
+        gm.set_trebek('host-sid')
+
+        restored = GameManager()
+        restore_state(restored, encode_state(gm))
+
+        assert all(not p.connected for p in restored.state.players.values())
+        assert restored.state.trebek_session_id is None
+        token = gm.state.players['player_1'].token
+        assert restored.reconnect_player('player_1', 'team_1', 'new-sid', token) is not None
+
+    def test_restored_game_plays_on(self, mock_questions_file):
+        """Test that adjudication continues from the restored buzz queue."""
+        gm = GameManager()
+        play_some(gm)
+        restored = GameManager()
+        restore_state(restored, encode_state(gm))
+
+        assert restored.adjudicate_answer(True) == (None, 200)
+        assert restored.state.teams['team_2'].score == gm.state.teams['team_2'].score + 200
+
+    def test_smaller_than_json(self, mock_questions_file):
+        """Test that a snapshot is a fraction of the size of the JSON game summary."""
+        gm = GameManager()
+        play_some(gm)
+
+        assert len(encode_state(gm)) * 2 < len(json.dumps(gm.get_game_summary()))
+
+    def test_bank_size_mismatch(self, mock_questions_file):
+        """Test that a snapshot refuses to load onto a different question bank."""
+        gm = GameManager()
+        play_some(gm)
+        other = GameManager()
+        other.state.questions = [Question(round=1, category='Solo', value=100, question='Q', answer='A')]
+
+        with pytest.raises(SnapshotError):
+            restore_state(other, encode_state(gm))
+
+    def test_same_size_bank_mismatch(self, mock_questions_file):
+        """Test that a snapshot refuses a different bank that has the same number of questions."""
+        gm = GameManager()
+        play_some(gm)
+        other = GameManager()
+        other.state.questions = [Question(q.round, q.category, q.value, q.question + '?', q.answer)
+                                 for q in gm.state.questions]
+
+        with pytest.raises(SnapshotError, match='different question bank'):
+            restore_state(other, encode_state(gm))
+
+    def test_copied_bank_file_accepted(self, mock_questions_file, sample_questions_csv):
+        """Test that a bank file rewritten with the same content (new mtime) still matches."""
+        gm = GameManager()
+        play_some(gm)
+        data = encode_state(gm)
+        content = open(sample_questions_csv, 'rb').read()
+        with open(sample_questions_csv, 'wb') as f:
+            f.write(content)
+        os.utime(sample_questions_csv, ns=(1, 1))
+
+        restored = GameManager()
+        restore_state(restored, data)
+
+        assert comparable(restored) == comparable(gm)
+
+    @pytest.mark.parametrize('damage', [
+        lambda data: b'NOTSNAP' + data[7:],
+        lambda data: data[:6] + bytes([99]) + data[7:],
+        lambda data: data[:6] + bytes([2]) + data[7:],
+        lambda data: data[:-5],
+        lambda data: data[:7] + b'\x00' * 8,
+    ])
+    def test_corrupt_snapshot(self, mock_questions_file, damage):
+        """Test that damaged snapshots raise SnapshotError instead of loading garbage."""
+        gm = GameManager()
+        play_some(gm)
+
+        with pytest.raises(SnapshotError):
+            restore_state(GameManager(), damage(encode_state(gm)))
+
+    def test_large_game_decodes_fast(self):
+        """Test that a 10k-player game over a 100k-question bank restores in under 100 ms."""
+        questions = [Question(round=1 + i % 2, category=f'Category {i // 100}', value=100 * (1 + i % 5),
+                              question=f'Q{i}', answer=f'A{i}') for i in range(100_000)]
+        gm = GameManager()
+        gm.state.questions = questions
+        teams = [gm.create_team(f'Team {i}') for i in range(12)]
+        for i in range(10_000):
+            gm.add_player(f'Player {i}', teams[i % 12].id, f's{i}')
+        for q in questions[::3]:
+            q.used = True
+        data = encode_state(gm)
+
+        restored = GameManager()
+        restored.state.questions = [Question(q.round, q.category, q.value, q.question, q.answer)
+                                    for q in questions]
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            restore_state(restored, data)
+            timings.append(time.perf_counter() - start)
+
+        assert min(timings) < 0.1
+        assert len(restored.state.players) == 10_000
+        assert restored.question_index.remaining(1) == gm.question_index.remaining(1)
+
+
+class TestSnapshotFiles:
+    """Tests for writing snapshots and restoring games from disk."""
+
+    def test_atomic_write(self, tmp_path):
+        """Test that writing replaces the snapshot in one step and leaves no temp file."""
+        path = str(tmp_path / 'ABCD.snap')
+        write_snapshot(path, b'old')
+        write_snapshot(path, b'new')
+
+        assert open(path, 'rb').read() == b'new'
+        assert os.listdir(tmp_path) == ['ABCD.snap']
+
+    def test_snapshot_compacts_journal(self, tmp_path, mock_questions_file):
+        """Test that a snapshot trims the journal to the commands after it."""
+        registry = GameRegistry(journal_dir=str(tmp_path), snapshot_dir=str(tmp_path))
+        game = registry.host()
+        play_some(game.manager)
+
+        assert registry.save_snapshot(game) is True
+        assert registry.save_snapshot(game) is False  # unchanged since
+        game.manager.adjudicate_answer(False)
+        game.manager.journal.commit()
+
+        assert [r['op'] for r in read_journal(registry.journal_path(game.code))] == ['adjudicate_answer']
+
+    def test_restore_replays_journal_after_snapshot(self, tmp_path, mock_questions_file):
+        """Test that recovery loads the snapshot and replays only the newer journal records."""
+        registry = GameRegistry(journal_dir=str(tmp_path), snapshot_dir=str(tmp_path))
+        game = registry.host()
+        play_some(game.manager)
+        registry.save_snapshot(game)
+        game.manager.adjudicate_answer(True)
+        game.manager.journal.close()
+
+        restarted = GameRegistry(journal_dir=str(tmp_path), snapshot_dir=str(tmp_path))
+
+        assert restarted.recover() == 1
+        assert comparable(restarted.get(game.code).manager) == comparable(game.manager)
+
+    def test_close_saves_snapshots(self, tmp_path, mock_questions_file):
+        """Test that shutting down snapshots every game, so a restart replays nothing."""
+        registry = GameRegistry(journal_dir=str(tmp_path), snapshot_dir=str(tmp_path))
+        game = registry.host()
+        play_some(game.manager)
+        registry.close()
+
+        assert os.path.exists(registry.snapshot_path(game.code))
+        assert list(read_journal(registry.journal_path(game.code))) == []
+
+    def test_corrupt_snapshot_falls_back_to_journal(self, tmp_path, mock_questions_file):
+        """Test that a game is still recovered from its journal when its snapshot is damaged."""
+        registry = GameRegistry(journal_dir=str(tmp_path), snapshot_dir=str(tmp_path))
+        game = registry.host()
+        play_some(game.manager)
+        game.manager.journal.close()
+        write_snapshot(registry.snapshot_path(game.code), b'JPSNAP\x01garbage')
+
+        restarted = GameRegistry(journal_dir=str(tmp_path), snapshot_dir=str(tmp_path))
+
+        assert comparable(restarted.get(game.code).manager) == comparable(game.manager)
+
+    def test_another_worker_takes_over(self, tmp_path, mock_questions_file):
+        """Test that a worker sharing the data directory restores a game on first use and claims it."""
+        old_worker = GameRegistry(journal_dir=str(tmp_path / 'journal'), snapshot_dir=str(tmp_path / 'snap'))
+        game = old_worker.host()
+        play_some(game.manager)
+        old_worker.close()
+
+        claimed = []
+        new_worker = GameRegistry(journal_dir=str(tmp_path / 'journal'), snapshot_dir=str(tmp_path / 'snap'),
+                                  claim=lambda code: claimed.append(code) is None)
+
+        assert game.code not in new_worker
+        taken_over = new_worker.get(game.code)
+        assert comparable(taken_over.manager) == comparable(game.manager)
+        assert claimed == [game.code]
+        assert new_worker.get('ZZZZ') is None
+
+    def test_game_owned_elsewhere_not_restored(self, tmp_path, mock_questions_file):
+        """Test that a worker that loses the claim neither hosts the game nor touches its files."""
+        live_worker = GameRegistry(journal_dir=str(tmp_path / 'journal'), snapshot_dir=str(tmp_path / 'snap'))
+        game = live_worker.host()
+        play_some(game.manager)
+        game.manager.journal.commit()
+        journal = open(live_worker.journal_path(game.code), 'rb').read()
+
+        other = GameRegistry(journal_dir=str(tmp_path / 'journal'), snapshot_dir=str(tmp_path / 'snap'),
+                             claim=lambda code: False)
+
+        assert other.recover() == 0
+        assert other.get(game.code) is None
+        other.close()
+        assert game.code not in other
+        assert open(live_worker.journal_path(game.code), 'rb').read() == journal
+        assert not os.path.exists(other.snapshot_path(game.code))
+        live_worker.close()
+
+    def test_removed_game_stays_removed(self, tmp_path, mock_questions_file):
+        """Test that removing a game deletes its saved state."""
+        saved = tmp_path / 'saved'
+        registry = GameRegistry(journal_dir=str(saved), snapshot_dir=str(saved))
+        game = registry.host()
+        game.manager.create_team('Alpha')
+        registry.save_snapshot(game)
+
+        registry.remove(game.code)
+
+        assert registry.get(game.code) is None
+        assert os.listdir(saved) == []
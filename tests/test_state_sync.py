@@ -0,0 +1,186 @@
+"""
+Tests for delta-encoded game state broadcasts.
+"""
+import copy
+
+import pytest
+from app.state_sync import RoleChannels, StateChannel, apply_patch, diff_summary, project_summary
+
+
+@pytest.fixture
+def buzzing_game(simple_game):
+    """simple_game with its question open for buzzing and a summary taken."""
+    gm, t1, t2, p1, p2, q = simple_game
+    return gm, t1, t2, p1, p2, gm.get_game_summary()
+
+
+class TestDiffSummary:
+    """Tests for computing patch operations."""
+
+    def test_no_changes_no_ops(self, buzzing_game):
+        """Test that identical summaries produce no ops."""
+        gm, *_, before = buzzing_game
+
+        assert diff_summary(before, gm.get_game_summary()) == []
+
+    def test_score_change_is_team_op(self, buzzing_game):
+        """Test that a score change only sends the changed field."""
+        gm, t1, t2, *_, before = buzzing_game
+
+        gm.state.teams[t2.id].score = 400
+        gm.mark_dirty()
+
+        assert diff_summary(before, gm.get_game_summary()) == [['team', t2.id, {'score': 400}]]
+
+    def test_buzz_is_append_op(self, buzzing_game):
+        """Test that a buzz appends to the queue instead of resending it."""
+        gm, t1, t2, p1, p2, before = buzzing_game
+
+        gm.buzz_in(p1.id)
+        ops = diff_summary(before, gm.get_game_summary())
+
+        assert len(ops) == 1
+        kind, key, items = ops[0]
+        assert (kind, key) == ('append', 'buzz_queue')
+        assert [e['player_id'] for e in items] == [p1.id]
+
+    def test_queue_shrink_is_set_op(self, buzzing_game):
+        """Test that a shrinking queue is replaced wholesale."""
+        gm, t1, t2, p1, p2, _ = buzzing_game
+        gm.buzz_in(p1.id)
+        gm.buzz_in(p2.id)
+        before = gm.get_game_summary()
+
+        gm.adjudicate_answer(correct=False)
+        ops = diff_summary(before, gm.get_game_summary())
+
+        assert ['set', 'buzz_queue', gm.get_game_summary()['buzz_queue']] in ops
+        assert ['team', t1.id, {'score': -100}] in ops
+        assert ['append', 'teams_attempted', [t1.id]] in ops
+
+    def test_new_team_is_team_add_op(self, buzzing_game):
+        """Test that creating a team sends just the new team."""
+        gm, *_, before = buzzing_game
+
+        team = gm.create_team('Gamma')
+        ops = diff_summary(before, gm.get_game_summary())
+
+        assert ops == [['team_add', gm.get_game_summary()['teams'][-1]]]
+        assert ops[0][1]['id'] == team.id
+
+    def test_top_level_set_op(self, buzzing_game):
+        """Test that scalar fields are sent as set ops."""
+        gm, *_, before = buzzing_game
+
+        gm.skip_question()
+        ops = diff_summary(before, gm.get_game_summary())
+
+        assert ['set', 'question_state', 'board_active'] in ops
+        assert ['set', 'current_question', None] in ops
+
+    def test_apply_patch_round_trip(self, buzzing_game):
+        """Test that applying the ops reproduces the new summary."""
+        gm, t1, t2, p1, p2, before = buzzing_game
+
+        gm.buzz_in(p2.id)
+        gm.buzz_in(p1.id)
+        gm.adjudicate_answer(correct=False)
+        gm.create_team('Gamma')
+        gm.add_player('Dana', t1.id, 's4')
+        after = gm.get_game_summary()
+
+        patched = apply_patch(copy.deepcopy(before), diff_summary(before, after))
+
+        assert patched == after
+
+
+class TestStateChannel:
+    """Tests for sequence-numbered state channels."""
+
+    def test_first_update_is_baseline(self, buzzing_game):
+        """Test that the first state recorded produces no patch."""
+        gm, *_, summary = buzzing_game
+        channel = StateChannel()
+
+        assert channel.update(summary) is None
+        assert channel.snapshot()['seq'] == 0
+
+    def test_patches_are_sequenced(self, buzzing_game):
+        """Test that each change gets the next sequence number."""
+        gm, t1, t2, p1, p2, summary = buzzing_game
+        channel = StateChannel()
+        channel.update(summary)
+
+        gm.buzz_in(p1.id)
+        first = channel.update(gm.get_game_summary())
+        gm.buzz_in(p2.id)
+        second = channel.update(gm.get_game_summary())
+
+        assert first['seq'] == 1
+        assert second['seq'] == 2
+        assert channel.snapshot()['seq'] == 2
+
+    def test_unchanged_state_not_sequenced(self, buzzing_game):
+        """Test that an unchanged state does not consume a sequence number."""
+        gm, *_, summary = buzzing_game
+        channel = StateChannel()
+        channel.update(summary)
+
+        assert channel.update(gm.get_game_summary()) is None
+        assert channel.seq == 0
+
+    def test_snapshot_includes_latest_state(self, buzzing_game):
+        """Test that snapshots reflect the last recorded state."""
+        gm, t1, *_, summary = buzzing_game
+        channel = StateChannel()
+        channel.update(summary)
+
+        gm.state.teams[t1.id].score = 300
+        gm.mark_dirty()
+        channel.update(gm.get_game_summary())
+        snapshot = channel.snapshot()
+
+        assert snapshot['seq'] == 1
+        assert snapshot['teams'][0]['score'] == 300
+
+
+class TestRoleProjections:
+    """Tests for per-role summary projections."""
+
+    def test_trebek_projection_is_full_summary(self, buzzing_game):
+        """Test that the host sees the full summary."""
+        gm, *_, summary = buzzing_game
+
+        assert project_summary(summary, 'trebek') is summary
+
+    @pytest.mark.parametrize("role", ['display', 'player', 'spectator'])
+    def test_answer_hidden_from_other_roles(self, buzzing_game, role):
+        """Test that only the host projection contains the answer."""
+        gm, *_, summary = buzzing_game
+
+        assert 'Paris' not in repr(project_summary(summary, role))
+
+    def test_player_projection_drops_question_text(self, buzzing_game):
+        """Test that players only get category and value."""
+        gm, *_, summary = buzzing_game
+
+        assert project_summary(summary, 'player')['current_question'] == {'category': 'Geography', 'value': 100}
+
+    def test_role_channels_patch_only_changed_roles(self, buzzing_game):
+        """Test that roles whose projection did not change get no patch."""
+        gm, t1, t2, p1, p2, summary = buzzing_game
+        channels = RoleChannels()
+        channels.update(summary)
+
+        gm.buzz_in(p1.id)
+        patches = channels.update(gm.get_game_summary())
+
+        assert set(patches) == {'trebek', 'display', 'player'}
+
+    def test_role_snapshot_cached(self, buzzing_game):
+        """Test that snapshots are computed once per state version."""
+        gm, *_, summary = buzzing_game
+        channels = RoleChannels()
+        channels.update(summary)
+
+        assert channels.snapshot('player') is channels.snapshot('player')
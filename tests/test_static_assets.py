@@ -0,0 +1,125 @@
+"""
+Tests for fingerprinted, precompressed static bundles and cached pages (app/assets.py, app/routes.py).
+"""
+import gzip
+import re
+
+import pytest
+
+from app import assets
+
+PAGES = {'/': 'trebek', '/join': 'jennings', '/display': 'display'}
+
+
+def bundle_urls(page):
+    """The script and stylesheet URLs a page links to."""
+    return re.findall(r'(?:src|href)="(/assets/[^"]+)"', page)
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
+
+
+class TestPages:
+    """Tests for pages served from the render cache."""
+
+    @pytest.mark.parametrize('path,name', PAGES.items())
+    def test_page_links_bundles(self, client, path, name):
+        """Test that each page links its fingerprinted bundles and inlines no code or styles."""
+        page = client.get(path).get_data(as_text=True)
+
+        assert bundle_urls(page) == [f'/assets/{assets.bundle_filename(name + ".css")}',
+                                     f'/assets/{assets.bundle_filename(name + ".js")}']
+        assert '<style>' not in page
+        assert '<script>' not in page
+
+    def test_page_not_modified(self, client):
+        """Test that a page requested again with its ETag gets an empty 304."""
+        first = client.get('/join')
+        again = client.get('/join', headers={'If-None-Match': first.headers['ETag']})
+
+        assert first.status_code == 200
+        assert first.headers['Cache-Control'] == 'no-cache'
+        assert again.status_code == 304
+        assert again.get_data() == b''
+
+    def test_page_rendered_once(self, client, monkeypatch):
+        """Test that repeat requests reuse the rendered page."""
+        from app import routes
+        client.get('/display')
+        monkeypatch.setattr(routes, 'render_template', lambda *a, **kw: pytest.fail('page rendered again'))
+
+        assert client.get('/display').status_code == 200
+
+    def test_page_gzipped(self, client):
+        """Test that a page is sent gzipped to clients that accept it."""
+        plain = client.get('/')
+        zipped = client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+        assert zipped.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(zipped.get_data()) == plain.get_data()
+        assert zipped.headers['ETag'] != plain.headers['ETag']
+
+
+class TestBundles:
+    """Tests for the static bundles."""
+
+    def test_immutable_cache_headers(self, client):
+        """Test that bundles are cacheable for a year without revalidation."""
+        response = client.get(f'/assets/{assets.bundle_filename("trebek.js")}')
+
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == assets.IMMUTABLE
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert response.content_type.startswith('text/javascript')
+
+    def test_gzip_variant(self, client):
+        """Test that the gzip variant decompresses to the bundle."""
+        url = f'/assets/{assets.bundle_filename("display.css")}'
+        plain = client.get(url).get_data()
+        zipped = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+
+        assert zipped.headers['Content-Encoding'] == 'gzip'
+        assert len(zipped.get_data()) < len(plain)
+        assert gzip.decompress(zipped.get_data()) == plain
+
+    def test_gzip_refused(self, client):
+        """Test that a client refusing gzip (q=0) gets the plain bundle."""
+        response = client.get(f'/assets/{assets.bundle_filename("jennings.js")}',
+                              headers={'Accept-Encoding': 'gzip;q=0'})
+
+        assert 'Content-Encoding' not in response.headers
+
+    def test_brotli_variant(self, client):
+        """Test that clients accepting brotli get the brotli variant (with the brotli package)."""
+        brotli = pytest.importorskip('brotli')
+        url = f'/assets/{assets.bundle_filename("trebek.js")}'
+        response = client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+
+        assert response.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.get_data()) == client.get(url).get_data()
+
+    @pytest.mark.parametrize('filename', ['trebek.000000000000.js', 'trebek.js', 'missing.css'])
+    def test_unknown_filename(self, client, filename):
+        """Test that outdated or unfingerprinted bundle names are not found."""
+        assert client.get(f'/assets/{filename}').status_code == 404
+
+    def test_shared_code_bundled_once(self):
+        """Test that each script bundle carries the shared helpers exactly once."""
+        for name in ('trebek.js', 'display.js', 'jennings.js'):
+            body = assets.bundles()[name].variants['identity'].decode('utf-8')
+            assert body.count('function applyPatch(') == 1
+            assert body.count('function decodePayload(') == 1
+
+    def test_fingerprint_follows_content(self, tmp_path, monkeypatch):
+        """Test that changing a source file changes its bundle's name, and only that one."""
+        for source in {s for sources in assets.BUNDLES.values() for s in sources}:
+            (tmp_path / source).parent.mkdir(exist_ok=True)
+            (tmp_path / source).write_text(f'/* {source} */\n')
+        before = assets.build_bundles(str(tmp_path))
+        (tmp_path / 'js' / 'display.js').write_text('/* changed */\n')
+        after = assets.build_bundles(str(tmp_path))
+
+        assert after['display.js'].filename != before['display.js'].filename
+        assert after['trebek.js'].filename == before['trebek.js'].filename
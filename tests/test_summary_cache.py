@@ -0,0 +1,62 @@
+"""
+Tests for the memoized game summary and its dirty tracking.
+"""
+import pytest
+
+
+class TestSummaryCache:
+    """Tests for caching get_game_summary between state changes."""
+
+    def test_summary_reused_without_changes(self, game_manager):
+        """Test that repeated reads return the cached summary."""
+        game_manager.create_team('Alpha')
+
+        assert game_manager.get_game_summary() is game_manager.get_game_summary()
+
+    @pytest.mark.parametrize("mutate", [
+        lambda gm, t, p: gm.create_team('Gamma'),
+        lambda gm, t, p: gm.add_player('Carol', t.id, 's9'),
+        lambda gm, t, p: gm.start_round(1),
+        lambda gm, t, p: gm.buzz_in(p.id),
+        lambda gm, t, p: gm.skip_question(),
+        lambda gm, t, p: gm.disconnect_session(p.session_id),
+    ])
+    def test_mutations_invalidate_cache(self, simple_game, mutate):
+        """Test that each state-changing method produces a fresh summary."""
+        gm, t1, t2, p1, p2, q = simple_game
+        summary = gm.get_game_summary()
+        version = gm.version
+
+        mutate(gm, t1, p1)
+
+        assert gm.version > version
+        assert gm.get_game_summary() is not summary
+
+    def test_adjudicate_invalidates_cache(self, simple_game):
+        """Test that adjudication refreshes the score in the summary."""
+        gm, t1, t2, p1, p2, q = simple_game
+        gm.buzz_in(p1.id)
+        gm.get_game_summary()
+
+        gm.adjudicate_answer(correct=True)
+
+        assert gm.get_game_summary()['teams'][0]['score'] == 100
+
+    def test_rejected_buzz_keeps_cache(self, simple_game):
+        """Test that a rejected buzz does not dirty the state."""
+        gm, t1, t2, p1, p2, q = simple_game
+        gm.buzz_in(p1.id)
+        summary = gm.get_game_summary()
+
+        assert gm.buzz_in(p1.id) is False
+        assert gm.get_game_summary() is summary
+
+    def test_direct_edit_needs_mark_dirty(self, simple_game):
+        """Test that direct state edits show up after mark_dirty."""
+        gm, t1, t2, p1, p2, q = simple_game
+        gm.get_game_summary()
+
+        gm.state.teams[t1.id].score = 700
+        gm.mark_dirty()
+
+        assert gm.get_game_summary()['teams'][0]['score'] == 700
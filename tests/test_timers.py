@@ -0,0 +1,158 @@
+"""
+Tests for the timer scheduler and question-scoped buzz timers.
+"""
+import threading
+
+import pytest
+from app.timers import TimerScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    """Scheduler without a background task; tests drive it with run_due()."""
+    return TimerScheduler(clock=clock)
+
+
+class TestTimerScheduler:
+    """Tests for scheduling, firing and cancelling timers."""
+
+    def test_fires_after_deadline(self, scheduler, clock):
+        """Test that a timer fires only once its delay has passed."""
+        fired = []
+        scheduler.schedule('t', 4, fired.append, 'x')
+
+        clock.now += 3.9
+        assert scheduler.run_due() == 0
+        clock.now += 0.2
+        assert scheduler.run_due() == 1
+        assert fired == ['x']
+        assert not scheduler.pending('t')
+
+    def test_fires_in_deadline_order(self, scheduler, clock):
+        """Test that timers fire earliest deadline first."""
+        fired = []
+        scheduler.schedule('slow', 5, fired.append, 'slow')
+        scheduler.schedule('fast', 1, fired.append, 'fast')
+
+        clock.now += 10
+        scheduler.run_due()
+
+        assert fired == ['fast', 'slow']
+
+    def test_cancel(self, scheduler, clock):
+        """Test that cancelled timers never fire."""
+        fired = []
+        scheduler.schedule('t', 1, fired.append, 'x')
+
+        assert scheduler.cancel('t') is True
+        assert scheduler.cancel('t') is False
+        clock.now += 5
+        assert scheduler.run_due() == 0
+        assert fired == []
+
+    def test_reschedule_replaces(self, scheduler, clock):
+        """Test that scheduling an existing name replaces the old timer."""
+        fired = []
+        scheduler.schedule('t', 1, fired.append, 'old')
+        scheduler.schedule('t', 2, fired.append, 'new')
+
+        clock.now += 5
+        scheduler.run_due()
+
+        assert fired == ['new']
+
+    def test_failing_callback_does_not_stop_others(self, scheduler, clock):
+        """Test that one failing timer does not prevent the rest from firing."""
+        fired = []
+
+        def boom():
+            raise RuntimeError('boom')
+
+        scheduler.schedule('bad', 1, boom)
+        scheduler.schedule('good', 1, fired.append, 'ok')
+        clock.now += 1
+
+        assert scheduler.run_due() == 2
+        assert fired == ['ok']
+
+    def test_single_background_task(self, clock):
+        """Test that many timers share one background loop, which waits for each deadline and exits when idle."""
+        started = []
+        waits = []
+        events = []
+
+        class ClockEvent(threading.Event):
+            """Event whose timed waits advance the fake clock instead of blocking."""
+
+            def wait(self, timeout=None):
+                waits.append(timeout)
+                clock.now += timeout
+                return False
+
+        def create_event():
+            events.append(ClockEvent())
+            return events[-1]
+
+        scheduler = TimerScheduler(start_background_task=started.append, create_event=create_event, clock=clock)
+        fired = []
+        for i in range(100):
+            scheduler.schedule(f't{i}', 1 + i * 0.01, fired.append, i)
+
+        assert len(started) == 1
+        started[0]()
+
+        assert fired == list(range(100))
+        # One wait per distinct deadline, each for exactly the time left
+        assert waits[0] == pytest.approx(1)
+        assert len(waits) == 100
+        # Loop exited; the next schedule starts a new one
+        scheduler.schedule('again', 1, fired.append, 'again')
+        assert len(started) == 2
+
+    def test_earlier_timer_wakes_loop(self):
+        """Test that scheduling a timer ahead of the earliest deadline wakes the waiting loop."""
+        fired = threading.Event()
+        scheduler = TimerScheduler(start_background_task=lambda fn: threading.Thread(target=fn, daemon=True).start())
+        scheduler.schedule('late', 60, lambda: None)
+        scheduler.schedule('soon', 0.01, fired.set)
+
+        assert fired.wait(5)
+        assert scheduler.pending('late')
+        scheduler.cancel('late')
+
+
+class TestBuzzDelayTimer:
+    """Tests for the buzz delay timer being tied to question identity."""
+
+    def test_enable_buzzing_for_current_question(self, game_manager, full_round_questions):
+        """Test that the timer for the current question opens buzzing."""
+        game_manager.state.questions = full_round_questions
+        game_manager.start_round(1)
+        q = game_manager.select_question('Geography', 100)
+
+        assert game_manager.enable_buzzing(q) is True
+        assert game_manager.state.buzz_timer_active is False
+
+    def test_stale_timer_after_reselect(self, game_manager, full_round_questions):
+        """Test that a timer for an earlier question does not open buzzing."""
+        game_manager.state.questions = full_round_questions
+        game_manager.start_round(1)
+        first = game_manager.select_question('Geography', 100)
+        game_manager.skip_question()
+        game_manager.select_question('Geography', 200)
+
+        assert game_manager.enable_buzzing(first) is False
+        assert game_manager.state.buzz_timer_active is True